@@ -0,0 +1,54 @@
+"""
+Compares Query.flatten against the former recursive implementation on wide, deep and mixed structures.
+Run with: python benchmarks/bench_flatten.py (fumus installed, e.g. via "pip install -e .")
+"""
+
+import sys
+import timeit
+from collections.abc import Iterable
+
+from fumus import Query
+
+
+def recursive_flatten(iterable):
+    for i in iterable:
+        if isinstance(i, str) or not isinstance(i, Iterable):
+            yield i
+        else:
+            yield from recursive_flatten(i)
+
+
+def wide(width=100_000):
+    return [[i, i + 1, (i + 2, i + 3)] for i in range(width)]
+
+
+def deep(depth=500):
+    data = [0]
+    for i in range(1, depth):
+        data = [data, i]
+    return [data] * 100
+
+
+def mixed(width=20_000):
+    return [[i, str(i), {"id": i}, (float(i), [b"x", None]), range(3)] for i in range(width)]
+
+
+def run(name, data, number=5):
+    fumus_time = timeit.timeit(lambda: Query(data).flatten().to_list(), number=number)
+    try:
+        baseline = timeit.timeit(lambda: list(recursive_flatten(data)), number=number)
+    except RecursionError:
+        baseline = float("nan")
+    print(f"{name:<8} fumus: {fumus_time / number:.4f}s  recursive: {baseline / number:.4f}s")
+
+
+def main():
+    run("wide", wide())
+    run("deep", deep())
+    run("mixed", mixed())
+    # beyond the recursion limit -> only the iterative version can handle it
+    run("deeper", deep(sys.getrecursionlimit() * 2), number=1)
+
+
+if __name__ == "__main__":
+    main()
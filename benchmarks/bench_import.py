@@ -0,0 +1,76 @@
+"""
+Measures the import time of fumus in fresh interpreters via "python -X importtime".
+Exits with status 1 if the median exceeds --budget (milliseconds) or a module kept off the import path gets imported.
+Run with: python benchmarks/bench_import.py [--runs 20] [--budget 50] (fumus installed, e.g. via "pip install -e .")
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+STATEMENTS = ("import fumus", "from fumus import Query")
+# stdlib modules only needed by rarely used operations -> imported locally, never at import time
+FORBIDDEN_MODULES = ("pickle", "typing", "hashlib", "sqlite3", "tempfile", "random", "numpy")
+
+
+def import_times(statement):
+    """Returns {module: self time in microseconds} of the imports done by running 'statement' at startup"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, _, module = line.removeprefix("import time:").split("|")
+        times[module.strip()] = int(self_time)
+    return times
+
+
+def measure(statement, runs):
+    """Returns the import times of 'statement' minus the modules imported by the bare interpreter startup"""
+    startup = set(import_times("pass"))
+    samples = [
+        {module: t for module, t in import_times(statement).items() if module not in startup}
+        for _ in range(runs)
+    ]
+    totals = [sum(sample.values()) / 1000 for sample in samples]
+    return samples[-1], totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--budget", type=float, help="max median import time in milliseconds")
+    parser.add_argument("--top", type=int, default=10, help="number of slowest modules shown")
+    args = parser.parse_args(argv)
+
+    failures = []
+    for statement in STATEMENTS:
+        modules, totals = measure(statement, args.runs)
+        median = statistics.median(totals)
+        print(
+            f"{statement!r}: median {median:.2f}ms, min {min(totals):.2f}ms ({len(modules)} modules)"
+        )
+        for module, t in sorted(modules.items(), key=lambda item: item[1], reverse=True)[
+            : args.top
+        ]:
+            print(f"    {t / 1000:8.2f}ms  {module}")
+        if args.budget is not None and median > args.budget:
+            failures.append(f"{statement!r} took {median:.2f}ms (budget {args.budget}ms)")
+        failures.extend(
+            f"{statement!r} imported {module!r}"
+            for module in FORBIDDEN_MODULES
+            if module in modules
+        )
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
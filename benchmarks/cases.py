@@ -0,0 +1,755 @@
+"""
+Benchmark cases - each fumus operation paired with the equivalent hand-written loop, comprehension or itertools code.
+Both callables of a case receive the same input data and return comparable results
+"""
+
+import array
+import collections
+import functools
+import heapq
+import itertools as it
+import operator
+import os
+import tempfile
+
+from fumus import Query
+from fumus.queries.collector import Collector
+from fumus.instrumentation import MemoryAccounting
+from fumus.queries.query_generator import QueryGenerator
+from fumus.queries.window import SessionWindows, SumAggregator
+from fumus.utils import MemoCache
+
+CASES = []
+
+# public members that are not operations on the data (configuration, introspection, properties)
+NOT_BENCHMARKED = {
+    "close",
+    "on_close",
+    "explain",
+    "explain_analyze",
+    "instrument",
+    "trace",
+    "with_memory_budget",
+    "profile",
+    "memory_usage",
+    "iterable",
+    "typecode",
+}
+
+
+class Case:
+    """A fumus operation and its plain-Python baseline"""
+
+    __slots__ = ("name", "fumus", "baseline", "data", "is_deterministic")
+
+    def __init__(self, name, fumus, baseline, data, is_deterministic=True):
+        self.name = name
+        self.fumus = fumus
+        self.baseline = baseline
+        self.data = data
+        self.is_deterministic = is_deterministic
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.name})"
+
+
+# ### input data ###
+def ints(n):
+    return list(range(n))
+
+
+def shuffled(n):
+    # deterministic permutation (7919 is a prime not dividing any of the benchmark sizes)
+    return [(i * 7919) % n for i in range(n)]
+
+
+def residues(n):
+    return [i % 100 for i in range(n)]
+
+
+def nested(n):
+    return [[i, i + 1] for i in range(0, n, 2)]
+
+
+def keyed(n):
+    return [(i % 100, i) for i in range(n)]
+
+
+def records(n):
+    return [{"id": i, "group": i % 10} for i in range(n)]
+
+
+def sessions(n):
+    # bursts of 10 events separated by gaps of 5
+    return [i + (i // 10) * 5 for i in range(n)]
+
+
+def capped(n, limit=100):
+    # for operations with quadratic output
+    return list(range(min(n, limit)))
+
+
+def register(name, fumus, baseline, data=ints, is_deterministic=True):
+    CASES.append(Case(name, fumus, baseline, data, is_deterministic))
+
+
+def _noop(_):
+    pass
+
+
+def _double(x):
+    return x * 2
+
+
+def _is_odd(x):
+    return x % 2
+
+
+def _get(optional):
+    return optional.get() if optional.is_present else None
+
+
+def _other_half(d):
+    # overlaps the upper half of the input
+    return list(range(len(d) // 2, len(d) + len(d) // 2))
+
+
+def _hash_join(left, right, left_key, right_key):
+    index = collections.defaultdict(list)
+    for r in right:
+        index[right_key(r)].append(r)
+    return [(x, r) for x in left for r in index.get(left_key(x), ())]
+
+
+def _cogroup(left, right, left_key, right_key):
+    groups = {}
+    for x in left:
+        groups.setdefault(left_key(x), ([], []))[0].append(x)
+    for x in right:
+        groups.setdefault(right_key(x), ([], []))[1].append(x)
+    return [(k, a, b) for k, (a, b) in groups.items()]
+
+
+def _symmetric_difference(left, right):
+    left_keys, right_keys = set(left), set(right)
+    return [x for x in dict.fromkeys(left) if x not in right_keys] + [
+        x for x in dict.fromkeys(right) if x not in left_keys
+    ]
+
+
+def _tumbling_counts(d, size):
+    return [
+        (k * size, k * size + size, len(list(g))) for k, g in it.groupby(d, lambda x: x // size)
+    ]
+
+
+def _sessions(d, gap):
+    result, first, last, count = [], None, None, 0
+    for x in d:
+        if last is not None and x - last > gap:
+            result.append((first, last, count))
+            first, count = None, 0
+        first = x if first is None else first
+        last = x
+        count += 1
+    if first is not None:
+        result.append((first, last, count))
+    return result
+
+
+def _persistent_map(d, mapper):
+    with tempfile.TemporaryDirectory() as tmp:
+        return Query(d).map_persistent(mapper, os.path.join(tmp, "cache.db")).to_list()
+
+
+def _persistent_map_generator(d, mapper):
+    with tempfile.TemporaryDirectory() as tmp:
+        return list(QueryGenerator.map_persistent(d, mapper, os.path.join(tmp, "cache.db")))
+
+
+def _memoized_map(d, mapper):
+    cache = {}
+    return [cache[x] if x in cache else cache.setdefault(x, mapper(x)) for x in d]
+
+
+def _lru_map(d, mapper):
+    cached = functools.lru_cache(maxsize=128)(mapper)
+    return [cached(x) for x in d]
+
+
+# ### Query: creation ###
+register("Query.of", lambda d: Query.of(*d).to_list(), lambda d: list((*d,)))
+register("Query.of_nullable", lambda d: Query.of_nullable(d).to_list(), list)
+register("Query.empty", lambda d: Query.empty().to_list(), lambda d: [])
+register(
+    "Query.of_ints", lambda d: Query.of_ints(*d).to_list(), lambda d: array.array("q", d).tolist()
+)
+register(
+    "Query.of_floats",
+    lambda d: Query.of_floats(*d).to_list(),
+    lambda d: array.array("d", d).tolist(),
+)
+register(
+    "Query.iterate",
+    lambda d: Query.iterate(0, lambda x: x + 1).limit(len(d)).to_list(),
+    lambda d: list(it.islice(it.count(), len(d))),
+)
+register(
+    "Query.generate",
+    lambda d: Query.generate(lambda: 1).limit(len(d)).to_list(),
+    lambda d: [1 for _ in range(len(d))],
+)
+register(
+    "Query.constant",
+    lambda d: Query.constant(1).limit(len(d)).to_list(),
+    lambda d: list(it.repeat(1, len(d))),
+)
+register(
+    "Query.from_range",
+    lambda d: Query.from_range(0, len(d)).to_list(),
+    lambda d: list(range(len(d))),
+)
+
+# ### Query: intermediate operations ###
+register("Query.concat", lambda d: Query(d).concat(d).to_list(), lambda d: list(it.chain(d, d)))
+register("Query.prepend", lambda d: Query(d).prepend(d).to_list(), lambda d: list(it.chain(d, d)))
+register(
+    "Query.filter", lambda d: Query(d).filter(_is_odd).to_list(), lambda d: [x for x in d if x % 2]
+)
+register("Query.map", lambda d: Query(d).map(_double).to_list(), lambda d: [x * 2 for x in d])
+register(
+    "Query.filter_map",
+    lambda d: Query(d).filter_map(str, discard_falsy=True).to_list(),
+    lambda d: [str(x) for x in d if x],
+)
+register(
+    "Query.map_cached",
+    lambda d: Query(d).map_cached(_double).to_list(),
+    lambda d: _lru_map(d, _double),
+    data=residues,
+)
+register(
+    "Query.filter_cached",
+    lambda d: Query(d).filter_cached(_is_odd).to_list(),
+    lambda d: (lambda cached: [x for x in d if cached(x)])(functools.lru_cache(128)(_is_odd)),
+    data=residues,
+)
+register(
+    "Query.map_persistent",
+    lambda d: _persistent_map(d, _double),
+    lambda d: _memoized_map(d, _double),
+    data=residues,
+)
+register(
+    "Query.map_batches",
+    lambda d: Query(d).map_batches(lambda b: [x * 2 for x in b], 256).to_list(),
+    lambda d: [x * 2 for x in d],
+)
+register(
+    "Query.flat_map",
+    lambda d: Query(d).flat_map(lambda x: x).to_list(),
+    lambda d: [y for x in d for y in x],
+    data=nested,
+)
+register(
+    "Query.flatten",
+    lambda d: Query(d).flatten().to_list(),
+    lambda d: [y for x in d for y in x],
+    data=nested,
+)
+register(
+    "Query.peek", lambda d: Query(d).peek(_noop).to_list(), lambda d: [x for x in d if not _noop(x)]
+)
+register(
+    "Query.distinct",
+    lambda d: Query(d).distinct().to_list(),
+    lambda d: list(dict.fromkeys(d)),
+    data=residues,
+)
+register("Query.skip", lambda d: Query(d).skip(len(d) // 2).to_list(), lambda d: d[len(d) // 2 :])
+register("Query.limit", lambda d: Query(d).limit(len(d) // 2).to_list(), lambda d: d[: len(d) // 2])
+register("Query.head", lambda d: Query(d).head(len(d) // 2).to_list(), lambda d: d[: len(d) // 2])
+register(
+    "Query.tail",
+    lambda d: Query(iter(d)).tail(10).to_list(),
+    lambda d: list(collections.deque(d, 10)),
+)
+register(
+    "Query.take_while",
+    lambda d: Query(d).take_while(lambda x: x < len(d) // 2).to_list(),
+    lambda d: list(it.takewhile(lambda x: x < len(d) // 2, d)),
+)
+register(
+    "Query.drop_while",
+    lambda d: Query(d).drop_while(lambda x: x < len(d) // 2).to_list(),
+    lambda d: list(it.dropwhile(lambda x: x < len(d) // 2, d)),
+)
+register("Query.sort", lambda d: Query(d).sort().to_list(), sorted, data=shuffled)
+register(
+    "Query.reverse",
+    lambda d: Query(d).reverse().to_list(),
+    lambda d: sorted(d, reverse=True),
+    data=shuffled,
+)
+register("Query.enumerate", lambda d: Query(d).enumerate().to_list(), lambda d: list(enumerate(d)))
+register(
+    "Query.as_array",
+    lambda d: Query(d).as_array("q").to_list(),
+    lambda d: array.array("q", d).tolist(),
+)
+register(
+    "Query.window",
+    lambda d: Query(d).window(10, agg="sum").to_list(),
+    lambda d: [sum(d[i : i + 10]) for i in range(len(d) - 9)],
+)
+register(
+    "Query.time_window",
+    lambda d: Query(d).time_window(lambda x: x, 100, agg="count").to_list(),
+    lambda d: _tumbling_counts(d, 100),
+)
+register(
+    "Query.session_window",
+    lambda d: Query(d).session_window(lambda x: x, 2, agg="count").to_list(),
+    lambda d: _sessions(d, 2),
+    data=sessions,
+)
+register(
+    "Query.join",
+    lambda d: Query(d).join(list(range(0, 100, 2)), operator.itemgetter(0), lambda x: x).to_list(),
+    lambda d: _hash_join(d, range(0, 100, 2), operator.itemgetter(0), lambda x: x),
+    data=keyed,
+)
+register(
+    "Query.cogroup",
+    lambda d: Query(d)
+    .cogroup(list(range(0, 200, 2)), operator.itemgetter(0), lambda x: x)
+    .to_list(),
+    lambda d: _cogroup(d, range(0, 200, 2), operator.itemgetter(0), lambda x: x),
+    data=keyed,
+)
+register(
+    "Query.merge_sorted",
+    lambda d: Query(d[::2]).merge_sorted(d[1::2]).to_list(),
+    lambda d: list(heapq.merge(d[::2], d[1::2])),
+)
+register(
+    "Query.merge_join",
+    lambda d: Query(d).merge_join(d[::3], lambda x: x).to_list(),
+    lambda d: [(x, x) for x in d if x % 3 == 0],
+)
+register(
+    "Query.union",
+    lambda d: Query(d).union(_other_half(d)).to_list(),
+    lambda d: list(dict.fromkeys(it.chain(d, _other_half(d)))),
+)
+register(
+    "Query.intersect",
+    lambda d: Query(d).intersect(_other_half(d)).to_list(),
+    lambda d: (lambda right: [x for x in dict.fromkeys(d) if x in right])(set(_other_half(d))),
+)
+register(
+    "Query.difference",
+    lambda d: Query(d).difference(_other_half(d)).to_list(),
+    lambda d: (lambda right: [x for x in dict.fromkeys(d) if x not in right])(set(_other_half(d))),
+)
+register(
+    "Query.symmetric_difference",
+    lambda d: Query(d).symmetric_difference(_other_half(d)).to_list(),
+    lambda d: _symmetric_difference(d, _other_half(d)),
+)
+
+try:
+    import numpy  # noqa
+except ImportError:
+    NOT_BENCHMARKED.add("vectorized")
+else:
+    register(
+        "Query.vectorized",
+        lambda d: Query(d).vectorized().map(lambda a: a * 2, on_array=True).to_list(),
+        lambda d: [x * 2 for x in d],
+    )
+
+
+# ### Query: terminal operations ###
+def _for_each(d, operation):
+    for x in d:
+        operation(x)
+
+
+register("Query.for_each", lambda d: Query(d).for_each(_noop), lambda d: _for_each(d, _noop))
+register(
+    "Query.reduce",
+    lambda d: _get(Query(d).reduce(operator.add)),
+    lambda d: functools.reduce(operator.add, d) if d else None,
+)
+register("Query.count", lambda d: Query(iter(d)).count(), lambda d: sum(1 for _ in iter(d)))
+register("Query.sum", lambda d: Query(d).sum(), sum)
+register("Query.average", lambda d: Query(d).average(), lambda d: sum(d) / len(d) if d else 0)
+register("Query.min", lambda d: _get(Query(d).min()), lambda d: min(d, default=None), data=shuffled)
+register("Query.max", lambda d: _get(Query(d).max()), lambda d: max(d, default=None), data=shuffled)
+register(
+    "Query.find_first",
+    lambda d: _get(Query(d).find_first(lambda x: x >= len(d) // 2)),
+    lambda d: next((x for x in d if x >= len(d) // 2), None),
+)
+register(
+    "Query.find_any",
+    lambda d: _get(Query(d).find_any(_is_odd)),
+    lambda d: next((x for x in d if x % 2), None),
+    is_deterministic=False,
+)
+register("Query.take_first", lambda d: _get(Query(d).take_first()), lambda d: d[0] if d else None)
+register(
+    "Query.take_last", lambda d: _get(Query(iter(d)).take_last()), lambda d: d[-1] if d else None
+)
+register(
+    "Query.take_nth",
+    lambda d: _get(Query(iter(d)).take_nth(len(d) // 2)),
+    lambda d: next(it.islice(iter(d), len(d) // 2, None), None),
+)
+register(
+    "Query.any_match",
+    lambda d: Query(d).any_match(lambda x: x < 0),
+    lambda d: any(x < 0 for x in d),
+)
+register(
+    "Query.all_match",
+    lambda d: Query(d).all_match(lambda x: x >= 0),
+    lambda d: all(x >= 0 for x in d),
+)
+register(
+    "Query.none_match",
+    lambda d: Query(d).none_match(lambda x: x < 0),
+    # same work as the current implementation: stops at the first non-matching element
+    lambda d: any(not x < 0 for x in d),
+)
+register("Query.contains", lambda d: Query(iter(d)).contains(-1), lambda d: -1 in iter(d))
+register("Query.compare_with", lambda d: Query(d).compare_with(list(d)), lambda d: d == list(d))
+register(
+    "Query.all_equal",
+    lambda d: Query(d).all_equal(),
+    lambda d: len(list(it.islice(it.groupby(d), 2))) <= 1,
+)
+register("Query.quantify", lambda d: Query(d).quantify(_is_odd), lambda d: sum(map(_is_odd, d)))
+register(
+    "Query.broadcast",
+    lambda d: Query(d).broadcast(Collector.summing(), Collector.counting()),
+    lambda d: (sum(d), len(d)),
+)
+register(
+    "Query.group_by",
+    lambda d: Query(d).group_by(operator.itemgetter(0)),
+    lambda d: {k: list(g) for k, g in it.groupby(d, operator.itemgetter(0))},
+    data=lambda n: sorted(keyed(n)),
+)
+register("Query.collect", lambda d: Query(d).collect(list), list)
+register("Query.to_list", lambda d: Query(iter(d)).to_list(), lambda d: list(iter(d)))
+register("Query.to_tuple", lambda d: Query(iter(d)).to_tuple(), lambda d: tuple(iter(d)))
+register("Query.to_set", lambda d: Query(d).to_set(), set)
+register(
+    "Query.to_dict", lambda d: Query(d).to_dict(), dict, data=lambda n: list(enumerate(range(n)))
+)
+register(
+    "Query.to_string",
+    lambda d: Query(d).to_string(),
+    lambda d: ", ".join(map(str, d)),
+)
+register(
+    "Query.to_array",
+    lambda d: Query(d).to_array("q").tolist(),
+    lambda d: array.array("q", d).tolist(),
+)
+register(
+    "Query.to_table",
+    lambda d: Query(d).to_table().column("group"),
+    lambda d: [r["group"] for r in d],
+    data=records,
+)
+register("Query.cache", lambda d: Query(iter(d)).cache().open().to_list(), lambda d: list(iter(d)))
+
+# ### ItertoolsMixin ###
+register(
+    "ItertoolsMixin.use",
+    lambda d: Query(d).use(it.pairwise).to_list(),
+    lambda d: list(it.pairwise(d)),
+)
+register(
+    "ItertoolsMixin.tabulate",
+    lambda d: Query(d).tabulate(_double).limit(len(d)).to_list(),
+    lambda d: list(map(_double, range(len(d)))),
+)
+register(
+    "ItertoolsMixin.repeat_func",
+    lambda d: Query([2, 3]).repeat_func(pow, times=len(d)).to_list(),
+    lambda d: [pow(2, 3) for _ in range(len(d))],
+)
+register("ItertoolsMixin.ncycles", lambda d: Query(d).ncycles(2).to_list(), lambda d: d * 2)
+register(
+    "ItertoolsMixin.consume",
+    lambda d: Query(d).consume(len(d) // 2).to_list(),
+    lambda d: d[len(d) // 2 :],
+)
+register(
+    "ItertoolsMixin.view",
+    lambda d: Query(d).view(0, len(d), 2).to_list(),
+    lambda d: d[::2],
+)
+register(
+    "ItertoolsMixin.unique",
+    lambda d: Query(d).unique().to_list(),
+    lambda d: sorted(set(d)),
+    data=residues,
+)
+register(
+    "ItertoolsMixin.unique_just_seen",
+    lambda d: Query(d).unique_just_seen().to_list(),
+    lambda d: [k for k, _ in it.groupby(d)],
+    data=lambda n: sorted(residues(n)),
+)
+register(
+    "ItertoolsMixin.unique_ever_seen",
+    lambda d: Query(d).unique_ever_seen().to_list(),
+    lambda d: list(dict.fromkeys(d)),
+    data=residues,
+)
+register(
+    "ItertoolsMixin.sliding_window",
+    lambda d: Query(d).sliding_window(3).to_list(),
+    lambda d: list(zip(d, d[1:], d[2:])),
+)
+register(
+    "ItertoolsMixin.grouper",
+    lambda d: Query(d).grouper(3).to_list(),
+    lambda d: list(it.zip_longest(*[iter(d)] * 3)),
+)
+register(
+    "ItertoolsMixin.batched",
+    lambda d: Query(d).batched(3).to_list(),
+    lambda d: list(it.batched(d, 3)),
+)
+register(
+    "ItertoolsMixin.round_robin",
+    lambda d: Query([d, d[::2]]).round_robin().to_list(),
+    lambda d: [
+        x for pair in it.zip_longest(d, d[::2], fillvalue=object) for x in pair if x is not object
+    ],
+)
+register(
+    "ItertoolsMixin.partition",
+    lambda d: Query(d).partition(_is_odd, mode="eager").to_list(),
+    lambda d: [[x for x in d if x % 2], [x for x in d if not x % 2]],
+)
+register(
+    "ItertoolsMixin.subslices",
+    lambda d: Query(d).subslices().to_list(),
+    lambda d: [d[i:j] for i, j in it.combinations(range(len(d) + 1), 2)],
+    data=capped,
+)
+register(
+    "ItertoolsMixin.find_indices",
+    lambda d: Query(d).find_indices(5).to_list(),
+    lambda d: [i for i, x in enumerate(d) if x == 5],
+    data=residues,
+)
+
+# ### QueryGenerator ###
+register("QueryGenerator.concat", lambda d: list(QueryGenerator.concat(d, d)), lambda d: d + d)
+register(
+    "QueryGenerator.filter",
+    lambda d: list(QueryGenerator.filter(d, _is_odd)),
+    lambda d: list(filter(_is_odd, d)),
+)
+register(
+    "QueryGenerator.map",
+    lambda d: list(QueryGenerator.map(d, _double)),
+    lambda d: list(map(_double, d)),
+)
+register(
+    "QueryGenerator.filter_map",
+    lambda d: list(QueryGenerator.filter_map(d, _double)),
+    lambda d: [x * 2 for x in d if x is not None],
+)
+register(
+    "QueryGenerator.map_cached",
+    lambda d: list(QueryGenerator.map_cached(d, _double, MemoCache(128))),
+    lambda d: _lru_map(d, _double),
+    data=residues,
+)
+register(
+    "QueryGenerator.filter_cached",
+    lambda d: list(QueryGenerator.filter_cached(d, _is_odd, MemoCache(128))),
+    lambda d: (lambda cached: [x for x in d if cached(x)])(functools.lru_cache(128)(_is_odd)),
+    data=residues,
+)
+register(
+    "QueryGenerator.map_persistent",
+    lambda d: _persistent_map_generator(d, _double),
+    lambda d: _memoized_map(d, _double),
+    data=residues,
+)
+register(
+    "QueryGenerator.map_batches",
+    lambda d: list(QueryGenerator.map_batches(d, lambda b: [x * 2 for x in b], 256)),
+    lambda d: [x * 2 for x in d],
+)
+register(
+    "QueryGenerator.flat_map",
+    lambda d: list(QueryGenerator.flat_map(d, lambda x: x)),
+    lambda d: list(it.chain.from_iterable(d)),
+    data=nested,
+)
+register(
+    "QueryGenerator.flatten",
+    lambda d: list(QueryGenerator.flatten(d)),
+    lambda d: list(it.chain.from_iterable(d)),
+    data=nested,
+)
+register(
+    "QueryGenerator.peek",
+    lambda d: list(QueryGenerator.peek(d, _noop)),
+    lambda d: [x for x in d if not _noop(x)],
+)
+register(
+    "QueryGenerator.distinct",
+    lambda d: list(QueryGenerator.distinct(d)),
+    lambda d: list(dict.fromkeys(d)),
+    data=residues,
+)
+register(
+    "QueryGenerator.distinct_accounted",
+    lambda d: (
+        lambda memory: list(QueryGenerator.distinct_accounted(d, memory, memory.stage("distinct")))
+    )(MemoryAccounting()),
+    lambda d: list(dict.fromkeys(d)),
+    data=residues,
+)
+register(
+    "QueryGenerator.skip",
+    lambda d: list(QueryGenerator.skip(d, len(d) // 2)),
+    lambda d: list(it.islice(d, len(d) // 2, None)),
+)
+register(
+    "QueryGenerator.limit",
+    lambda d: list(QueryGenerator.limit(d, len(d) // 2)),
+    lambda d: list(it.islice(d, len(d) // 2)),
+)
+register(
+    "QueryGenerator.tail",
+    lambda d: list(QueryGenerator.tail(d, 10)),
+    lambda d: list(collections.deque(d, 10)),
+)
+register(
+    "QueryGenerator.tail_accounted",
+    lambda d: (
+        lambda memory: list(QueryGenerator.tail_accounted(d, 10, memory, memory.stage("tail")))
+    )(MemoryAccounting()),
+    lambda d: list(collections.deque(d, 10)),
+)
+register(
+    "QueryGenerator.take_while",
+    lambda d: list(QueryGenerator.take_while(d, lambda x: x < len(d) // 2)),
+    lambda d: list(it.takewhile(lambda x: x < len(d) // 2, d)),
+)
+register(
+    "QueryGenerator.drop_while",
+    lambda d: list(QueryGenerator.drop_while(d, lambda x: x < len(d) // 2)),
+    lambda d: list(it.dropwhile(lambda x: x < len(d) // 2, d)),
+)
+register("QueryGenerator.sort", lambda d: list(QueryGenerator.sort(d)), sorted, data=shuffled)
+register(
+    "QueryGenerator.external_sort",
+    lambda d: (
+        lambda memory: list(
+            QueryGenerator.external_sort(d, None, False, memory, memory.stage("sort"))
+        )
+    )(MemoryAccounting(1024 * 1024)),
+    sorted,
+    data=shuffled,
+)
+register(
+    "QueryGenerator.enumerate",
+    lambda d: list(QueryGenerator.enumerate(d)),
+    lambda d: list(enumerate(d)),
+)
+register(
+    "QueryGenerator.iterate",
+    lambda d: list(it.islice(QueryGenerator.iterate(0, lambda x: x + 1), len(d))),
+    lambda d: list(it.islice(it.count(), len(d))),
+)
+register(
+    "QueryGenerator.generate",
+    lambda d: list(it.islice(QueryGenerator.generate(lambda: 1), len(d))),
+    lambda d: [1 for _ in range(len(d))],
+)
+register(
+    "QueryGenerator.range",
+    lambda d: list(QueryGenerator.range(0, len(d))),
+    lambda d: list(range(len(d))),
+)
+register(
+    "QueryGenerator.window",
+    lambda d: list(QueryGenerator.window(d, 10, 1, SumAggregator)),
+    lambda d: [sum(d[i : i + 10]) for i in range(len(d) - 9)],
+)
+register(
+    "QueryGenerator.windows",
+    lambda d: list(QueryGenerator.windows(d, SessionWindows(lambda x: x, 2, SumAggregator))),
+    lambda d: [(first, last, sum(range(first, last + 1))) for first, last, _ in _sessions(d, 2)],
+    data=sessions,
+)
+register(
+    "QueryGenerator.hash_join",
+    lambda d: list(
+        QueryGenerator.hash_join(d, range(0, 100, 2), operator.itemgetter(0), lambda x: x)
+    ),
+    lambda d: _hash_join(d, range(0, 100, 2), operator.itemgetter(0), lambda x: x),
+    data=keyed,
+)
+register(
+    "QueryGenerator.cogroup",
+    lambda d: list(
+        QueryGenerator.cogroup(d, range(0, 200, 2), operator.itemgetter(0), lambda x: x)
+    ),
+    lambda d: _cogroup(d, range(0, 200, 2), operator.itemgetter(0), lambda x: x),
+    data=keyed,
+)
+register(
+    "QueryGenerator.merge_sorted",
+    lambda d: list(QueryGenerator.merge_sorted([d[::2], d[1::2]])),
+    lambda d: sorted(d[::2] + d[1::2]),
+)
+register(
+    "QueryGenerator.merge_join",
+    lambda d: list(QueryGenerator.merge_join(d, d[::3], lambda x: x, lambda x: x)),
+    lambda d: [(x, x) for x in d if x % 3 == 0],
+)
+register(
+    "QueryGenerator.ensure_sorted",
+    lambda d: list(QueryGenerator.ensure_sorted(d)),
+    lambda d: list(d) if all(a <= b for a, b in it.pairwise(d)) else None,
+)
+register(
+    "QueryGenerator.union",
+    lambda d: list(QueryGenerator.union(d, _other_half(d))),
+    lambda d: list(dict.fromkeys(it.chain(d, _other_half(d)))),
+)
+register(
+    "QueryGenerator.intersect",
+    lambda d: list(QueryGenerator.intersect(d, _other_half(d))),
+    lambda d: (lambda right: [x for x in dict.fromkeys(d) if x in right])(set(_other_half(d))),
+)
+register(
+    "QueryGenerator.difference",
+    lambda d: list(QueryGenerator.difference(d, _other_half(d))),
+    lambda d: (lambda right: [x for x in dict.fromkeys(d) if x not in right])(set(_other_half(d))),
+)
+register(
+    "QueryGenerator.symmetric_difference",
+    lambda d: list(QueryGenerator.symmetric_difference(d, _other_half(d))),
+    lambda d: _symmetric_difference(d, _other_half(d)),
+)
+register(
+    "QueryGenerator.sorted_set_operation",
+    lambda d: list(QueryGenerator.sorted_set_operation(d, _other_half(d), "intersect")),
+    lambda d: (lambda right: [x for x in d if x in right])(set(_other_half(d))),
+)
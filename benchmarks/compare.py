@@ -0,0 +1,75 @@
+"""
+Compares two benchmark result files and flags the regressions - exits with status 1 if there are any.
+Run from the repository root with: python -m benchmarks.compare old.json new.json [--threshold 0.1] [--relative]
+"""
+
+import argparse
+import json
+import sys
+
+
+def load(path):
+    with open(path) as f:
+        return {(r["case"], r["size"]): r for r in json.load(f)["results"]}
+
+
+def compare(old, new, relative=False):
+    """
+    Returns (case, size, metric, old value, new value, change) for every result present in both files.
+    'relative' compares the fumus/baseline ratios instead of absolute times -
+    robust to runs on different machines
+    """
+    rows = []
+    for key in sorted(old.keys() & new.keys()):
+        before, after = old[key], new[key]
+        if relative:
+            metrics = [("ratio", before["ratio"], after["ratio"])]
+        else:
+            metrics = [("time", before["fumus"]["time"], after["fumus"]["time"])]
+        metrics.append(
+            ("peak_memory", before["fumus"]["peak_memory"], after["fumus"]["peak_memory"])
+        )
+        for metric, old_value, new_value in metrics:
+            if not old_value or new_value is None:
+                continue
+            rows.append((*key, metric, old_value, new_value, new_value / old_value - 1))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("old")
+    parser.add_argument("new")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="relative slowdown reported as regression"
+    )
+    parser.add_argument(
+        "--relative", action="store_true", help="compare fumus/baseline ratios instead of times"
+    )
+    parser.add_argument("--all", action="store_true", help="show unchanged results as well")
+    args = parser.parse_args(argv)
+
+    rows = compare(load(args.old), load(args.new), args.relative)
+    regressions = 0
+    for case, size, metric, old_value, new_value, change in rows:
+        if change > args.threshold:
+            status = "REGRESSION"
+            regressions += 1
+        elif change < -args.threshold:
+            status = "improvement"
+        elif args.all:
+            status = ""
+        else:
+            continue
+        print(
+            f"{case:<40} {size:<7} {metric:<12} {old_value:>12.6g} -> {new_value:<12.6g}"
+            f" {change:+7.1%} {status}"
+        )
+    print(
+        f"{len(rows)} metrics compared, {regressions} regressions (threshold {args.threshold:.0%})"
+    )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
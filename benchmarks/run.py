@@ -0,0 +1,114 @@
+"""
+Times every benchmark case (fumus operation vs. its plain-Python baseline) and saves the results as JSON.
+Run from the repository root with:
+python -m benchmarks.run [--sizes small medium large] [--filter map] [--output results.json]
+(fumus installed, e.g. via "pip install -e .")
+"""
+
+import argparse
+import gc
+import json
+import platform
+import re
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from benchmarks.cases import CASES
+
+SIZES = {"small": 10, "medium": 10_000, "large": 10_000_000}
+# large inputs take minutes and several GB -> opt-in only
+DEFAULT_SIZES = ("small", "medium")
+
+
+def measure_time(function, data, min_time=0.2, max_repeats=1000):
+    """Returns the best wall time of a single call - repeated until 'min_time' seconds are spent"""
+    best = float("inf")
+    total = 0.0
+    repeats = 0
+    clock = time.perf_counter
+    while repeats < max_repeats and (total < min_time or repeats < 3):
+        start = clock()
+        function(data)
+        elapsed = clock() - start
+        best = min(best, elapsed)
+        total += elapsed
+        repeats += 1
+    return best
+
+
+def measure_memory(function, data):
+    """Returns the peak memory (in bytes) allocated during a single call"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        function(data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_case(case, size, n, min_time):
+    data = case.data(n)
+    result = {"case": case.name, "size": size, "n": n}
+    for side in ("fumus", "baseline"):
+        function = getattr(case, side)
+        result[side] = {
+            "time": measure_time(function, data, min_time),
+            "peak_memory": measure_memory(function, data),
+        }
+    baseline_time = result["baseline"]["time"]
+    result["ratio"] = result["fumus"]["time"] / baseline_time if baseline_time else None
+    return result
+
+
+def run(sizes, pattern=None, min_time=0.2, verbose=True):
+    """Runs the cases matching 'pattern' on given sizes; returns the results document"""
+    cases = [case for case in CASES if not pattern or re.search(pattern, case.name)]
+    results = []
+    for size in sizes:
+        n = SIZES[size]
+        for case in cases:
+            result = run_case(case, size, n, min_time)
+            results.append(result)
+            if verbose:
+                print(
+                    f"{case.name:<40} {size:<7} fumus: {result['fumus']['time']:.6f}s"
+                    f"  baseline: {result['baseline']['time']:.6f}s"
+                    f"  ratio: {result['ratio'] or float('nan'):.2f}",
+                    flush=True,
+                )
+    return {
+        "metadata": {
+            "python": sys.version,
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "date": datetime.now(timezone.utc).isoformat(),
+            "sizes": {size: SIZES[size] for size in sizes},
+        },
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", choices=SIZES, default=DEFAULT_SIZES)
+    parser.add_argument(
+        "--filter", help="regex selecting the cases to run, e.g. 'Query\\.(map|filter)$'"
+    )
+    parser.add_argument(
+        "--min-time", type=float, default=0.2, help="seconds spent timing each call"
+    )
+    parser.add_argument("--output", default="results.json")
+    args = parser.parse_args(argv)
+
+    document = run(args.sizes, args.filter, args.min_time)
+    with open(args.output, "w") as f:
+        json.dump(document, f, indent=2)
+    print(f"{len(document['results'])} results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
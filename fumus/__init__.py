@@ -1 +1,12 @@
-from fumus.queries.query import Query as Query
+from fumus.utils.lazy import lazy_exports
+
+# submodules are imported on first access -> "import fumus" stays cheap
+_EXPORTS = {"Query": "fumus.queries.query"}
+
+# static re-exports for type checkers and IDEs - never executed at runtime
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from fumus.queries.query import Query as Query
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -18,24 +18,38 @@ TERMINAL_FUNCTIONS = [
     "any_match",
     "all_match",
     "none_match",
+    "contains",
     "compare_with",
     "all_equal",
     "quantify",
+    "broadcast",
     "group_by",
     "collect",
     "to_list",
+    "to_array",
     "to_tuple",
     "to_set",
     "to_dict",
     "to_string",
+    "to_table",
+    "cache",
 ]
 
 
-def pre_call(function_decorator):
+# functions that can be called on consumed queries
+CONSUMED_ALLOWED_FUNCTIONS = ["close", "explain", "explain_analyze"]
+
+
+def pre_call(*function_decorators):
+    """Applies given decorators (the first one being the outermost) to all methods of the class"""
+
     def decorator(cls):
         for name, obj in vars(cls).items():
-            if callable(obj):
-                setattr(cls, name, function_decorator(obj))
+            # NB: staticmethod objects are callable but cannot be wrapped as plain functions
+            if callable(obj) and not isinstance(obj, staticmethod):
+                for function_decorator in reversed(function_decorators):
+                    obj = function_decorator(obj)
+                setattr(cls, name, obj)
         return cls
 
     return decorator
@@ -51,7 +65,7 @@ def handle_consumed(func):
             return func(*args, **kw)
 
         is_consumed = getattr(query, "_is_consumed", None)
-        if is_consumed and func.__name__ != "close":
+        if is_consumed and func.__name__ not in CONSUMED_ALLOWED_FUNCTIONS:
             raise IllegalStateError("Query object already consumed")
 
         result = func(*args, **kw)
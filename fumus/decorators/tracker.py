@@ -0,0 +1,75 @@
+import time
+from functools import wraps
+
+from fumus.decorators.handler import TERMINAL_FUNCTIONS
+from fumus.instrumentation.plan import Plan
+
+# public methods that configure or inspect the query instead of adding a stage to it
+NON_STAGE_FUNCTIONS = [
+    "instrument",
+    "trace",
+    "with_memory_budget",
+    "explain",
+    "explain_analyze",
+    "on_close",
+    "close",
+]
+# terminal operations whose result keeps reading the query lazily -> its stages must stay open
+LAZY_TERMINAL_FUNCTIONS = ["cache"]
+
+
+def track_stage(func):
+    """Records the stages of the query plan (and measures or traces them if the query is instrumented or traced)"""
+    name = func.__name__
+    if name.startswith("_") or name in NON_STAGE_FUNCTIONS:
+        return func
+    is_terminal = name in TERMINAL_FUNCTIONS
+
+    @wraps(func)
+    def wrapper(query, *args, **kw):
+        # called internally by another stage -> recorded once as the outer one
+        if query._is_tracking:
+            return func(query, *args, **kw)
+
+        profile, tracing = query._profile, query._tracing
+        source = query._iterable
+        query._is_tracking = True
+        if profile is None and tracing is None:
+            # neither instrumented nor traced -> only the plan is recorded
+            try:
+                result = func(query, *args, **kw)
+            finally:
+                query._is_tracking = False
+            if result is query and not is_terminal:
+                _record_stage(query, source, name, args, kw)
+            return result
+
+        start = time.perf_counter()
+        try:
+            result = func(query, *args, **kw)
+        finally:
+            query._is_tracking = False
+        # read before any bookkeeping -> only the stage itself is measured
+        elapsed = time.perf_counter() - start
+
+        if is_terminal:
+            if profile:
+                profile.add_terminal(name, args, kw, elapsed)
+            if tracing:
+                iterable = None if name in LAZY_TERMINAL_FUNCTIONS else query._iterable
+                tracing.end_query(name, args, kw, iterable, elapsed)
+        elif result is query:
+            _record_stage(query, source, name, args, kw)
+            if profile:
+                query._iterable = profile.add_stage(name, args, kw, query._iterable, elapsed)
+            if tracing:
+                query._iterable = tracing.wrap(name, args, kw, query._iterable, elapsed)
+        return result
+
+    return wrapper
+
+
+def _record_stage(query, source, name, args, kw):
+    if query._plan is None:
+        query._plan = Plan(source)
+    query._plan.add_stage(name, args, kw, query._iterable)
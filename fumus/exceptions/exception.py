@@ -12,3 +12,15 @@ class NoSuchElementError(ValueError):
 
 class UnsupportedTypeError(TypeError):
     pass
+
+
+class BackpressureError(IllegalStateError):
+    pass
+
+
+class UnsortedInputError(ValueError):
+    pass
+
+
+class MemoryBudgetError(IllegalStateError):
+    pass
@@ -0,0 +1,27 @@
+from fumus.utils.lazy import lazy_exports
+
+_EXPORTS = {
+    "MemoryAccounting": "fumus.instrumentation.memory",
+    "Plan": "fumus.instrumentation.plan",
+    "Stage": "fumus.instrumentation.plan",
+    "Profile": "fumus.instrumentation.profile",
+    "StageStats": "fumus.instrumentation.profile",
+    "Tracer": "fumus.instrumentation.tracer",
+    "get_tracer": "fumus.instrumentation.tracer",
+    "set_tracer": "fumus.instrumentation.tracer",
+}
+
+# static re-exports for type checkers and IDEs - never executed at runtime
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from fumus.instrumentation.memory import MemoryAccounting as MemoryAccounting
+    from fumus.instrumentation.plan import Plan as Plan, Stage as Stage
+    from fumus.instrumentation.profile import Profile as Profile, StageStats as StageStats
+    from fumus.instrumentation.tracer import (
+        Tracer as Tracer,
+        get_tracer as get_tracer,
+        set_tracer as set_tracer,
+    )
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,105 @@
+import sys
+
+from fumus.exceptions.exception import MemoryBudgetError
+
+
+class MemoryStats:
+    """Element count and approximate size (shallow sys.getsizeof) of the data held by a materializing stage"""
+
+    __slots__ = ("name", "elements", "bytes", "peak_elements", "peak_bytes", "spilled_elements")
+
+    def __init__(self, name):
+        self.name = name
+        self.elements = 0
+        self.bytes = 0
+        self.peak_elements = 0
+        self.peak_bytes = 0
+        self.spilled_elements = 0
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}({self.name}, peak_elements={self.peak_elements}, "
+            f"peak_bytes={self.peak_bytes})"
+        )
+
+
+class MemoryAccounting:
+    """
+    Tracks the data held by the materializing stages of a query.
+    If a 'budget' (in bytes) is given, stages exceeding it in total raise MemoryBudgetError -
+    unless they have an external algorithm to spill to disk instead (e.g. sort)
+    """
+
+    __slots__ = ("budget", "stages", "current_bytes")
+
+    def __init__(self, budget=None):
+        if budget is not None and budget < 0:
+            raise ValueError("Memory budget cannot be negative")
+        self.budget = budget
+        self.stages = []
+        self.current_bytes = 0
+
+    def stage(self, name):
+        """Registers a materializing stage"""
+        stats = MemoryStats(name)
+        self.stages.append(stats)
+        return stats
+
+    def fits(self, size):
+        """Returns bool whether 'size' more bytes fit into the budget"""
+        return self.budget is None or self.current_bytes + size <= self.budget
+
+    def add(self, stats, size, *, enforce=True):
+        """Accounts an element of given size held by the stage"""
+        if enforce and not self.fits(size):
+            raise MemoryBudgetError(
+                f"Stage '{stats.name}' exceeded the memory budget of {self.budget} bytes "
+                f"while holding {stats.elements} elements (~{stats.bytes} bytes)"
+            )
+        stats.elements += 1
+        stats.bytes += size
+        self.current_bytes += size
+        if stats.elements > stats.peak_elements:
+            stats.peak_elements = stats.elements
+        if stats.bytes > stats.peak_bytes:
+            stats.peak_bytes = stats.bytes
+
+    def remove(self, stats, size):
+        """Accounts an element of given size released by the stage"""
+        stats.elements -= 1
+        stats.bytes -= size
+        self.current_bytes -= size
+
+    def release(self, stats):
+        """Accounts all elements held by the stage as released (e.g. spilled to disk or done)"""
+        self.current_bytes -= stats.bytes
+        stats.elements = 0
+        stats.bytes = 0
+
+    def hold(self, iterable, stats):
+        """
+        Yields the elements of given iterable accounting each of them as held by the stage while it materializes them.
+        The elements are released once the input is exhausted (or the stage is closed) -
+        the materialized data is handed over downstream, so a chain of materializing stages doesn't add up
+        """
+        try:
+            for element in iterable:
+                self.add(stats, sys.getsizeof(element))
+                yield element
+        finally:
+            self.release(stats)
+
+    def to_dict(self):
+        """Returns the budget and the peak element count, bytes and spilled elements of each materializing stage"""
+        return {
+            "budget": self.budget,
+            "stages": [
+                {
+                    "name": stats.name,
+                    "peak_elements": stats.peak_elements,
+                    "peak_bytes": stats.peak_bytes,
+                    "spilled_elements": stats.spilled_elements,
+                }
+                for stats in self.stages
+            ],
+        }
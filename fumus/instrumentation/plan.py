@@ -0,0 +1,93 @@
+from collections.abc import Iterator, Sized
+
+from fumus.instrumentation.profile import describe_stage
+
+# stages served by slicing a sized source
+SLICING_STAGES = {"skip", "limit", "head", "tail", "view"}
+
+
+class Stage:
+    """Metadata of a single query stage: operation name, parameters and the fast path applied (if any)"""
+
+    __slots__ = ("name", "args", "kwargs", "fast_path")
+
+    def __init__(self, name, args=(), kwargs=None, fast_path=None):
+        self.name = name
+        self.args = args
+        self.kwargs = kwargs or {}
+        self.fast_path = fast_path
+
+    @property
+    def label(self):
+        return describe_stage(self.name, self.args, self.kwargs)
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.label})"
+
+
+class Plan:
+    """
+    Logical plan of a query - the source and the stages added to it (recorded at call time, not at execution).
+    Only the stage parameters and the type of their outputs are kept - the fast paths are derived when rendered
+    """
+
+    __slots__ = ("source", "stages")
+
+    def __init__(self, source):
+        # (type, length) - the source itself isn't referenced
+        self.source = (type(source), len(source) if hasattr(source, "__len__") else None)
+        # (name, args, kwargs, output type) tuples
+        self.stages = []
+
+    def add_stage(self, name, args, kwargs, result):
+        output_type = type(result)
+        if output_type is tuple and result and isinstance(result[0], Iterator):
+            # pair of lazy iterators (e.g. 'partition') -> nothing is materialized
+            output_type = Iterator
+        self.stages.append((name, args, kwargs, output_type))
+
+    def render(self):
+        """Returns the plan as tree - the last stage on top, the source at the bottom"""
+        source_type, length = self.source
+        label = (
+            f"<{source_type.__name__}>" if length is None else f"{source_type.__name__}[{length}]"
+        )
+        nodes = [f"source({label})"]
+        output_type = source_type
+        for name, args, kwargs, result_type in self.stages:
+            stage = Stage(name, args, kwargs, detect_fast_path(name, output_type, result_type))
+            note = f"  [{stage.fast_path}]" if stage.fast_path else ""
+            nodes.append(f"{stage.label}{note}")
+            output_type = result_type
+        lines = [
+            f"{'   ' * (depth - 1) + '└─ ' if depth else ''}{node}"
+            for depth, node in enumerate(reversed(nodes))
+        ]
+        terminal_note = describe_terminal_fast_path(output_type)
+        if terminal_note:
+            lines.append(f"terminal operations: {terminal_note}")
+        return "\n".join(lines)
+
+
+def detect_fast_path(name, source_type, result_type):
+    """Describes how a stage turned its input into the result (given by their types) - None for lazy stages"""
+    if not issubclass(result_type, Sized):
+        return None
+    if result_type.__module__ == "numpy":
+        return "vectorized (NumPy)"
+    if source_type is range and result_type is range:
+        return "symbolic range, no iteration"
+    if name in SLICING_STAGES and issubclass(source_type, Sized):
+        return "sequence slicing, no iteration"
+    return f"materialized into {result_type.__name__}"
+
+
+def describe_terminal_fast_path(output_type):
+    """Describes the shortcuts the terminal operations can take on given (final) stage output type"""
+    if output_type is range:
+        return "count, sum, average, min, max in closed form; contains in O(1)"
+    if output_type.__module__ == "numpy":
+        return "count, sum, average, min, max vectorized"
+    if issubclass(output_type, Sized):
+        return "count via len(), take_last/take_nth by indexing"
+    return None
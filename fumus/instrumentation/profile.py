@@ -0,0 +1,165 @@
+import functools
+import time
+from collections.abc import Sized
+
+
+class StageStats:
+    """
+    Counters of a single instrumented stage.
+    'time' is inclusive - for lazy stages it contains the time spent in the upstream stages as well
+    """
+
+    __slots__ = ("name", "label", "elements_out", "time", "is_lazy")
+
+    def __init__(self, name, label=None):
+        self.name = name
+        self.label = label or name
+        self.elements_out = 0
+        self.time = 0.0
+        self.is_lazy = False
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.label}, out={self.elements_out}, time={self.time:.6f})"
+
+
+class Profile:
+    """Per-stage element counts and timings of an instrumented query"""
+
+    __slots__ = ("stages", "terminal")
+
+    def __init__(self):
+        self.stages = []
+        self.terminal = None
+
+    def add_source(self, iterable):
+        """Records the source of the query; returns the (possibly measured) iterable"""
+        stats = StageStats("source", f"source({describe_value(iterable)})")
+        return self._measure(stats, iterable)
+
+    def add_stage(self, name, args, kwargs, iterable, elapsed=0.0):
+        """Records a stage; returns the (possibly measured) output iterable of the stage"""
+        stats = StageStats(name, describe_stage(name, args, kwargs))
+        stats.time = elapsed
+        return self._measure(stats, iterable)
+
+    def add_terminal(self, name, args, kwargs, elapsed):
+        """Records the terminal operation"""
+        self.terminal = StageStats(name, describe_stage(name, args, kwargs))
+        self.terminal.time = elapsed
+
+    def _measure(self, stats, iterable):
+        self.stages.append(stats)
+        if isinstance(iterable, Sized):
+            # materialized output (or a fast path) -> no per-element measuring needed
+            stats.elements_out = len(iterable)
+            return iterable
+        stats.is_lazy = True
+        return measure(iterable, stats)
+
+    def to_dict(self):
+        """
+        Returns the profile as dict: a list of stages (in pipeline order, incl. the terminal operation)
+        with their elements in/out, inclusive and self time (in seconds), self time per input element
+        and the estimated instrumentation overhead
+        """
+        per_element_overhead = element_overhead()
+        stages = []
+        previous = None
+        for stats in self.stages + ([self.terminal] if self.terminal else []):
+            elements_in = previous.elements_out if previous else stats.elements_out
+            upstream_time = previous.time if previous and previous.is_lazy else 0.0
+            self_time = max(0.0, stats.time - upstream_time)
+            stages.append(
+                {
+                    "name": stats.name,
+                    "label": stats.label,
+                    "elements_in": elements_in,
+                    "elements_out": stats.elements_out if stats is not self.terminal else None,
+                    "time": stats.time,
+                    "self_time": self_time,
+                    "time_per_element": self_time / elements_in if elements_in else 0.0,
+                    "overhead": stats.elements_out * per_element_overhead if stats.is_lazy else 0.0,
+                }
+            )
+            previous = stats
+        return {
+            "stages": stages,
+            "total_time": stages[-1]["time"] if stages else 0.0,
+            "overhead": sum(stage["overhead"] for stage in stages),
+        }
+
+    def render(self):
+        """Returns the profile as plan tree - the terminal operation on top, the source at the bottom"""
+        profile = self.to_dict()
+        lines = []
+        for depth, stage in enumerate(reversed(profile["stages"])):
+            prefix = "   " * (depth - 1) + "└─ " if depth else ""
+            out = "" if stage["elements_out"] is None else f" out={stage['elements_out']}"
+            lines.append(
+                f"{prefix}{stage['label']}  in={stage['elements_in']}{out}"
+                f" time={_format_time(stage['time'])} self={_format_time(stage['self_time'])}"
+                f" ({_format_time(stage['time_per_element'])}/element)"
+            )
+        lines.append(f"instrumentation overhead: ~{_format_time(profile['overhead'])}")
+        return "\n".join(lines)
+
+
+def measure(iterable, stats):
+    """Yields the elements of given iterable counting them and the time spent in producing them"""
+    iterator = iter(iterable)
+    clock = time.perf_counter
+    while True:
+        start = clock()
+        try:
+            element = next(iterator)
+        except StopIteration:
+            stats.time += clock() - start
+            return
+        stats.time += clock() - start
+        stats.elements_out += 1
+        yield element
+
+
+@functools.cache
+def element_overhead(sample_size=10_000):
+    """Estimates (once per process) the cost of measuring a single element"""
+    clock = time.perf_counter
+    start = clock()
+    for _ in measure(range(sample_size), StageStats("calibration")):
+        pass
+    measured = clock() - start
+    start = clock()
+    for _ in range(sample_size):
+        pass
+    return max(0.0, (measured - (clock() - start)) / sample_size)
+
+
+def describe_stage(name, args, kwargs):
+    """Returns a short label of a stage call e.g. 'map(<lambda>)'"""
+    params = [describe_value(arg) for arg in args]
+    params.extend(f"{key}={describe_value(value)}" for key, value in kwargs.items())
+    return f"{name}({', '.join(params)})"
+
+
+def describe_value(value, max_length=40):
+    """Returns a short description of a stage parameter - names of callables, sizes of collections"""
+    if isinstance(value, (str, bytes, int, float, bool, type(None))):
+        text = repr(value)
+    elif callable(value) and hasattr(value, "__name__"):
+        return value.__name__
+    elif isinstance(value, Sized) and not callable(value):
+        # don't pay for the repr of a large collection
+        return f"{type(value).__name__}[{len(value)}]"
+    elif callable(value):
+        text = repr(value)
+    else:
+        return f"<{type(value).__name__}>"
+    return text if len(text) <= max_length else f"{text[: max_length - 3]}..."
+
+
+def _format_time(seconds):
+    if seconds >= 1:
+        return f"{seconds:.3f}s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.3f}ms"
+    return f"{seconds * 1e6:.3f}us"
@@ -0,0 +1,114 @@
+import time
+from collections.abc import Sized
+
+from fumus.instrumentation.profile import StageStats, describe_stage
+
+
+class Tracer:
+    """
+    Base class of tracers plugged into query execution - override the callbacks of interest.
+    Each callback receives the StageStats of the stage (name, label, elements_out and time in seconds)
+    """
+
+    def on_stage_start(self, stage):
+        """Called when the first element is pulled from the stage"""
+
+    def on_batch(self, stage):
+        """Called every 'batch_size' elements produced by the stage"""
+
+    def on_stage_end(self, stage):
+        """Called when the stage is exhausted (or closed early, e.g. by a downstream 'limit')"""
+
+    def on_terminal(self, stage):
+        """Called when the terminal operation of the query completes"""
+
+
+class Tracing:
+    """Tracer attached to a query together with its sampling options"""
+
+    __slots__ = ("tracer", "sample_rate", "batch_size")
+
+    def __init__(self, tracer, sample_rate=1.0, batch_size=1024):
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("Sample rate must be between 0 and 1")
+        if not isinstance(batch_size, int) or batch_size < 1:
+            raise ValueError("Batch size must be a positive integer")
+        self.tracer = tracer
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+
+    def sample(self):
+        """Returns self for the sampled queries, None for the rest"""
+        if self.sample_rate >= 1:
+            return self
+        import random
+
+        return self if random.random() < self.sample_rate else None
+
+    def wrap(self, name, args, kwargs, iterable, elapsed=0.0):
+        """Returns the output iterable of a stage reporting its progress to the tracer"""
+        stats = StageStats(name, describe_stage(name, args, kwargs))
+        if isinstance(iterable, Sized):
+            # materialized output (or a fast path) -> the stage is already done
+            stats.elements_out = len(iterable)
+            stats.time = elapsed
+            self.tracer.on_stage_start(stats)
+            self.tracer.on_stage_end(stats)
+            return iterable
+        return trace(iterable, stats, self.tracer, self.batch_size)
+
+    def end_query(self, name, args, kwargs, iterable, elapsed):
+        """
+        Closes the traced stages still open and reports the terminal operation
+        ('iterable' is None for terminals whose result keeps reading the stages, e.g. 'cache')
+        """
+        close = getattr(iterable, "close", None)
+        if close:
+            close()
+        stats = StageStats(name, describe_stage(name, args, kwargs))
+        stats.time = elapsed
+        self.tracer.on_terminal(stats)
+
+
+def trace(iterable, stats, tracer, batch_size):
+    """
+    Yields the elements of given iterable counting them and notifying the tracer.
+    Only a counter is updated per element - the clock is read at the batch boundaries,
+    so 'time' is the wall time since the first element was pulled
+    """
+    clock = time.perf_counter
+    tracer.on_stage_start(stats)
+    start = clock()
+    try:
+        for element in iterable:
+            stats.elements_out += 1
+            if not stats.elements_out % batch_size:
+                stats.time = clock() - start
+                tracer.on_batch(stats)
+            yield element
+    finally:
+        stats.time = clock() - start
+        tracer.on_stage_end(stats)
+
+
+_global_tracing = None
+
+
+def set_tracer(tracer, *, sample_rate=1.0, batch_size=1024):
+    """
+    Sets a tracer for all queries created from now on (None removes it).
+    Only the 'sample_rate' fraction of the queries is traced;
+    'on_batch' is called every 'batch_size' elements of a stage
+    """
+    global _global_tracing
+    _global_tracing = Tracing(tracer, sample_rate, batch_size) if tracer else None
+
+
+def get_tracer():
+    """Returns the global tracer (or None)"""
+    return _global_tracing.tracer if _global_tracing else None
+
+
+def sample_global_tracing():
+    """Returns the global tracing if the query being created is sampled, None otherwise"""
+    return _global_tracing.sample() if _global_tracing else None
@@ -1 +1,21 @@
-from .query import Query as Query
+from fumus.utils.lazy import lazy_exports
+
+_EXPORTS = {
+    "Query": "fumus.queries.query",
+    "QueryCache": "fumus.queries.query_cache",
+    "Collector": "fumus.queries.collector",
+    "Table": "fumus.queries.table",
+    "register_itertool": "fumus.queries.itertools_mixin",
+}
+
+# static re-exports for type checkers and IDEs - never executed at runtime
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from fumus.queries.query import Query as Query
+    from fumus.queries.query_cache import QueryCache as QueryCache
+    from fumus.queries.collector import Collector as Collector
+    from fumus.queries.table import Table as Table
+    from fumus.queries.itertools_mixin import register_itertool as register_itertool
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
@@ -0,0 +1,104 @@
+from fumus.utils import Optional
+
+
+class Collector:
+    """
+    Reduction operation that accumulates the elements of a query pushed to it one at a time.
+    The 'supplier' creates the initial state, the 'accumulator' receives the current state and an element
+    and returns the new state, and the optional 'finisher' transforms the final state into the result
+    """
+
+    __slots__ = ("supplier", "accumulator", "finisher")
+
+    def __init__(self, supplier, accumulator, finisher=None):
+        self.supplier = supplier
+        self.accumulator = accumulator
+        self.finisher = finisher
+
+    def finish(self, state):
+        """Transforms the accumulated state into the final result"""
+        return self.finisher(state) if self.finisher else state
+
+    @classmethod
+    def of(cls, consumer):
+        """Returns given Collector or wraps a plain function into a 'for_each' collector"""
+        if isinstance(consumer, Collector):
+            return consumer
+        if callable(consumer):
+            return cls.for_each(consumer)
+        raise TypeError(f"Cannot create Collector from '{consumer.__class__.__name__}' type")
+
+    @classmethod
+    def counting(cls):
+        """Counts the elements"""
+        return cls(lambda: 0, lambda acc, _: acc + 1)
+
+    @classmethod
+    def summing(cls):
+        """Sums the elements"""
+        return cls(lambda: 0, lambda acc, x: acc + x)
+
+    @classmethod
+    def averaging(cls):
+        """Returns the average value of the elements (or 0 if there are none)"""
+        return cls(
+            lambda: (0, 0),
+            lambda acc, x: (acc[0] + x, acc[1] + 1),
+            lambda acc: acc[0] / acc[1] if acc[1] else 0,
+        )
+
+    @classmethod
+    def min_by(cls, comparator=None):
+        """Returns Optional with the minimum element according to the given comparator"""
+        return cls._extremum(comparator, lambda x, y: x < y)
+
+    @classmethod
+    def max_by(cls, comparator=None):
+        """Returns Optional with the maximum element according to the given comparator"""
+        return cls._extremum(comparator, lambda x, y: x > y)
+
+    @classmethod
+    def _extremum(cls, comparator, is_better):
+        key = comparator or (lambda x: x)
+        missing = object()
+
+        def _accumulate(acc, x):
+            if acc is missing:
+                return x, key(x)
+            k = key(x)
+            return (x, k) if is_better(k, acc[1]) else acc
+
+        return cls(
+            lambda: missing,
+            _accumulate,
+            lambda acc: Optional.empty() if acc is missing else Optional.of_nullable(acc[0]),
+        )
+
+    @classmethod
+    def reducing(cls, accumulator, identity=None):
+        """Reduces the elements by repeatedly applying the accumulator; returns Optional with the result"""
+        missing = object()
+
+        def _accumulate(acc, x):
+            return x if acc is missing else accumulator(acc, x)
+
+        return cls(
+            lambda: missing if identity is None else identity,
+            _accumulate,
+            lambda acc: Optional.empty() if acc is missing else Optional.of_nullable(acc),
+        )
+
+    @classmethod
+    def to_list(cls):
+        """Collects the elements into a list"""
+        return cls(list, lambda acc, x: acc.append(x) or acc)
+
+    @classmethod
+    def to_set(cls):
+        """Collects the elements into a set"""
+        return cls(set, lambda acc, x: acc.add(x) or acc)
+
+    @classmethod
+    def for_each(cls, operation):
+        """Performs an action for each element; the result is None"""
+        return cls(lambda: None, lambda acc, x: operation(x), lambda _: None)
@@ -1,64 +1,52 @@
+import array
+import builtins
+import functools
 import itertools as it
 import operator
 
+from fumus.decorators.handler import pre_call
+from fumus.decorators.tracker import track_stage
+from fumus.exceptions.exception import BackpressureError
+from fumus.queries.collector import Collector
+from fumus.queries.sequence_view import SequenceView, slice_sequence
 from fumus.utils import Optional
 
 
-class ItertoolsMixin:
-    NO_SIGNATURE_FUNCTIONS = {"chain", "islice", "product", "repeat", "zip_longest"}
-    NO_KWARGS_FUNCTIONS = {"dropwhile", "filterfalse", "starmap", "takewhile", "tee"}
-
-    iterable = None
-
-    def use(self, it_function, **kwargs):
-        """Provides integration with itertools methods; pass corresponding parameters as kwargs"""
-        import inspect
+NO_SIGNATURE_FUNCTIONS = {"chain", "islice", "product", "repeat", "zip_longest"}
+NO_KWARGS_FUNCTIONS = {"dropwhile", "filterfalse", "starmap", "takewhile", "tee"}
+# sized, indexable sources whose slices are of the same kind -> served without per-element iteration
+SEQUENCE_TYPES = (list, tuple, range, str, bytes, array.array, SequenceView)
 
-        if self._handle_no_signature_functions(it_function, **kwargs):
-            return self
 
-        signature = inspect.signature(it_function).parameters
-        if self._handle_no_kwargs_functions(signature, it_function, **kwargs):
-            return self
+@pre_call(track_stage)
+class ItertoolsMixin:
+    # kept as class attributes for backward compatibility
+    NO_SIGNATURE_FUNCTIONS = NO_SIGNATURE_FUNCTIONS
+    NO_KWARGS_FUNCTIONS = NO_KWARGS_FUNCTIONS
 
-        return self._handle_default_signature_functions(signature, it_function, **kwargs)
+    iterable = None
+    _iterable = None
+    _memory = None
+    # stages are recorded by Query only
+    _is_tracking = True
 
-    def _handle_no_signature_functions(self, it_function, **kwargs):
-        if it_function.__name__ not in self.NO_SIGNATURE_FUNCTIONS:
-            return False
+    def _materialized_input(self, name):
+        # the stage is about to hold all its input elements at once -> account them (if enabled)
+        if self._memory is None:
+            return self.iterable
+        return self._memory.hold(self.iterable, self._memory.stage(name))
 
-        if it_function.__name__ in ("product", "zip_longest"):
-            if isinstance(self.iterable, range):
-                self.iterable = it_function(self.iterable, **kwargs)
-            else:
-                self.iterable = it_function(*self.iterable, **kwargs)
-            return True
-
-        # functions like 'chain' don't expect key-word arguments
-        self.iterable = it_function(self.iterable, *kwargs.values())
-        return True
-
-    def _handle_no_kwargs_functions(self, signature, it_function, **kwargs):
-        # handle functions that take only iterable as arg
-        if len(signature.keys()) == 1 and "iterable" in signature:
-            self.iterable = it_function(self.iterable)
-            return True
-
-        # handle functions that take no kwargs
-        if it_function.__name__ in self.NO_KWARGS_FUNCTIONS:
-            if it_function.__name__ == "tee":
-                self.iterable = it_function(self.iterable, *kwargs.values())
-            else:
-                self.iterable = it_function(*kwargs.values(), self.iterable)
-            return True
-        return False
+    def _is_sequence(self):
+        return isinstance(self._iterable, SEQUENCE_TYPES)
 
-    def _handle_default_signature_functions(self, signature, it_function, **kwargs):
-        if "iterable" in signature:
-            kwargs["iterable"] = self.iterable
-        elif "data" in signature:
-            kwargs["data"] = self.iterable
-        self.iterable = it_function(**kwargs)
+    def use(self, it_function, **kwargs):
+        """Provides integration with itertools methods; pass corresponding parameters as kwargs"""
+        try:
+            adapter = _ITERTOOLS_ADAPTERS.get(it_function) or _resolve_adapter(it_function)
+        except TypeError:
+            # unhashable callable -> can't be looked up nor cached, resolved on every call
+            adapter = _resolve_adapter.__wrapped__(it_function)
+        self.iterable = adapter(self.iterable, **kwargs)
         return self
 
     # ### 'recipes' ###
@@ -75,7 +63,9 @@ class ItertoolsMixin:
 
     def ncycles(self, count=0):
         """Returns the query elements n times"""
-        self.iterable = it.chain.from_iterable(it.repeat(tuple(self.iterable), count))
+        self.iterable = it.chain.from_iterable(
+            it.repeat(tuple(self._materialized_input("ncycles")), count)
+        )
         return self
 
     def consume(self, n=None):
@@ -87,11 +77,19 @@ class ItertoolsMixin:
             return self
         if n < 0:
             raise ValueError("Consume boundary cannot be negative")
+        if self._is_sequence():
+            self.iterable = slice_sequence(self.iterable, slice(n, None))
+            return self
         self.iterable = it.islice(self.iterable, n, len(self.iterable))
         return self
 
     def take_nth(self, idx, default=None):
         """Returns Optional with the nth element of the query or a default value"""
+        if self._is_sequence():
+            try:
+                return Optional.of_nullable(self.iterable[idx])
+            except IndexError:
+                return Optional.of_nullable(default)
         if idx < 0:
             idx = len(self.iterable) + idx
         return Optional.of_nullable(next(it.islice(self.iterable, idx, None), default))
@@ -111,13 +109,18 @@ class ItertoolsMixin:
         if step and step < 0:
             raise ValueError("Step must be a positive integer or None")
 
+        if self._is_sequence():
+            self.iterable = slice_sequence(self.iterable, slice(start, stop, step))
+            return self
         self.iterable = it.islice(self.iterable, start, stop, step)
         return self
 
     # ### unique ###
     def unique(self, key=None, reverse=False):
         """Yields unique elements in sorted order. Supports unhashable inputs"""
-        self.iterable = self._unique(sorted(self.iterable, key=key, reverse=reverse), key=key)
+        self.iterable = self._unique(
+            sorted(self._materialized_input("unique"), key=key, reverse=reverse), key=key
+        )
         return self
 
     @staticmethod
@@ -179,6 +182,81 @@ class ItertoolsMixin:
                     f"Invalid incomplete flag '{incomplete}', expected: 'fill', 'strict', or 'ignore'"
                 )
 
+    def batched(self, n, *, strict=False, chunk_type=tuple, typecode=None):
+        """
+        Collects data into non-overlapping chunks of length n; the last chunk may be shorter.
+        If 'strict' flag is True, raises ValueError in case of an incomplete last chunk.
+        Chunks are tuples by default; 'chunk_type' could also be list, array.array or memoryview
+        (for the last two the 'typecode' is taken from the source if it is an array or must be provided;
+        array chunks of another typecode are converted, memoryview chunks must match the format of a buffer source)
+        """
+        self.iterable = self._batched(self.iterable, n, strict, chunk_type, typecode)
+        return self
+
+    @classmethod
+    def _batched(cls, iterable, n, strict=False, chunk_type=tuple, typecode=None):
+        if n < 1:
+            raise ValueError("n must be at least one")
+        if chunk_type not in (tuple, list, array.array, memoryview):
+            raise ValueError(
+                f"Invalid chunk type '{chunk_type.__name__}', expected: tuple, list, array.array or memoryview"
+            )
+        if isinstance(iterable, SequenceView) and chunk_type in (array.array, memoryview):
+            # buffer chunks are slices of an actual array/bytes object
+            iterable = iterable.to_sequence()
+        if chunk_type is memoryview:
+            return cls._batched_memoryview(iterable, n, strict, typecode)
+        if chunk_type is array.array and isinstance(iterable, array.array):
+            if typecode in (None, iterable.typecode):
+                return cls._batched_view(iterable, n, strict)
+            # different typecode -> the elements are converted chunk by chunk below
+
+        batches = it.batched(iterable, n)
+        if strict:
+            batches = cls._strict_batches(batches, n)
+        match chunk_type:
+            case builtins.list:
+                return map(list, batches)
+            case array.array:
+                if typecode is None:
+                    raise ValueError("Typecode is required for array chunks")
+                return map(functools.partial(array.array, typecode), batches)
+        return batches
+
+    @classmethod
+    def _batched_memoryview(cls, iterable, n, strict=False, typecode=None):
+        if isinstance(iterable, (bytes, bytearray, memoryview, array.array)):
+            view = memoryview(iterable)
+            if typecode not in (None, view.format):
+                raise ValueError(
+                    f"Typecode '{typecode}' doesn't match the format '{view.format}' of the buffer source"
+                )
+            return cls._batched_view(view, n, strict)
+        if typecode is None:
+            raise ValueError("Typecode is required for memoryview chunks over a non-buffer source")
+        return cls._batched_array_view(iterable, n, strict, typecode)
+
+    @classmethod
+    def _batched_array_view(cls, iterable, n, strict, typecode):
+        # the source is materialized into a buffer on the first pull - not when the stage is defined
+        yield from cls._batched_view(memoryview(array.array(typecode, iterable)), n, strict)
+
+    @staticmethod
+    def _batched_view(sequence, n, strict=False):
+        # slicing a memoryview/array is done in C without iterating element by element
+        size = len(sequence)
+        if strict and size % n:
+            raise ValueError("batched(): incomplete batch")
+        for i in range(0, size, n):
+            yield sequence[i : i + n]
+
+    @staticmethod
+    def _strict_batches(batches, n):
+        for batch in batches:
+            if len(batch) != n:
+                raise ValueError("batched(): incomplete batch")
+            yield batch
+
     def round_robin(self):
         """Visits input iterables in a cycle until each is exhausted"""
         self.iterable = self._round_robin(self.iterable)
@@ -192,15 +270,61 @@ class ItertoolsMixin:
             iterators = it.cycle(it.islice(iterators, num_active))
             yield from map(next, iterators)
 
-    def partition(self, predicate):
+    def partition(self, predicate, *, mode="lazy", collector=None, buffer_size=None):
         """
         Partitions entries into true and false entries.
-        Returns a query of two nested generators
+        Returns a query of two nested iterables depending on the 'mode':
+        'lazy' - two generators sharing an itertools.tee (the predicate is evaluated on both sides);
+        'eager' - the predicate is evaluated once per element in a single pass
+        and both sides are collected into lists (or via given 'collector');
+        'bounded' - two generators sharing a single pass (the predicate is evaluated once per element);
+        elements waiting for the other side are buffered up to 'buffer_size'
+        and BackpressureError is raised beyond that limit (no element is lost - after draining the other side
+        the raising one can be iterated further)
         """
-        true_iter, false_iter = it.tee(self.iterable)
-        self.iterable = filter(predicate, true_iter), it.filterfalse(predicate, false_iter)
+        match mode:
+            case "lazy":
+                true_iter, false_iter = it.tee(self.iterable)
+                self.iterable = filter(predicate, true_iter), it.filterfalse(predicate, false_iter)
+            case "eager":
+                self.iterable = self._eager_partition(
+                    self._materialized_input("partition"), predicate, collector
+                )
+            case "bounded":
+                if buffer_size is not None and buffer_size < 0:
+                    raise ValueError("Buffer size cannot be negative")
+                self.iterable = self._bounded_partition(self.iterable, predicate, buffer_size)
+            case _:
+                raise ValueError(
+                    f"Invalid partition mode '{mode}', expected: 'lazy', 'eager' or 'bounded'"
+                )
         return self
 
+    @staticmethod
+    def _eager_partition(iterable, predicate, collector=None):
+        # generator -> the upstream is read on the first pull, not when the stage is defined
+        collector = collector or Collector.to_list()
+        accumulator = collector.accumulator
+        true_state, false_state = collector.supplier(), collector.supplier()
+        for element in iterable:
+            if predicate(element):
+                true_state = accumulator(true_state, element)
+            else:
+                false_state = accumulator(false_state, element)
+        yield collector.finish(true_state)
+        yield collector.finish(false_state)
+
+    @staticmethod
+    def _bounded_partition(iterable, predicate, buffer_size=None):
+        import collections
+
+        iterator = iter(iterable)
+        true_buffer, false_buffer = collections.deque(), collections.deque()
+        return (
+            _PartitionSide(iterator, predicate, True, true_buffer, false_buffer, buffer_size),
+            _PartitionSide(iterator, predicate, False, false_buffer, true_buffer, buffer_size),
+        )
+
     def subslices(self):
         """Returns all contiguous non-empty sub-slices"""
         slices = it.starmap(slice, it.combinations(range(len(self.iterable) + 1), 2))
@@ -218,3 +342,151 @@ class ItertoolsMixin:
         for i, element in enumerate(iterator, start):
             if element is value or element == value:
                 yield i
+
+
+class _PartitionSide:
+    """
+    One side of a bounded partition. Not a generator - raising BackpressureError doesn't finish it:
+    the element exceeding the limit stays buffered, so both sides can be resumed once the other one is drained
+    """
+
+    __slots__ = (
+        "_iterator",
+        "_predicate",
+        "_wanted",
+        "_own_buffer",
+        "_other_buffer",
+        "_buffer_size",
+    )
+
+    def __init__(self, iterator, predicate, wanted, own_buffer, other_buffer, buffer_size):
+        self._iterator = iterator
+        self._predicate = predicate
+        self._wanted = wanted
+        self._own_buffer = own_buffer
+        self._other_buffer = other_buffer
+        self._buffer_size = buffer_size
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._own_buffer:
+            return self._own_buffer.popleft()
+        for element in self._iterator:
+            if bool(self._predicate(element)) is self._wanted:
+                return element
+            self._other_buffer.append(element)
+            if self._buffer_size is not None and len(self._other_buffer) > self._buffer_size:
+                raise BackpressureError(
+                    f"Partition buffer exceeded {self._buffer_size} elements; "
+                    "consume both sides in step or increase 'buffer_size'"
+                )
+        raise StopIteration
+
+
+# ### 'use' dispatch ###
+def register_itertool(it_function, adapter):
+    """
+    Registers how 'Query.use' should invoke given function.
+    The adapter receives the current iterable followed by the kwargs passed to 'use'
+    and returns the resulting iterable
+    """
+    _ITERTOOLS_ADAPTERS[it_function] = adapter
+    _resolve_adapter.cache_clear()
+
+
+def _positional_adapter(it_function):
+    # functions like 'chain' don't expect key-word arguments
+    def adapter(iterable, **kwargs):
+        return it_function(iterable, *kwargs.values())
+
+    return adapter
+
+
+def _unpacking_adapter(it_function):
+    def adapter(iterable, **kwargs):
+        if isinstance(iterable, range):
+            return it_function(iterable, **kwargs)
+        return it_function(*iterable, **kwargs)
+
+    return adapter
+
+
+def _iterable_only_adapter(it_function):
+    def adapter(iterable, **kwargs):
+        return it_function(iterable)
+
+    return adapter
+
+
+def _predicate_first_adapter(it_function):
+    def adapter(iterable, **kwargs):
+        return it_function(*kwargs.values(), iterable)
+
+    return adapter
+
+
+def _keyword_adapter(it_function, param=None):
+    def adapter(iterable, **kwargs):
+        if param:
+            kwargs[param] = iterable
+        return it_function(**kwargs)
+
+    return adapter
+
+
+@functools.lru_cache(maxsize=256)
+def _resolve_adapter(it_function):
+    # fallback for functions missing in the dispatch table -> introspected only once per function
+    import inspect
+
+    name = getattr(it_function, "__name__", None)
+    if name in NO_SIGNATURE_FUNCTIONS:
+        if name in ("product", "zip_longest"):
+            return _unpacking_adapter(it_function)
+        return _positional_adapter(it_function)
+
+    signature = inspect.signature(it_function).parameters
+    # handle functions that take only iterable as arg
+    if len(signature.keys()) == 1 and "iterable" in signature:
+        return _iterable_only_adapter(it_function)
+
+    # handle functions that take no kwargs
+    if name in NO_KWARGS_FUNCTIONS:
+        if name == "tee":
+            return _positional_adapter(it_function)
+        return _predicate_first_adapter(it_function)
+
+    if "iterable" in signature:
+        return _keyword_adapter(it_function, "iterable")
+    if "data" in signature:
+        return _keyword_adapter(it_function, "data")
+    return _keyword_adapter(it_function)
+
+
+_ITERTOOLS_ADAPTERS = {
+    it.accumulate: _keyword_adapter(it.accumulate, "iterable"),
+    it.batched: ItertoolsMixin._batched,
+    it.chain: _positional_adapter(it.chain),
+    it.chain.from_iterable: _iterable_only_adapter(it.chain.from_iterable),
+    it.combinations: _keyword_adapter(it.combinations, "iterable"),
+    it.combinations_with_replacement: _keyword_adapter(
+        it.combinations_with_replacement, "iterable"
+    ),
+    it.compress: _keyword_adapter(it.compress, "data"),
+    it.count: _keyword_adapter(it.count),
+    it.cycle: _iterable_only_adapter(it.cycle),
+    it.dropwhile: _predicate_first_adapter(it.dropwhile),
+    it.filterfalse: _predicate_first_adapter(it.filterfalse),
+    it.groupby: _keyword_adapter(it.groupby, "iterable"),
+    it.islice: _positional_adapter(it.islice),
+    it.pairwise: _iterable_only_adapter(it.pairwise),
+    it.permutations: _keyword_adapter(it.permutations, "iterable"),
+    it.product: _unpacking_adapter(it.product),
+    it.repeat: _positional_adapter(it.repeat),
+    it.starmap: _predicate_first_adapter(it.starmap),
+    it.takewhile: _predicate_first_adapter(it.takewhile),
+    it.tee: _positional_adapter(it.tee),
+    it.zip_longest: _unpacking_adapter(it.zip_longest),
+}
@@ -1,14 +1,26 @@
-from collections.abc import Mapping
-from functools import singledispatchmethod
+import array
+import collections
+from collections.abc import Mapping, Sized
 
+from fumus.queries import vectorized
 from fumus.queries.itertools_mixin import ItertoolsMixin
+from fumus.queries.collector import Collector
+from fumus.queries.query_cache import QueryCache
 from fumus.queries.query_generator import QueryGenerator
-from fumus.utils import Optional, DictItem
+from fumus.queries.sequence_view import slice_sequence
+from fumus.queries.table import Table
+from fumus.queries.typed import is_typed
+from fumus.queries.window import SessionWindows, TimeWindows, aggregator_factory
+from fumus.queries.symbolic_range import filter_range, map_range, range_max, range_min, range_sum
+from fumus.utils import Optional, DictItem, MemoCache
 from fumus.decorators.handler import pre_call, handle_consumed
+from fumus.decorators.tracker import track_stage
+from fumus.instrumentation.plan import Plan
+from fumus.instrumentation.tracer import Tracing, sample_global_tracing
 from fumus.exceptions.exception import NoneTypeError, UnsupportedTypeError, IllegalStateError
 
 
-@pre_call(handle_consumed)
+@pre_call(handle_consumed, track_stage)
 class Query(ItertoolsMixin):
     """Abstraction over a sequence of elements supporting sequential aggregate operations"""
 
@@ -16,8 +28,18 @@ class Query(ItertoolsMixin):
         if iterable is None:
             raise NoneTypeError("Cannot create Query from None")
         self._iterable = iterable
+        # array typecode of a typed (numeric) query -> materializations are stored in array.array buffers
+        self._typecode = iterable.typecode if isinstance(iterable, array.array) else None
+        self._vectorized = False
         self._is_consumed = False
         self._on_close_handler = None
+        # built on the first stage added
+        self._plan = None
+        # set while a stage method runs -> stages calling other stages internally are recorded once
+        self._is_tracking = False
+        self._profile = None
+        self._tracing = sample_global_tracing()
+        self._memory = None
 
     def __iter__(self):
         return iter(self.iterable)
@@ -39,6 +61,16 @@ class Query(ItertoolsMixin):
         """Creates empty Query"""
         return cls([])
 
+    @classmethod
+    def of_ints(cls, *iterable):
+        """Creates typed Query of (signed 64-bit) integers backed by array.array"""
+        return cls(array.array("q", iterable))
+
+    @classmethod
+    def of_floats(cls, *iterable):
+        """Creates typed Query of (double precision) floats backed by array.array"""
+        return cls(array.array("d", iterable))
+
     @classmethod
     def iterate(cls, seed, operation, condition=None):
         """Creates infinite ordered Query"""
@@ -54,28 +86,147 @@ class Query(ItertoolsMixin):
         """Creates infinite Query with given value"""
         return cls.generate(lambda: element)
 
-    @singledispatchmethod  # noqa
     @classmethod
-    def from_range(cls, *range_list: int):
-        """Creates Query from start (inclusive) to stop (exclusive) by an incremental step"""
-        return cls(QueryGenerator.range(*range_list))
-
-    @from_range.register(range)  # noqa
-    @classmethod
-    def _(cls, range_obj: range):
-        """Creates Query range object"""
-        return cls(QueryGenerator.range(range_obj.start, range_obj.stop, range_obj.step))
+    def from_range(cls, *range_list):
+        """
+        Creates Query from start (inclusive) to stop (exclusive) by an incremental step or from a range object
+        """
+        # NB: plain isinstance dispatch - functools.singledispatchmethod pulls in 'typing' at import time
+        if len(range_list) == 1 and isinstance(range_list[0], range):
+            return cls(range_list[0])
+        return cls(range(*range_list))
 
     @property
     def iterable(self):
         if isinstance(self._iterable, Mapping):
             return (DictItem(k, v) for k, v in self._iterable.items())
+        if self._vectorized and vectorized.is_ndarray(self._iterable):
+            # scalar path of a vectorized query -> Python scalars, as returned by the vectorized terminals
+            return self._iterable.tolist()
         return self._iterable
 
     @iterable.setter
     def iterable(self, value):
         self._iterable = value
 
+    @property
+    def typecode(self):
+        """Returns the array typecode of a typed query or None"""
+        return self._typecode
+
+    def as_array(self, typecode):
+        """
+        Materializes the elements of the query into an array.array of given typecode
+        and turns it into a typed query (sort, tail, cache etc. store their buffers as arrays)
+        """
+        self.iterable = array.array(typecode, self.iterable)
+        self._typecode = typecode
+        return self
+
+    def vectorized(self):
+        """
+        Switches the query to the (optional) NumPy backend: the elements are converted into an ndarray and
+        map/filter (given NumPy ufuncs or array functions flagged with 'on_array=True'), sum, average, min, max,
+        sort, distinct and count run as array operations. Other stages and callables use the scalar path.
+        NB: integer arrays use fixed-width (int64) arithmetic - results exceeding it wrap around silently
+        instead of growing like Python ints
+        """
+        self.iterable = vectorized.as_ndarray(self.iterable)
+        self._vectorized = True
+        return self
+
+    def _is_vectorized(self):
+        return self._vectorized and vectorized.is_ndarray(self._iterable)
+
+    def _is_array_function(self, function):
+        # only ufuncs are known to operate element-wise on arrays -> other callables are never applied to the array
+        return self._is_vectorized() and vectorized.is_ufunc(function)
+
+    def _as_ndarray(self):
+        if not self._is_vectorized():
+            self.iterable = vectorized.as_ndarray(self.iterable)
+            self._vectorized = True
+        return self._iterable
+
+    def _to_buffer(self, values):
+        # falls back to a list (and an untyped query) if a mapper produced values of another type
+        if self._typecode is None:
+            return values
+        values = values if isinstance(values, list) else list(values)
+        if is_typed(values, self._typecode):
+            try:
+                return array.array(self._typecode, values)
+            except OverflowError:
+                pass
+        self._typecode = None
+        return values
+
+    def _typed_values(self):
+        # the array buffer of a typed query (untyped if a stage changed the element types)
+        if not isinstance(self._iterable, array.array):
+            self.iterable = self._to_buffer(self.iterable)
+        return self._iterable
+
+    def instrument(self):
+        """
+        Enables per-stage instrumentation for the stages added from now on:
+        elements in/out, inclusive and self time and time per element are available after the terminal operation
+        via the 'profile' property or printed as plan tree by 'explain_analyze'.
+        Sized (materialized) stage outputs are counted without per-element measuring - fast paths stay intact
+        """
+        from fumus.instrumentation import Profile
+
+        if self._profile is None:
+            self._profile = Profile()
+            self._iterable = self._profile.add_source(self._iterable)
+        return self
+
+    def with_memory_budget(self, max_bytes=None):
+        """
+        Enables memory accounting for the materializing stages added from now on -
+        peak element count and approximate (shallow) bytes of each stage are available via 'memory_usage'.
+        If 'max_bytes' is given, 'sort' spills sorted runs to disk and merges them (external merge sort)
+        when reaching the budget; other materializing stages raise MemoryBudgetError
+        """
+        from fumus.instrumentation import MemoryAccounting
+
+        self._memory = MemoryAccounting(max_bytes)
+        return self
+
+    @property
+    def memory_usage(self):
+        """Returns the memory statistics of the materializing stages as dict (or None if not accounted)"""
+        return self._memory.to_dict() if self._memory else None
+
+    def trace(self, tracer, *, sample_rate=1.0, batch_size=1024):
+        """
+        Plugs a tracer (see fumus.instrumentation.Tracer) into the stages added from now on (overriding the global one).
+        The query is traced with probability 'sample_rate'; 'on_batch' is called every 'batch_size' elements of a stage
+        """
+        self._tracing = Tracing(tracer, sample_rate, batch_size).sample()
+        return self
+
+    @property
+    def profile(self):
+        """Returns the per-stage statistics of an instrumented query as dict (or None if not instrumented)"""
+        return self._profile.to_dict() if self._profile else None
+
+    def explain(self, analyze=False):
+        """
+        Prints the logical plan of the query - its stages with their parameters and the fast paths applied.
+        Doesn't execute (or consume) the query. If 'analyze' flag is True, prints the statistics
+        of an instrumented query instead (see 'explain_analyze')
+        """
+        if analyze:
+            return self.explain_analyze()
+        print((self._plan or Plan(self._iterable)).render())
+
+    def explain_analyze(self):
+        """Prints the plan tree of an instrumented query with the statistics of each stage"""
+        if self._profile is None:
+            raise IllegalStateError("Query is not instrumented")
+        print(self._profile.render())
+
     def concat(self, *queries):
         """Concatenates several queries together or adds new queries/collections to the current one"""
         self.iterable = QueryGenerator.concat(self.iterable, *queries)
@@ -86,14 +237,36 @@ class Query(ItertoolsMixin):
         self.iterable = QueryGenerator.concat(iterable, self.iterable)
         return self
 
-    def filter(self, predicate):
-        """Filters values in query based on given predicate function"""
-        self.iterable = QueryGenerator.filter(self.iterable, predicate)
+    def filter(self, predicate, *, on_array=False):
+        """
+        Filters values in query based on given predicate function.
+        If 'on_array' flag is True, the predicate receives the whole query as NumPy array and returns a boolean mask
+        (the query is vectorized); NumPy ufuncs are applied that way on vectorized queries automatically
+        """
+        filtered = None
+        if on_array or self._is_array_function(predicate):
+            filtered = vectorized.filter_array(self._as_ndarray(), predicate)
+        elif isinstance(self._iterable, range):
+            filtered = filter_range(self._iterable, predicate)
+        if filtered is None:
+            filtered = QueryGenerator.filter(self.iterable, predicate)
+        self.iterable = filtered
         return self
 
-    def map(self, mapper):
-        """Returns a query consisting of the results of applying the given function to the elements of this query"""
-        self.iterable = QueryGenerator.map(self.iterable, mapper)
+    def map(self, mapper, *, on_array=False):
+        """
+        Returns a query consisting of the results of applying the given function to the elements of this query.
+        If 'on_array' flag is True, the mapper receives the whole query as NumPy array and returns an array
+        of the same shape (the query is vectorized); NumPy ufuncs are applied that way on vectorized queries automatically
+        """
+        mapped = None
+        if on_array or self._is_array_function(mapper):
+            mapped = vectorized.map_array(self._as_ndarray(), mapper)
+        elif isinstance(self._iterable, range):
+            mapped = map_range(self._iterable, mapper)
+        if mapped is None:
+            mapped = QueryGenerator.map(self.iterable, mapper)
+        self.iterable = mapped
         return self
 
     def filter_map(self, mapper, *, discard_falsy=False):
@@ -101,14 +274,259 @@ class Query(ItertoolsMixin):
         self.iterable = QueryGenerator.filter_map(self.iterable, mapper, discard_falsy)
         return self
 
+    def map_cached(
+        self, mapper, maxsize=128, policy="lru", key=None, *, cache=None, thread_safe=False
+    ):
+        """
+        Maps the elements of the query memoizing the results of the given (pure) function.
+        The cache is bounded by 'maxsize' and evicts entries by 'lru' or 'lfu' policy;
+        'key' function computes the cache key for an element (defaults to the element itself).
+        Pass a MemoCache via 'cache' to share it across queries and inspect its statistics
+        (entries of a shared cache are keyed by the function as well, so it can serve several functions)
+        """
+        cache, key = self._memo_cache(cache, maxsize, policy, thread_safe, mapper, key)
+        self.iterable = QueryGenerator.map_cached(self.iterable, mapper, cache, key)
+        return self
+
+    def filter_cached(
+        self, predicate, maxsize=128, policy="lru", key=None, *, cache=None, thread_safe=False
+    ):
+        """Filters values in query memoizing the results of the given (pure) predicate; see 'map_cached'"""
+        cache, key = self._memo_cache(cache, maxsize, policy, thread_safe, predicate, key)
+        self.iterable = QueryGenerator.filter_cached(self.iterable, predicate, cache, key)
+        return self
+
+    def map_persistent(self, mapper, cache_path, key=None, *, version=None, batch_size=256):
+        """
+        Maps the elements of the query storing the results in an on-disk (SQLite) cache at 'cache_path',
+        so that only the elements missing from it are computed - also across process restarts.
+        Entries are keyed by a stable hash of the input ('key' function, if provided) and the mapper 'version'
+        (derived from the mapper's name and code unless given explicitly - required for callables without code
+        such as partials or operator.itemgetter).
+        Lookups and writes are done in batches of 'batch_size' elements
+        """
+        if batch_size < 1:
+            raise ValueError("Batch size must be a positive integer")
+        if version is None:
+            from fumus.utils import PersistentCache
+
+            version = PersistentCache.version_of(mapper)
+        self.iterable = QueryGenerator.map_persistent(
+            self.iterable, mapper, cache_path, key, version, batch_size
+        )
+        return self
+
+    def _memo_cache(self, cache, maxsize, policy, thread_safe, function, key):  # noqa
+        if cache is None:
+            return MemoCache(maxsize, policy, thread_safe=thread_safe), key
+        # shared cache -> the same element mapped by another function must not hit this function's entry
+        if key is None:
+            return cache, lambda i: (function, i)
+        return cache, lambda i: (function, key(i))
+
+    def map_batches(self, mapper, size, flatten=True, *, time_budget=None):
+        """
+        Groups the elements into lists of given size and calls the mapper once per batch.
+        If 'flatten' flag is True, the produced results are yielded one by one, otherwise per batch.
+        If 'time_budget' (in seconds) is provided, the batch size adapts so that each call takes roughly that long
+        """
+        if size < 1:
+            raise ValueError("Batch size must be a positive integer")
+        if time_budget is not None and time_budget <= 0:
+            raise ValueError("Time budget must be a positive number")
+        self.iterable = QueryGenerator.map_batches(
+            self.iterable, mapper, size, flatten, time_budget
+        )
+        return self
+
+    def window(self, size, step=1, agg=None, *, key=None):
+        """
+        Yields the aggregate of each complete window of 'size' elements, a new window starting every 'step' elements
+        (step=1 slides by one element, step=size gives tumbling windows).
+        'agg' is one of 'sum', 'count', 'mean', 'min', 'max' (updated incrementally in O(1) per element),
+        a callable receiving the window as tuple or None (yields the tuple itself).
+        If 'key' function is given, windows are kept per key and (key, aggregate) pairs are yielded
+        """
+        if not isinstance(size, int) or size < 1:
+            raise ValueError("Window size must be a positive integer")
+        if not isinstance(step, int) or step < 1:
+            raise ValueError("Window step must be a positive integer")
+        factory = aggregator_factory(agg)
+        self.iterable = QueryGenerator.window(self.iterable, size, step, factory, key)
+        return self
+
+    def time_window(self, timestamp, size, slide=None, agg=None, *, lateness=None):
+        """
+        Groups the elements into time windows of given 'size' starting every 'slide' (defaults to 'size' i.e. tumbling)
+        based on the 'timestamp' function (returning numbers or datetimes; size and slide being timedeltas for the latter).
+        Windows are aligned to the first timestamp and yielded as (start, end, aggregate)
+        as soon as the stream advances past their end; 'agg' is handled as in 'window'.
+        Events may arrive out of order by up to 'lateness' - later ones are dropped
+        """
+        slide = size if slide is None else slide
+        if not self._is_positive(size) or not self._is_positive(slide):
+            raise ValueError("Window size and slide must be positive")
+        if lateness and lateness < lateness * 0:
+            raise ValueError("Lateness cannot be negative")
+        state = TimeWindows(timestamp, size, slide, aggregator_factory(agg), lateness)
+        self.iterable = QueryGenerator.windows(self.iterable, state)
+        return self
+
+    def session_window(self, timestamp, gap, agg=None, *, lateness=None):
+        """
+        Groups the elements into sessions of activity separated by more than 'gap' based on the 'timestamp' function.
+        Sessions are yielded as (first timestamp, last timestamp, aggregate)
+        as soon as the stream advances more than 'gap' past their last event; 'agg' is handled as in 'window'.
+        Events may arrive out of order by up to 'lateness' - later ones are dropped
+        """
+        if not self._is_positive(gap):
+            raise ValueError("Session gap must be positive")
+        if lateness and lateness < lateness * 0:
+            raise ValueError("Lateness cannot be negative")
+        state = SessionWindows(timestamp, gap, aggregator_factory(agg), lateness)
+        self.iterable = QueryGenerator.windows(self.iterable, state)
+        return self
+
+    def _is_positive(self, value):  # noqa
+        # works for numbers and timedeltas alike
+        return value > value * 0
+
+    def join(self, other, left_key, right_key=None, how="inner", *, build=None):
+        """
+        Joins the query with another query/iterable on keys computed by 'left_key' and 'right_key' functions
+        (the latter defaults to 'left_key') using a hash table built on one side while streaming the other.
+        'how' is one of:
+        'inner' - yields (left, right) pairs of matching elements;
+        'left' - same as inner but also yields (left, None) for unmatched left elements;
+        'semi' - yields left elements having a match; 'anti' - yields left elements without a match.
+        For inner joins the hash table is built on the smaller side if both sizes are known
+        ('build' could be set explicitly to 'left' or 'right'); all other joins build on the right side.
+        The pairs follow the order of the streamed side - i.e. the order of the other query/iterable
+        when the table is built on the left side
+        """
+        if how not in ("inner", "left", "semi", "anti"):
+            raise ValueError(
+                f"Invalid join type '{how}', expected: 'inner', 'left', 'semi' or 'anti'"
+            )
+        if build not in (None, "left", "right"):
+            raise ValueError(f"Invalid build side '{build}', expected: 'left' or 'right'")
+        if build == "left" and how != "inner":
+            raise ValueError("Only inner joins can build the hash table on the left side")
+
+        right_key = right_key or left_key
+        if build is None and how == "inner":
+            left_size, right_size = self._known_size(self), self._known_size(other)
+            if left_size is not None and right_size is not None and left_size < right_size:
+                build = "left"
+
+        if build == "left":
+            self.iterable = QueryGenerator.hash_join(
+                other, self.iterable, right_key, left_key, how, build_is_left=True
+            )
+        else:
+            self.iterable = QueryGenerator.hash_join(self.iterable, other, left_key, right_key, how)
+        return self
+
+    def merge_sorted(self, *others, key=None, validate=False):
+        """
+        Lazily merges the query with other queries/iterables sorted by the same key (k-way heap merge).
+        If 'validate' flag is True, raises UnsortedInputError when any of the inputs turns out not to be sorted
+        """
+        iterables = (self.iterable, *others)
+        if validate:
+            iterables = [QueryGenerator.ensure_sorted(i, key) for i in iterables]
+        self.iterable = QueryGenerator.merge_sorted(iterables, key)
+        return self
+
+    def merge_join(self, other, left_key, right_key=None, how="inner", *, validate=False):
+        """
+        Joins the query with another query/iterable, both sorted by their join keys, in a single streaming pass.
+        Only the current run of duplicate keys on the right side is kept in memory.
+        'how' is one of 'inner' or 'left' (yielding (left, None) for unmatched left elements).
+        If 'validate' flag is True, raises UnsortedInputError when any of the inputs turns out not to be sorted
+        """
+        if how not in ("inner", "left"):
+            raise ValueError(f"Invalid merge join type '{how}', expected: 'inner' or 'left'")
+        right_key = right_key or left_key
+        left, right = self.iterable, other
+        if validate:
+            left = QueryGenerator.ensure_sorted(left, left_key)
+            right = QueryGenerator.ensure_sorted(right, right_key)
+        self.iterable = QueryGenerator.merge_join(left, right, left_key, right_key, how)
+        return self
+
+    def union(self, other, key=None, *, assume_sorted=False):
+        """
+        Returns a query with the distinct elements (by key) found in the current query or the other query/iterable.
+        If 'assume_sorted' flag is True, both inputs must be sorted by key and are merged in constant memory
+        """
+        return self._set_operation(other, "union", key, assume_sorted)
+
+    def intersect(self, other, key=None, *, assume_sorted=False):
+        """
+        Returns a query with the distinct elements (by key) of the current query also found in the other one.
+        The hash set is built on the smaller side if both sizes are known and the elements follow the order
+        of the streamed side - i.e. the order of the other query/iterable if the current one is smaller.
+        If 'assume_sorted' flag is True, both inputs must be sorted by key and are merged in constant memory
+        """
+        return self._set_operation(other, "intersect", key, assume_sorted)
+
+    def difference(self, other, key=None, *, assume_sorted=False):
+        """
+        Returns a query with the distinct elements (by key) of the current query not found in the other one.
+        If 'assume_sorted' flag is True, both inputs must be sorted by key and are merged in constant memory
+        """
+        return self._set_operation(other, "difference", key, assume_sorted)
+
+    def symmetric_difference(self, other, key=None, *, assume_sorted=False):
+        """
+        Returns a query with the distinct elements (by key) found in exactly one of the two inputs.
+        If 'assume_sorted' flag is True, both inputs must be sorted by key and are merged in constant memory
+        """
+        return self._set_operation(other, "symmetric_difference", key, assume_sorted)
+
+    def _set_operation(self, other, operation, key, assume_sorted):  # noqa
+        if assume_sorted:
+            self.iterable = QueryGenerator.sorted_set_operation(
+                self.iterable, other, operation, key
+            )
+        elif operation == "intersect":
+            left_size, right_size = self._known_size(self), self._known_size(other)
+            build_left = left_size is not None and right_size is not None and left_size < right_size
+            self.iterable = QueryGenerator.intersect(self.iterable, other, key, build_left)
+        else:
+            self.iterable = getattr(QueryGenerator, operation)(self.iterable, other, key)
+        return self
+
+    def cogroup(self, other, key, other_key=None):
+        """
+        Groups the elements of both the query and another query/iterable by key.
+        Yields (key, list of left elements, list of right elements) for each key found on either side
+        """
+        self.iterable = QueryGenerator.cogroup(self.iterable, other, key, other_key or key)
+        return self
+
+    def _known_size(self, iterable):  # noqa
+        if isinstance(iterable, Query):
+            return len(iterable._iterable) if iterable._is_sequence() else None
+        if isinstance(iterable, Sized):
+            return len(iterable)
+        return None
+
     def flat_map(self, mapper):
         """Maps each element of the query and yields the elements of the produced iterators"""
         self.iterable = QueryGenerator.flat_map(self.iterable, mapper)
         return self
 
-    def flatten(self):
-        """Converts a Query of multidimensional collection into a one-dimensional"""
-        self.iterable = QueryGenerator.flatten(self.iterable)
+    def flatten(self, depth=None):
+        """
+        Converts a Query of multidimensional collection into a one-dimensional.
+        If 'depth' is given, only that many levels of nesting are flattened.
+        Strings, bytes and dicts are not flattened
+        """
+        if depth is not None and depth < 0:
+            raise ValueError("Depth cannot be negative")
+        self.iterable = QueryGenerator.flatten(self.iterable, depth)
         return self
 
     def peek(self, operation):
@@ -118,15 +536,34 @@ class Query(ItertoolsMixin):
 
     def distinct(self):
         """Returns a query with the distinct elements of the current one"""
+        if self._is_vectorized():
+            self.iterable = vectorized.distinct_array(self._iterable)
+            return self
+        if self._memory:
+            self.iterable = QueryGenerator.distinct_accounted(
+                self.iterable, self._memory, self._memory.stage("distinct")
+            )
+            return self
         self.iterable = QueryGenerator.distinct(self.iterable)
         return self
 
     def count(self):
         """Returns the count of elements in the query"""
+        if self._is_sequence() or self._is_vectorized():
+            return len(self._iterable)
         return len(tuple(self.iterable))
 
     def sum(self):
         """Sums the elements of the query"""
+        if isinstance(self._iterable, range):
+            return range_sum(self._iterable)
+        if self._is_vectorized():
+            return self._iterable.sum().item()
+        if self._typecode is not None:
+            values = self._typed_values()
+            if self._typecode is not None:
+                # elements are known to be numbers -> skip the per-element type check
+                return sum(values)
         if len(self.iterable) == 0:
             return 0
         if not any(isinstance(x, (int | float | None)) for x in self.iterable):
@@ -135,6 +572,14 @@ class Query(ItertoolsMixin):
 
     def average(self):
         """Returns the average value of elements in the query"""
+        if isinstance(self._iterable, range):
+            return (self._iterable[0] + self._iterable[-1]) / 2 if self._iterable else 0
+        if self._is_vectorized():
+            return self._iterable.mean().item() if self._iterable.size else 0
+        if self._typecode is not None:
+            values = self._typed_values()
+            if self._typecode is not None:
+                return sum(values) / len(values) if values else 0
         if (query_len := len(self.iterable)) == 0:
             return 0
         return self.sum() / query_len
@@ -143,6 +588,9 @@ class Query(ItertoolsMixin):
         """Discards the first n elements of the query and returns a new query with the remaining ones"""
         if count < 0:
             raise ValueError("Skip count cannot be negative")
+        if self._is_sequence():
+            self.iterable = slice_sequence(self.iterable, slice(count, None))
+            return self
         self.iterable = QueryGenerator.skip(self.iterable, count)
         return self
 
@@ -150,20 +598,39 @@ class Query(ItertoolsMixin):
         """Returns a query with the first n elements, or fewer if the underlying iterator ends sooner"""
         if count < 0:
             raise ValueError("Limit count cannot be negative")
-        self.iterable = QueryGenerator.limit(self.iterable, count)
-        return self
+        return self._limit(count)
 
     def head(self, count):
         """Alias for 'limit'"""
         if count < 0:
             raise ValueError("Head count cannot be negative")
-        self.iterable = QueryGenerator.limit(self.iterable, count)
+        return self._limit(count)
+
+    def _limit(self, count):
+        if self._is_sequence():
+            self.iterable = slice_sequence(self.iterable, slice(count))
+        else:
+            self.iterable = QueryGenerator.limit(self.iterable, count)
         return self
 
     def tail(self, count):
         """Returns a query with the last n elements, or fewer if the underlying iterator ends sooner"""
         if count < 0:
             raise ValueError("Tail count cannot be negative")
+        if self._is_sequence():
+            # NB: seq[-0:] would return the whole sequence
+            self.iterable = slice_sequence(
+                self.iterable, slice(-count, None) if count else slice(0)
+            )
+            return self
+        if self._typecode is not None:
+            self.iterable = self._to_buffer(collections.deque(self.iterable, maxlen=count))
+            return self
+        if self._memory:
+            self.iterable = QueryGenerator.tail_accounted(
+                self.iterable, count, self._memory, self._memory.stage("tail")
+            )
+            return self
         self.iterable = QueryGenerator.tail(self.iterable, count)
         return self
 
@@ -183,6 +650,8 @@ class Query(ItertoolsMixin):
 
     def take_last(self, default=None):
         """Returns Optional with the last element of the query or a default value"""
+        if self._is_sequence():
+            return Optional.of_nullable(self.iterable[-1] if self.iterable else default)
         if self.iterable:
             *_, last = self.iterable
             return Optional.of_nullable(last)
@@ -193,15 +662,33 @@ class Query(ItertoolsMixin):
         Sorts the elements of the current query according to natural order or based on the given comparator.
         If 'reverse' flag is True, the elements are sorted in descending order
         """
-        self.iterable = QueryGenerator.sort(self.iterable, comparator, reverse)
-        return self
+        return self._sort(comparator, reverse)
 
     def reverse(self, comparator=None):
         """
         Sorts the elements of the current query in descending order.
         Alias for 'sort(comparator, reverse=True)'
         """
-        self.iterable = QueryGenerator.sort(self.iterable, comparator, reverse=True)
+        return self._sort(comparator, reverse=True)
+
+    def _sort(self, comparator=None, reverse=False):
+        if comparator is None and isinstance(self._iterable, range):
+            # a range is already sorted -> at most flip its direction
+            is_descending = self._iterable.step < 0
+            self.iterable = self._iterable if is_descending == reverse else self._iterable[::-1]
+            return self
+        if comparator is None and self._is_vectorized():
+            self.iterable = vectorized.sort_array(self._iterable, reverse)
+            return self
+        if self._typecode is not None:
+            self.iterable = self._to_buffer(sorted(self.iterable, key=comparator, reverse=reverse))
+            return self
+        if self._memory:
+            self.iterable = QueryGenerator.external_sort(
+                self.iterable, comparator, reverse, self._memory, self._memory.stage("sort")
+            )
+            return self
+        self.iterable = QueryGenerator.sort(self.iterable, comparator, reverse)
         return self
 
     def find_first(self, predicate=None):
@@ -221,7 +708,7 @@ class Query(ItertoolsMixin):
         if predicate:
             self.filter(predicate)
         try:
-            return Optional.of(random.choice(list(self.iterable)))
+            return Optional.of(random.choice(list(self._materialized_input("find_any"))))
         except IndexError:
             return Optional.of_nullable(None)
 
@@ -239,12 +726,28 @@ class Query(ItertoolsMixin):
 
     def min(self, comparator=None, default=None):
         """Returns the minimum element of the query according to the given comparator"""
+        if comparator is None and isinstance(self._iterable, range):
+            return Optional.of_nullable(range_min(self._iterable) if self._iterable else default)
+        if comparator is None and self._is_vectorized():
+            return Optional.of_nullable(
+                self._iterable.min().item() if self._iterable.size else default
+            )
         return Optional.of_nullable(min(self.iterable, key=comparator, default=default))
 
     def max(self, comparator=None, default=None):
         """Returns the maximum element of the query according to the given comparator"""
+        if comparator is None and isinstance(self._iterable, range):
+            return Optional.of_nullable(range_max(self._iterable) if self._iterable else default)
+        if comparator is None and self._is_vectorized():
+            return Optional.of_nullable(
+                self._iterable.max().item() if self._iterable.size else default
+            )
         return Optional.of_nullable(max(self.iterable, key=comparator, default=default))
 
+    def contains(self, element):
+        """Returns whether the query contains the given element"""
+        return element in self.iterable
+
     def for_each(self, operation):
         """Performs an action for each element of this query"""
         for i in self.iterable:
@@ -308,15 +811,30 @@ class Query(ItertoolsMixin):
                 return self.to_dict(dict_collector, dict_merger)
             case builtins.str:
                 return self.to_string(str_delimiter)
+            case array.array:
+                return self.to_array()
             case _:
                 raise ValueError("Invalid collection type")
 
     def to_list(self):
         """Returns a list of the elements of the current query"""
+        if self._is_vectorized():
+            return self._iterable.tolist()
         return list(self.iterable)
 
+    def to_array(self, typecode=None):
+        """Returns an array.array of the elements of the current query (typed queries use their own typecode)"""
+        typecode = typecode or self._typecode
+        if typecode is None:
+            raise ValueError("Typecode is required for untyped queries")
+        if isinstance(self._iterable, array.array) and self._iterable.typecode == typecode:
+            return array.array(typecode, self._iterable)
+        return array.array(typecode, self.iterable)
+
     def to_tuple(self):
         """Returns a tuple of the elements of the current query"""
+        if self._is_vectorized():
+            return tuple(self._iterable.tolist())
         return tuple(self.iterable)
 
     def to_set(self):
@@ -356,6 +874,13 @@ class Query(ItertoolsMixin):
                     f"Cannot create dict items from '{item.__class__.__name__}' type"
                 )
 
+    def to_table(self, fields=None):
+        """
+        Returns a columnar Table of the records in the current query (dicts, tuples of DictItems or plain tuples).
+        For plain tuples the 'fields' are required
+        """
+        return Table.from_records(self.iterable, fields)
+
     def to_string(self, delimiter=", "):
         """Concatenates the elements of the Query, separated by the specified delimiter"""
         return self._join(delimiter)
@@ -410,10 +935,33 @@ class Query(ItertoolsMixin):
                 for _ in curr_group:
                     pass
 
+    def broadcast(self, *consumers):
+        """
+        Drives the query once and pushes each element to all given consumers in lockstep.
+        Consumers are Collectors or plain functions (called for each element).
+        Returns a tuple with the result of each consumer, in the given order
+        """
+        collectors = [Collector.of(c) for c in consumers]
+        states = [c.supplier() for c in collectors]
+        accumulators = [c.accumulator for c in collectors]
+        for element in self.iterable:
+            for idx, accumulator in enumerate(accumulators):
+                states[idx] = accumulator(states[idx], element)
+        return tuple(c.finish(state) for c, state in zip(collectors, states))
+
     def quantify(self, predicate=bool):
         """Count how many of the elements are Truthy or evaluate to True based on a given predicate"""
         return sum(self.map(predicate))
 
+    def cache(self, memory_limit=None):
+        """
+        Returns a QueryCache handle that materializes the elements of the query once
+        and from which many independent queries can be opened to replay them without recomputing.
+        The elements are computed lazily, so a partial run (e.g. with 'limit') is reused by later ones.
+        Elements past the 'memory_limit' (count) are spilled to a temporary file
+        """
+        return QueryCache(self.iterable, memory_limit, self._typecode)
+
     def close(self):
         """Closes the query, causing the provided close handler to be called"""
         if self._on_close_handler:
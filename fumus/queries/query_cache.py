@@ -0,0 +1,120 @@
+import array
+
+from fumus.queries.typed import element_type
+
+
+class QueryCache:
+    """
+    Replayable materialization of a query's elements.
+    The upstream is computed lazily and only once - each call to 'open' returns a new independent Query
+    that replays the cached elements and pulls further ones from the upstream only if needed.
+    Elements past the 'memory_limit' (count) are spilled to a temporary file
+    """
+
+    def __init__(self, iterable, memory_limit=None, typecode=None):
+        if memory_limit is not None and memory_limit < 0:
+            raise ValueError("Memory limit cannot be negative")
+        self._source = iter(iterable)
+        self._memory_limit = memory_limit
+        # typed queries keep their in-memory part in an array.array
+        self._buffer = array.array(typecode) if typecode else []
+        self._element_type = element_type(typecode) if typecode else None
+        self._spill_file = None
+        # imported on the first spill - most caches never spill
+        self._pickle = None
+        self._spilled = 0
+        self._exhausted = False
+
+    @property
+    def cached_count(self):
+        """Returns the number of elements computed so far"""
+        return len(self._buffer) + self._spilled
+
+    @property
+    def spilled_count(self):
+        """Returns the number of elements spilled to disk"""
+        return self._spilled
+
+    @property
+    def is_complete(self):
+        """Returns bool whether the upstream is fully materialized"""
+        return self._exhausted
+
+    def open(self):
+        """Returns a new Query replaying the cached elements"""
+        from fumus.queries.query import Query
+
+        if self._exhausted and not self._spilled:
+            return Query(self._buffer)
+        return Query(self._replay())
+
+    def close(self):
+        """Releases the spill file (if any)"""
+        if self._spill_file:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _replay(self):
+        idx = 0
+        # each reader keeps its own offset in the shared spill file
+        offset = 0
+        while True:
+            if idx == self.cached_count and not self._pull():
+                return
+            if idx < len(self._buffer):
+                yield self._buffer[idx]
+            else:
+                self._spill_file.seek(offset)
+                element = self._pickle.load(self._spill_file)
+                offset = self._spill_file.tell()
+                yield element
+            idx += 1
+
+    def _pull(self):
+        if self._exhausted:
+            return False
+        try:
+            element = next(self._source)
+        except StopIteration:
+            self._exhausted = True
+            return False
+
+        if self._memory_limit is None or len(self._buffer) < self._memory_limit:
+            if self._element_type is not None and type(element) is not self._element_type:
+                # the array would silently convert the element -> fall back to a list
+                self._to_list()
+            try:
+                self._buffer.append(element)
+            except OverflowError:
+                self._to_list()
+                self._buffer.append(element)
+        else:
+            self._spill(element)
+        return True
+
+    def _to_list(self):
+        self._buffer = list(self._buffer)
+        self._element_type = None
+
+    def _spill(self, element):
+        if self._spill_file is None:
+            import pickle
+            import tempfile
+
+            self._pickle = pickle
+            self._spill_file = tempfile.TemporaryFile()
+        self._spill_file.seek(0, 2)
+        self._pickle.dump(element, self._spill_file, protocol=self._pickle.HIGHEST_PROTOCOL)
+        self._spilled += 1
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}(cached={self.cached_count}, "
+            f"spilled={self._spilled}, complete={self._exhausted})"
+        )
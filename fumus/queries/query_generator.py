@@ -1,6 +1,12 @@
-from collections.abc import Iterable
+import itertools as it
+from collections.abc import Iterable, Mapping
 
 from fumus.decorators.mapper import map_dict_items
+from fumus.exceptions.exception import UnsortedInputError
+
+# exact type lookups spare the (much slower) ABC checks for the most common elements
+NESTED_TYPES = frozenset((list, tuple))
+LEAF_TYPES = frozenset((str, bytes, bytearray, dict, int, float, bool, type(None)))
 
 
 class QueryGenerator:
@@ -27,18 +33,269 @@ class QueryGenerator:
             if (not discard_falsy and i is not None) or (discard_falsy and i):
                 yield mapper(i)
 
+    @staticmethod
+    def map_cached(iterable, mapper, cache, key=None):
+        for i in iterable:
+            yield cache.get_or_compute(key(i) if key else i, lambda: mapper(i))  # noqa
+
+    @staticmethod
+    def filter_cached(iterable, predicate, cache, key=None):
+        for i in iterable:
+            if cache.get_or_compute(key(i) if key else i, lambda: predicate(i)):  # noqa
+                yield i
+
+    @staticmethod
+    def map_persistent(iterable, mapper, cache_path, key=None, version=None, batch_size=256):
+        from fumus.utils import PersistentCache
+
+        if version is None:
+            version = PersistentCache.version_of(mapper)
+        iterator = iter(iterable)
+        with PersistentCache(cache_path, version) as cache:
+            while batch := list(it.islice(iterator, batch_size)):
+                hashed_keys = [cache.hash_key(key(i) if key else i) for i in batch]
+                found = cache.get_many(hashed_keys)
+                computed = {}
+                for i, hashed_key in zip(batch, hashed_keys):
+                    if hashed_key not in found and hashed_key not in computed:
+                        computed[hashed_key] = mapper(i)
+                if computed:
+                    cache.put_many(computed.items())
+                found.update(computed)
+                yield from (found[hashed_key] for hashed_key in hashed_keys)
+
+    @staticmethod
+    def map_batches(iterable, mapper, size, flatten=True, time_budget=None):
+        iterator = iter(iterable)
+        if time_budget is None:
+            while batch := list(it.islice(iterator, size)):
+                if flatten:
+                    yield from mapper(batch)
+                else:
+                    yield mapper(batch)
+            return
+
+        import time
+
+        while batch := list(it.islice(iterator, size)):
+            start = time.perf_counter()
+            result = mapper(batch)
+            elapsed = time.perf_counter() - start
+            # adapt the size of the next batch towards the time budget; grow at most twice per step
+            if elapsed > 0:
+                size = max(1, min(size * 2, int(size * time_budget / elapsed)))
+            else:
+                size *= 2
+            if flatten:
+                yield from result
+            else:
+                yield result
+
+    @staticmethod
+    def hash_join(probe, build, probe_key, build_key, how="inner", build_is_left=False):
+        if how in ("semi", "anti"):
+            keys = {build_key(i) for i in build}
+            is_semi = how == "semi"
+            for i in probe:
+                if (probe_key(i) in keys) is is_semi:
+                    yield i
+            return
+
+        table = {}
+        for i in build:
+            table.setdefault(build_key(i), []).append(i)
+        for i in probe:
+            matches = table.get(probe_key(i))
+            if matches:
+                # duplicates are streamed pair by pair -> memory is bound by the build side
+                for match in matches:
+                    yield (match, i) if build_is_left else (i, match)
+            elif how == "left":
+                yield i, None
+
+    @staticmethod
+    def merge_sorted(iterables, key=None):
+        import heapq
+
+        yield from heapq.merge(*iterables, key=key)
+
+    @staticmethod
+    def merge_join(left, right, left_key, right_key, how="inner"):
+        right_runs = it.groupby(right, right_key)
+        right_run = next(right_runs, None)
+        for key, left_run in it.groupby(left, left_key):
+            while right_run is not None and right_run[0] < key:
+                right_run = next(right_runs, None)
+            if right_run is not None and right_run[0] == key:
+                # only the current run of duplicate keys on the right side is kept in memory
+                matches = list(right_run[1])
+                for i in left_run:
+                    for match in matches:
+                        yield i, match
+            elif how == "left":
+                for i in left_run:
+                    yield i, None
+
+    @staticmethod
+    def union(left, right, key=None):
+        seen = set()
+        for i in it.chain(left, right):
+            k = key(i) if key else i
+            if k not in seen:
+                seen.add(k)
+                yield i
+
+    @staticmethod
+    def intersect(left, right, key=None, build_left=False):
+        if build_left:
+            # yields the left elements in the order their keys appear on the right side
+            table = {}
+            for i in left:
+                table.setdefault(key(i) if key else i, i)
+            for i in right:
+                k = key(i) if key else i
+                if k in table:
+                    yield table.pop(k)
+            return
+
+        keys = {key(i) if key else i for i in right}
+        for i in left:
+            k = key(i) if key else i
+            if k in keys:
+                keys.remove(k)
+                yield i
+
+    @staticmethod
+    def difference(left, right, key=None):
+        excluded = {key(i) if key else i for i in right}
+        for i in left:
+            k = key(i) if key else i
+            if k not in excluded:
+                excluded.add(k)
+                yield i
+
+    @staticmethod
+    def symmetric_difference(left, right, key=None):
+        table = {}
+        for i in right:
+            table.setdefault(key(i) if key else i, i)
+        seen = set()
+        for i in left:
+            k = key(i) if key else i
+            if k not in seen:
+                seen.add(k)
+                if k not in table:
+                    yield i
+        for k, i in table.items():
+            if k not in seen:
+                yield i
+
+    @staticmethod
+    def sorted_set_operation(left, right, operation, key=None):
+        # inputs are sorted by key -> step through the runs of equal keys of both sides in lockstep
+        left_runs = ((k, next(run)) for k, run in it.groupby(left, key))
+        right_runs = ((k, next(run)) for k, run in it.groupby(right, key))
+        left_run, right_run = next(left_runs, None), next(right_runs, None)
+        keep_left = operation in ("union", "difference", "symmetric_difference")
+        keep_right = operation in ("union", "symmetric_difference")
+        keep_common = operation in ("union", "intersect")
+        while left_run is not None or right_run is not None:
+            if right_run is None or (left_run is not None and left_run[0] < right_run[0]):
+                if keep_left:
+                    yield left_run[1]
+                elif right_run is None:
+                    return
+                left_run = next(left_runs, None)
+            elif left_run is None or right_run[0] < left_run[0]:
+                if keep_right:
+                    yield right_run[1]
+                elif left_run is None:
+                    return
+                right_run = next(right_runs, None)
+            else:
+                if keep_common:
+                    yield left_run[1]
+                left_run, right_run = next(left_runs, None), next(right_runs, None)
+
+    @staticmethod
+    def ensure_sorted(iterable, key=None):
+        iterator = iter(iterable)
+        try:
+            first = next(iterator)
+        except StopIteration:
+            return
+        previous = key(first) if key else first
+        yield first
+        for i in iterator:
+            current = key(i) if key else i
+            if current < previous:
+                raise UnsortedInputError(f"Input is not sorted: {current!r} follows {previous!r}")
+            previous = current
+            yield i
+
+    @staticmethod
+    def window(iterable, size, step, factory, key=None):
+        from fumus.queries.window import CountWindow
+
+        if key is None:
+            state = CountWindow(size, step, factory)
+            for i in iterable:
+                is_complete, result = state.push(i)
+                if is_complete:
+                    yield result
+            return
+
+        # keyed windows -> independent state per key
+        states = {}
+        for i in iterable:
+            k = key(i)
+            state = states.get(k)
+            if state is None:
+                state = states[k] = CountWindow(size, step, factory)
+            is_complete, result = state.push(i)
+            if is_complete:
+                yield k, result
+
+    @staticmethod
+    def windows(iterable, state):
+        for i in iterable:
+            yield from state.push(i)
+        yield from state.flush()
+
+    @staticmethod
+    def cogroup(left, right, left_key, right_key):
+        groups = {}
+        for i in left:
+            groups.setdefault(left_key(i), ([], []))[0].append(i)
+        for i in right:
+            groups.setdefault(right_key(i), ([], []))[1].append(i)
+        for key, (left_group, right_group) in groups.items():
+            yield key, left_group, right_group
+
     @staticmethod
     def flat_map(iterable, mapper):
         for i in iterable:
             yield from mapper(i)
 
-    @classmethod
-    def flatten(cls, iterable):
-        for i in iterable:
-            if isinstance(i, str) or not isinstance(i, Iterable):
+    @staticmethod
+    def flatten(iterable, depth=None):
+        # explicit stack of iterators instead of recursive generators -> no recursion limit,
+        # and each leaf is yielded directly instead of through a chain of nested generators
+        stack = [iter(iterable)]
+        while stack:
+            for i in stack[-1]:
+                if depth is None or len(stack) <= depth:
+                    kind = type(i)
+                    if kind in NESTED_TYPES or (
+                        kind not in LEAF_TYPES
+                        and isinstance(i, Iterable)
+                        and not isinstance(i, (str, bytes, bytearray, Mapping))
+                    ):
+                        stack.append(iter(i))
+                        break
                 yield i
             else:
-                yield from cls.flatten(i)
+                stack.pop()
 
     @staticmethod
     def peek(iterable, operation):
@@ -72,6 +329,20 @@ class QueryGenerator:
                 elements.add(i)
                 yield i
 
+    @staticmethod
+    def distinct_accounted(iterable, memory, stats):
+        import sys
+
+        elements = set()
+        try:
+            for i in iterable:
+                if i not in elements:
+                    memory.add(stats, sys.getsizeof(i))
+                    elements.add(i)
+                    yield i
+        finally:
+            memory.release(stats)
+
     @staticmethod
     def skip(iterable, count):
         for i in iterable:
@@ -82,11 +353,8 @@ class QueryGenerator:
 
     @staticmethod
     def limit(iterable, count):
-        for i in iterable:
-            if count == 0:
-                break
-            yield i
-            count -= 1
+        # NB: don't pull an extra element from the upstream once the limit is reached
+        yield from it.islice(iterable, count)
 
     @staticmethod
     def tail(iterable, count):
@@ -95,6 +363,25 @@ class QueryGenerator:
         for i in collections.deque(iterable, maxlen=count):
             yield i
 
+    @staticmethod
+    def tail_accounted(iterable, count, memory, stats):
+        import collections
+        import sys
+
+        window = collections.deque()
+        try:
+            for i in iterable:
+                if not count:
+                    continue
+                if len(window) == count:
+                    # evict first -> the budget is checked against the window size, not window size + 1
+                    memory.remove(stats, sys.getsizeof(window.popleft()))
+                memory.add(stats, sys.getsizeof(i))
+                window.append(i)
+            yield from window
+        finally:
+            memory.release(stats)
+
     @staticmethod
     def take_while(iterable, predicate):
         for i in iterable:
@@ -118,6 +405,60 @@ class QueryGenerator:
         for i in sorted(iterable, key=comparator, reverse=reverse):
             yield i
 
+    @staticmethod
+    def external_sort(iterable, comparator, reverse, memory, stats):
+        import heapq
+        import sys
+
+        # sorted runs are spilled to disk whenever the budget is reached, then merged lazily
+        runs, chunk = [], []
+        try:
+            for i in iterable:
+                size = sys.getsizeof(i)
+                if chunk and not memory.fits(size):
+                    chunk.sort(key=comparator, reverse=reverse)
+                    runs.append(QueryGenerator._spill_run(chunk))
+                    stats.spilled_elements += len(chunk)
+                    memory.release(stats)
+                    chunk = []
+                memory.add(stats, size, enforce=False)
+                chunk.append(i)
+            chunk.sort(key=comparator, reverse=reverse)
+            if not runs:
+                yield from chunk
+                return
+            yield from heapq.merge(
+                *(QueryGenerator._read_run(run) for run in runs),
+                chunk,
+                key=comparator,
+                reverse=reverse,
+            )
+        finally:
+            for run in runs:
+                run.close()
+            memory.release(stats)
+
+    @staticmethod
+    def _spill_run(chunk):
+        import pickle
+        import tempfile
+
+        run = tempfile.TemporaryFile()
+        for i in chunk:
+            pickle.dump(i, run, protocol=pickle.HIGHEST_PROTOCOL)
+        run.seek(0)
+        return run
+
+    @staticmethod
+    def _read_run(run):
+        import pickle
+
+        while True:
+            try:
+                yield pickle.load(run)
+            except EOFError:
+                return
+
     @staticmethod
     def enumerate(iterable, start=0):
         for i, item in enumerate(iterable, start):
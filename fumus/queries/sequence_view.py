@@ -0,0 +1,45 @@
+# slicing a list, tuple, str, bytes or array copies the selected elements
+# -> skip/limit/view etc. keep the source and a range of indices instead (only ranges slice in O(1) by themselves)
+
+
+class SequenceView:
+    """
+    Lazy slice of a sequence - the source plus a range of the selected indices.
+    Slicing composes the index ranges; elements are read from the source only when accessed
+    """
+
+    __slots__ = ("_sequence", "_indices")
+
+    def __init__(self, sequence, indices):
+        self._sequence = sequence
+        self._indices = indices
+
+    def __len__(self):
+        return len(self._indices)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return SequenceView(self._sequence, self._indices[item])
+        return self._sequence[self._indices[item]]
+
+    def __iter__(self):
+        return map(self._sequence.__getitem__, self._indices)
+
+    def __reversed__(self):
+        return map(self._sequence.__getitem__, reversed(self._indices))
+
+    def to_sequence(self):
+        """Returns the selected elements copied into a sequence of the source type"""
+        start, stop, step = self._indices.start, self._indices.stop, self._indices.step
+        # NB: a negative stop of a descending range means 'before the first element', not counted from the end
+        return self._sequence[start : stop if stop >= 0 else None : step]
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({type(self._sequence).__name__}, {self._indices})"
+
+
+def slice_sequence(sequence, key):
+    """Returns the slice of a sequence - a view (no copy) unless the sequence slices in O(1) by itself"""
+    if isinstance(sequence, (range, SequenceView)):
+        return sequence[key]
+    return SequenceView(sequence, range(len(sequence))[key])
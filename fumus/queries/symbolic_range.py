@@ -0,0 +1,52 @@
+import math
+
+from fumus.utils.expression import Affine, Residue
+
+
+def map_range(range_obj, mapper):
+    """Returns the range produced by applying an integral Affine mapper to given range, or None if not applicable"""
+    if not (isinstance(mapper, Affine) and mapper.is_integral and mapper.a != 0):
+        return None
+    start = mapper(range_obj.start)
+    step = range_obj.step * mapper.a
+    return range(start, start + len(range_obj) * step, step)
+
+
+def filter_range(range_obj, predicate):
+    """Returns the sub-range matching a Residue predicate, or None if not applicable"""
+    if not (
+        isinstance(predicate, Residue) and not predicate.negated and predicate.affine.is_integral
+    ):
+        return None
+    affine, modulus, remainder = predicate.affine, predicate.modulus, predicate.remainder
+    # x % m lies in [0, m) for positive and in (m, 0] for negative m -> any other remainder never matches
+    if not (0 <= remainder < modulus if modulus > 0 else modulus < remainder <= 0):
+        return range_obj[:0]
+
+    # a * (start + i * step) + b == r (mod m) -> linear congruence step_a * i == target (mod m)
+    m = abs(modulus)
+    step_a = affine.a * range_obj.step % m
+    target = (remainder - affine(range_obj.start)) % m
+    g = math.gcd(step_a, m)
+    if target % g:
+        return range_obj[:0]
+    period = m // g
+    first = target // g * pow(step_a // g, -1, period) % period
+    return range_obj[first::period]
+
+
+def range_sum(range_obj):
+    """Sums an arithmetic progression in O(1)"""
+    if not range_obj:
+        return 0
+    return len(range_obj) * (range_obj[0] + range_obj[-1]) // 2
+
+
+def range_min(range_obj):
+    """Returns the minimum of a non-empty range in O(1)"""
+    return min(range_obj[0], range_obj[-1])
+
+
+def range_max(range_obj):
+    """Returns the maximum of a non-empty range in O(1)"""
+    return max(range_obj[0], range_obj[-1])
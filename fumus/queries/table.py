@@ -0,0 +1,206 @@
+import array
+import itertools as it
+import operator
+from collections.abc import Mapping
+
+from fumus.utils import DictItem
+
+WHERE_OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda x, y: x in y,
+    "not in": lambda x, y: x not in y,
+}
+
+AGGREGATIONS = {
+    "count": len,
+    "sum": sum,
+    "min": min,
+    "max": max,
+    "mean": lambda values: sum(values) / len(values),
+    "list": list,
+}
+
+
+class Table:
+    """
+    Columnar collection of records stored as struct-of-arrays (one list or array.array per field).
+    Operations only touch the columns they need and return new tables sharing the untouched columns
+    """
+
+    __slots__ = ("_columns", "_length")
+
+    def __init__(self, columns):
+        lengths = {len(column) for column in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError("All columns must have the same length")
+        self._columns = dict(columns)
+        self._length = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_records(cls, records, fields=None):
+        """
+        Creates Table from an iterable of records - dicts, tuples of DictItems or plain tuples/lists.
+        For dicts the fields default to the keys of the first record (missing values become None);
+        for plain tuples/lists the 'fields' are required
+        """
+        records = [cls._to_record(record) for record in records]
+        if not records:
+            return cls({field: [] for field in fields or ()})
+
+        if isinstance(records[0], Mapping):
+            fields = fields or list(records[0].keys())
+            return cls({field: [record.get(field) for record in records] for field in fields})
+
+        if fields is None:
+            raise ValueError("Fields are required for records that are not dicts")
+        # transposition happens in C
+        columns = list(zip(*records, strict=True)) if records[0] else [()] * len(fields)
+        if len(columns) != len(fields):
+            raise ValueError(f"Expected records with {len(fields)} fields, got {len(columns)}")
+        return cls({field: list(column) for field, column in zip(fields, columns)})
+
+    @staticmethod
+    def _to_record(record):
+        if isinstance(record, tuple) and record and isinstance(record[0], DictItem):
+            # let's not make unnecessary calls to property getters
+            return {item._key: item._value for item in record}  # noqa
+        return record
+
+    @property
+    def fields(self):
+        """Returns a tuple with the field names"""
+        return tuple(self._columns)
+
+    def column(self, field):
+        """Returns the column (list or array) of given field"""
+        try:
+            return self._columns[field]
+        except KeyError:
+            raise KeyError(f"Unknown field '{field}'") from None
+
+    def select(self, *fields):
+        """Projects the table onto given fields (no data is copied)"""
+        return Table({field: self.column(field) for field in fields})
+
+    def where(self, field, op, value=None):
+        """
+        Filters the rows by comparing the values of given field against a value.
+        'op' is one of '==', '!=', '<', '<=', '>', '>=', 'in', 'not in' or a predicate function of the field value
+        """
+        if callable(op):
+            mask = list(map(op, self.column(field)))
+        else:
+            try:
+                compare = WHERE_OPERATORS[op]
+            except KeyError:
+                raise ValueError(
+                    f"Invalid operator '{op}', expected one of: {', '.join(WHERE_OPERATORS)}"
+                ) from None
+            mask = [compare(x, value) for x in self.column(field)]
+        return Table({name: self._compress(column, mask) for name, column in self._columns.items()})
+
+    def order_by(self, field, *, reverse=False):
+        """Sorts the rows by the values of given field"""
+        column = self.column(field)
+        order = sorted(range(self._length), key=column.__getitem__, reverse=reverse)
+        return Table({name: self._take(col, order) for name, col in self._columns.items()})
+
+    def group_by(self, *fields):
+        """Groups the rows by given field(s); aggregate the groups via 'agg'"""
+        if not fields:
+            raise ValueError("At least one field is required for grouping")
+        return GroupedTable(self, fields)
+
+    def rows(self):
+        """Returns an iterator of row tuples (in the order of the fields)"""
+        return zip(*self._columns.values())
+
+    def to_records(self):
+        """Returns a list of dicts"""
+        fields = self.fields
+        return [dict(zip(fields, row)) for row in self.rows()]
+
+    def to_query(self):
+        """Returns a Query of dicts"""
+        from fumus.queries.query import Query
+
+        fields = self.fields
+        return Query(dict(zip(fields, row)) for row in self.rows())
+
+    @staticmethod
+    def _compress(column, mask):
+        if isinstance(column, array.array):
+            return array.array(column.typecode, it.compress(column, mask))
+        return list(it.compress(column, mask))
+
+    @staticmethod
+    def _take(column, indices):
+        if isinstance(column, array.array):
+            return array.array(column.typecode, map(column.__getitem__, indices))
+        return list(map(column.__getitem__, indices))
+
+    def __len__(self):
+        return self._length
+
+    def __eq__(self, other):
+        if not isinstance(other, Table):
+            return NotImplemented
+        return self.fields == other.fields and all(
+            list(self._columns[f]) == list(other._columns[f]) for f in self.fields
+        )
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(fields={list(self.fields)}, rows={self._length})"
+
+
+class GroupedTable:
+    """Rows of a Table grouped by one or more fields"""
+
+    __slots__ = ("_table", "_fields")
+
+    def __init__(self, table, fields):
+        self._table = table
+        self._fields = fields
+
+    def agg(self, **aggregations):
+        """
+        Aggregates each group into a row of a new Table with the grouping fields and given output columns.
+        Each aggregation is a (field, function) pair where function is one of
+        'count', 'sum', 'min', 'max', 'mean', 'list' or a callable receiving the list of values in the group
+        """
+        key_columns = [self._table.column(field) for field in self._fields]
+        keys = key_columns[0] if len(key_columns) == 1 else zip(*key_columns)
+        groups = {}
+        for idx, key in enumerate(keys):
+            groups.setdefault(key, []).append(idx)
+
+        if len(self._fields) == 1:
+            result = {self._fields[0]: list(groups)}
+        else:
+            result = {field: [key[i] for key in groups] for i, field in enumerate(self._fields)}
+
+        for name, (field, function) in aggregations.items():
+            column = self._table.column(field)
+            aggregate = self._resolve(function)
+            result[name] = [
+                aggregate(list(map(column.__getitem__, idx))) for idx in groups.values()
+            ]
+        return Table(result)
+
+    @staticmethod
+    def _resolve(function):
+        if callable(function):
+            return function
+        try:
+            return AGGREGATIONS[function]
+        except KeyError:
+            raise ValueError(
+                f"Invalid aggregation '{function}', expected one of: {', '.join(AGGREGATIONS)}"
+            ) from None
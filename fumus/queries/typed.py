@@ -0,0 +1,17 @@
+# array.array silently converts the elements it stores (ints into floats, bools into ints etc.)
+# -> typed queries check the element types before using an array buffer
+
+
+def element_type(typecode):
+    """Returns the Python type of the elements stored in an array.array of given typecode"""
+    if typecode in "fd":
+        return float
+    if typecode in "uw":
+        return str
+    return int
+
+
+def is_typed(values, typecode):
+    """Returns whether all values are exactly of the type stored in arrays of given typecode"""
+    expected = element_type(typecode)
+    return all(type(value) is expected for value in values)
@@ -0,0 +1,72 @@
+# Optional NumPy backend for numeric queries.
+# NumPy is imported lazily -> the core stays dependency-free unless 'Query.vectorized' is used
+def numpy():
+    try:
+        import numpy as np
+    except ImportError as e:
+        raise ImportError(
+            "NumPy is required for vectorized queries: pip install fumus[numpy]"
+        ) from e
+    return np
+
+
+def as_ndarray(iterable):
+    """Converts given iterable into a one-dimensional ndarray"""
+    np = numpy()
+    if isinstance(iterable, np.ndarray):
+        return iterable
+    if not hasattr(iterable, "__len__"):
+        iterable = list(iterable)
+    return np.asarray(iterable)
+
+
+def is_ndarray(iterable):
+    """Returns bool whether given iterable is an ndarray"""
+    return isinstance(iterable, numpy().ndarray)
+
+
+def is_ufunc(function):
+    """Returns bool whether given function is a NumPy ufunc (element-wise on arrays by definition)"""
+    return isinstance(function, numpy().ufunc)
+
+
+def map_array(arr, mapper):
+    """
+    Applies an array mapper (a ufunc or a function operating on whole arrays) to the array at once.
+    The mapper is called exactly once - a result that isn't an array of the same shape raises TypeError
+    """
+    np = numpy()
+    result = mapper(arr)
+    if isinstance(result, np.ndarray) and result.shape == arr.shape:
+        return result
+    raise TypeError(
+        f"Array mapper must return an array of shape {arr.shape}, got '{type(result).__name__}'"
+    )
+
+
+def filter_array(arr, predicate):
+    """
+    Evaluates an array predicate (called exactly once) into a boolean mask and applies it.
+    A result that isn't a boolean array of the same shape raises TypeError
+    """
+    np = numpy()
+    mask = predicate(arr)
+    if isinstance(mask, np.ndarray) and mask.dtype == np.bool_ and mask.shape == arr.shape:
+        return arr[mask]
+    raise TypeError(
+        f"Array predicate must return a boolean mask of shape {arr.shape}, got '{type(mask).__name__}'"
+    )
+
+
+def distinct_array(arr):
+    """Returns the distinct elements preserving the order of their first occurrence"""
+    np = numpy()
+    _, first_indices = np.unique(arr, return_index=True)
+    return arr[np.sort(first_indices)]
+
+
+def sort_array(arr, reverse=False):
+    """Sorts the array in ascending (or descending if 'reverse' flag is True) order"""
+    np = numpy()
+    result = np.sort(arr, kind="stable")
+    return result[::-1] if reverse else result
@@ -0,0 +1,326 @@
+import bisect
+import collections
+import heapq
+import operator
+
+
+class SumAggregator:
+    """Running sum - the element leaving the window is subtracted, the entering one is added"""
+
+    __slots__ = ("_total",)
+
+    def __init__(self):
+        self._total = 0
+
+    def add(self, x):
+        self._total += x
+
+    def remove(self, x):
+        self._total -= x
+
+    def merge(self, other):
+        self._total += other._total
+
+    def result(self):
+        return self._total
+
+
+class CountAggregator:
+    """Running count of the elements in the window"""
+
+    __slots__ = ("_count",)
+
+    def __init__(self):
+        self._count = 0
+
+    def add(self, x):  # noqa
+        self._count += 1
+
+    def remove(self, x):  # noqa
+        self._count -= 1
+
+    def merge(self, other):
+        self._count += other._count
+
+    def result(self):
+        return self._count
+
+
+class MeanAggregator:
+    """Running mean computed from a running sum and count"""
+
+    __slots__ = ("_total", "_count")
+
+    def __init__(self):
+        self._total = 0
+        self._count = 0
+
+    def add(self, x):
+        self._total += x
+        self._count += 1
+
+    def remove(self, x):
+        self._total -= x
+        self._count -= 1
+
+    def merge(self, other):
+        self._total += other._total
+        self._count += other._count
+
+    def result(self):
+        return self._total / self._count
+
+
+class MinAggregator:
+    """
+    Running minimum kept in a monotonic deque - each element is pushed and popped at most once,
+    so updates are amortized O(1). Elements must be removed in the order they were added
+    """
+
+    __slots__ = ("_deque",)
+    # an element evicts the ones at the back it dominates
+    _evicts = operator.gt
+
+    def __init__(self):
+        self._deque = collections.deque()
+
+    def add(self, x):
+        while self._deque and self._evicts(self._deque[-1], x):
+            self._deque.pop()
+        self._deque.append(x)
+
+    def remove(self, x):
+        if self._deque and self._deque[0] == x:
+            self._deque.popleft()
+
+    def merge(self, other):
+        if other._deque:
+            self.add(other.result())
+
+    def result(self):
+        return self._deque[0]
+
+
+class MaxAggregator(MinAggregator):
+    """Running maximum kept in a monotonic deque"""
+
+    __slots__ = ()
+    _evicts = operator.lt
+
+
+class CollectAggregator:
+    """Collects the window into a tuple (optionally passed to a function computing the result)"""
+
+    __slots__ = ("_elements", "_function")
+
+    def __init__(self, function=None):
+        self._elements = collections.deque()
+        self._function = function
+
+    def add(self, x):
+        self._elements.append(x)
+
+    def remove(self, x):  # noqa
+        self._elements.popleft()
+
+    def merge(self, other):
+        self._elements.extend(other._elements)
+
+    def result(self):
+        window = tuple(self._elements)
+        return self._function(window) if self._function else window
+
+
+AGGREGATORS = {
+    "sum": SumAggregator,
+    "count": CountAggregator,
+    "mean": MeanAggregator,
+    "min": MinAggregator,
+    "max": MaxAggregator,
+}
+
+
+def aggregator_factory(agg):
+    """
+    Resolves 'agg' into a factory of aggregators:
+    None collects the window into a tuple, a callable receives the tuple, a string picks an incremental aggregator
+    """
+    if agg is None:
+        return CollectAggregator
+    if isinstance(agg, str):
+        try:
+            return AGGREGATORS[agg]
+        except KeyError:
+            raise ValueError(
+                f"Invalid aggregation '{agg}', expected one of: {', '.join(AGGREGATORS)}"
+            ) from None
+    if callable(agg):
+        return lambda: CollectAggregator(agg)
+    raise TypeError("Aggregation must be a string, a callable or None")
+
+
+class CountWindow:
+    """
+    State of a count-based window - windows of 'size' elements start every 'step' elements.
+    Overlapping windows (step < size) are updated incrementally;
+    non-overlapping ones (step >= size) start from a fresh aggregator
+    """
+
+    __slots__ = ("_size", "_step", "_factory", "_aggregator", "_elements", "_seen")
+
+    def __init__(self, size, step, factory):
+        self._size = size
+        self._step = step
+        self._factory = factory
+        self._aggregator = factory()
+        self._elements = collections.deque()
+        self._seen = 0
+
+    def push(self, x):
+        """Adds an element; returns (True, result) if it completes a window, (False, None) otherwise"""
+        idx = self._seen
+        self._seen += 1
+        is_overlapping = self._step < self._size
+        if not is_overlapping and idx % self._step >= self._size:
+            # element falls into the gap between two windows
+            return False, None
+
+        self._aggregator.add(x)
+        if is_overlapping:
+            self._elements.append(x)
+            if len(self._elements) > self._size:
+                self._aggregator.remove(self._elements.popleft())
+
+        if idx < self._size - 1 or (idx - self._size + 1) % self._step:
+            return False, None
+        result = self._aggregator.result()
+        if not is_overlapping:
+            self._aggregator = self._factory()
+        return True, result
+
+
+class TimeWindows:
+    """
+    State of time-based windows - windows of 'size' start every 'slide' (aligned to the first timestamp).
+    A window is emitted as soon as the watermark (the greatest timestamp seen minus 'lateness') passes its end;
+    events arriving after all their windows were emitted are dropped
+    """
+
+    __slots__ = (
+        "_timestamp",
+        "_size",
+        "_slide",
+        "_factory",
+        "_lateness",
+        "_origin",
+        "_watermark",
+        "_windows",
+        "_starts",
+    )
+
+    def __init__(self, timestamp, size, slide, factory, lateness=None):
+        self._timestamp = timestamp
+        self._size = size
+        self._slide = slide
+        self._factory = factory
+        self._lateness = lateness
+        self._origin = None
+        self._watermark = None
+        self._windows = {}
+        # min-heap of the starts of the open windows
+        self._starts = []
+
+    def push(self, x):
+        """Adds an element; returns a list of (start, end, result) for the windows closed by it"""
+        ts = self._timestamp(x)
+        if self._origin is None:
+            self._origin = ts
+        start = self._origin + (ts - self._origin) // self._slide * self._slide
+        while start + self._size > ts:
+            if self._watermark is None or start + self._size > self._watermark:
+                window = self._windows.get(start)
+                if window is None:
+                    window = self._windows[start] = self._factory()
+                    heapq.heappush(self._starts, start)
+                window.add(x)
+            start -= self._slide
+
+        watermark = ts - self._lateness if self._lateness else ts
+        if self._watermark is None or watermark > self._watermark:
+            self._watermark = watermark
+        return self._emit(is_final=False)
+
+    def flush(self):
+        """Returns (start, end, result) for all windows still open"""
+        return self._emit(is_final=True)
+
+    def _emit(self, is_final):
+        emitted = []
+        while self._starts and (is_final or self._starts[0] + self._size <= self._watermark):
+            start = heapq.heappop(self._starts)
+            emitted.append((start, start + self._size, self._windows.pop(start).result()))
+        return emitted
+
+
+class SessionWindows:
+    """
+    State of session windows - events closer than 'gap' to each other belong to the same session;
+    an out-of-order event bridging two sessions merges them.
+    A session is emitted as soon as the watermark (the greatest timestamp seen minus 'lateness')
+    is more than 'gap' past its last event; events older than the watermark are dropped
+    (so no event can bridge into an already emitted session)
+    """
+
+    __slots__ = ("_timestamp", "_gap", "_factory", "_lateness", "_watermark", "_sessions")
+
+    def __init__(self, timestamp, gap, factory, lateness=None):
+        self._timestamp = timestamp
+        self._gap = gap
+        self._factory = factory
+        self._lateness = lateness
+        self._watermark = None
+        # open sessions as [first timestamp, last timestamp, aggregator] sorted by first timestamp
+        self._sessions = []
+
+    def push(self, x):
+        """Adds an element; returns a list of (first, last, result) for the sessions closed by it"""
+        ts = self._timestamp(x)
+        if self._watermark is not None and ts < self._watermark:
+            return []
+        gap = self._gap
+        idx = next(
+            (i for i, s in enumerate(self._sessions) if s[0] - gap <= ts <= s[1] + gap), None
+        )
+        if idx is None:
+            session = [ts, ts, self._factory()]
+            idx = bisect.bisect(self._sessions, ts, key=lambda s: s[0])
+            self._sessions.insert(idx, session)
+        else:
+            session = self._sessions[idx]
+            session[0], session[1] = min(session[0], ts), max(session[1], ts)
+        session[2].add(x)
+
+        # previous sessions end more than 'gap' before the event -> only the following ones can be bridged
+        while idx + 1 < len(self._sessions) and self._sessions[idx + 1][0] - gap <= session[1]:
+            following = self._sessions.pop(idx + 1)
+            session[1] = max(session[1], following[1])
+            session[2].merge(following[2])
+
+        watermark = ts - self._lateness if self._lateness else ts
+        if self._watermark is None or watermark > self._watermark:
+            self._watermark = watermark
+        return self._emit(is_final=False)
+
+    def flush(self):
+        """Returns (first, last, result) for all sessions still open"""
+        return self._emit(is_final=True)
+
+    def _emit(self, is_final):
+        emitted, still_open = [], []
+        for first, last, aggregator in self._sessions:
+            if is_final or last + self._gap < self._watermark:
+                emitted.append((first, last, aggregator.result()))
+            else:
+                still_open.append([first, last, aggregator])
+        self._sessions = still_open
+        return emitted
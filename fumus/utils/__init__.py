@@ -1,3 +1,23 @@
-from .dict_item import DictItem as DictItem
-from .optional import Optional as Optional
-from .result import Result as Result
+from fumus.utils.lazy import lazy_exports
+
+_EXPORTS = {
+    "DictItem": "fumus.utils.dict_item",
+    "Optional": "fumus.utils.optional",
+    "Result": "fumus.utils.result",
+    "MemoCache": "fumus.utils.memo_cache",
+    "PersistentCache": "fumus.utils.persistent_cache",
+    "X": "fumus.utils.expression",
+}
+
+# static re-exports for type checkers and IDEs - never executed at runtime
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from fumus.utils.dict_item import DictItem as DictItem
+    from fumus.utils.optional import Optional as Optional
+    from fumus.utils.result import Result as Result
+    from fumus.utils.memo_cache import MemoCache as MemoCache
+    from fumus.utils.persistent_cache import PersistentCache as PersistentCache
+    from fumus.utils.expression import X as X
+
+__all__ = list(_EXPORTS)
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS)
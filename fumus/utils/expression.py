@@ -0,0 +1,111 @@
+from numbers import Number
+
+
+class Affine:
+    """
+    Declarative affine mapper 'a * x + b'.
+    Behaves like a regular function, but can be recognized by Query
+    and applied to a range source symbolically (e.g. X * 2 + 1)
+    """
+
+    __slots__ = ("a", "b")
+
+    def __init__(self, a=1, b=0):
+        self.a = a
+        self.b = b
+
+    def __call__(self, x):
+        return self.a * x + self.b
+
+    @property
+    def is_integral(self):
+        """Returns bool whether both coefficients are integers (i.e. ranges map onto ranges)"""
+        return isinstance(self.a, int) and isinstance(self.b, int)
+
+    def __add__(self, other):
+        if not isinstance(other, Number):
+            return NotImplemented
+        return Affine(self.a, self.b + other)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if not isinstance(other, Number):
+            return NotImplemented
+        return Affine(self.a, self.b - other)
+
+    def __rsub__(self, other):
+        if not isinstance(other, Number):
+            return NotImplemented
+        return Affine(-self.a, other - self.b)
+
+    def __mul__(self, other):
+        if not isinstance(other, Number):
+            return NotImplemented
+        return Affine(self.a * other, self.b * other)
+
+    __rmul__ = __mul__
+
+    def __neg__(self):
+        return Affine(-self.a, -self.b)
+
+    def __mod__(self, other):
+        if not isinstance(other, int) or other == 0:
+            return NotImplemented
+        return Modulo(self, other)
+
+    def __repr__(self):
+        return f"X * {self.a} + {self.b}"
+
+
+class Modulo:
+    """Declarative '(a * x + b) % m' mapper; compare it to a number to get a Residue predicate"""
+
+    __slots__ = ("affine", "modulus")
+
+    def __init__(self, affine, modulus):
+        self.affine = affine
+        self.modulus = modulus
+
+    def __call__(self, x):
+        return self.affine(x) % self.modulus
+
+    def __eq__(self, other):
+        if not isinstance(other, int):
+            return NotImplemented
+        return Residue(self.affine, self.modulus, other)
+
+    def __ne__(self, other):
+        if not isinstance(other, int):
+            return NotImplemented
+        return Residue(self.affine, self.modulus, other, negated=True)
+
+    __hash__ = object.__hash__
+
+    def __repr__(self):
+        return f"({self.affine!r}) % {self.modulus}"
+
+
+class Residue:
+    """
+    Declarative predicate '(a * x + b) % m == r'.
+    Filtering a range source with it yields another range, computed without iteration
+    """
+
+    __slots__ = ("affine", "modulus", "remainder", "negated")
+
+    def __init__(self, affine, modulus, remainder, negated=False):
+        self.affine = affine
+        self.modulus = modulus
+        self.remainder = remainder
+        self.negated = negated
+
+    def __call__(self, x):
+        return (self.affine(x) % self.modulus == self.remainder) is not self.negated
+
+    def __repr__(self):
+        operator = "!=" if self.negated else "=="
+        return f"({self.affine!r}) % {self.modulus} {operator} {self.remainder}"
+
+
+X = Affine()
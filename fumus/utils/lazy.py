@@ -0,0 +1,24 @@
+import sys
+
+
+def lazy_exports(package, exports):
+    """
+    Returns the module-level __getattr__ and __dir__ (PEP 562) of a package
+    that imports each of its 'exports' (name -> module path) on first access
+    """
+
+    def __getattr__(name):
+        try:
+            module = exports[name]
+        except KeyError:
+            raise AttributeError(f"module '{package}' has no attribute '{name}'") from None
+        # NB: __import__ (unlike importlib.import_module) shows up in "python -X importtime"
+        value = getattr(__import__(module, fromlist=[name]), name)
+        # cache on the package -> __getattr__ is called only once per name
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__():
+        return sorted({*vars(sys.modules[package]), *exports})
+
+    return __getattr__, __dir__
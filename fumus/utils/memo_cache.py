@@ -0,0 +1,147 @@
+from collections import OrderedDict
+from contextlib import nullcontext
+
+_MISSING = object()
+
+
+class MemoCache:
+    """
+    Bounded cache for the results of pure functions.
+    Evicts entries by 'lru' (least recently used) or 'lfu' (least frequently used) policy
+    and keeps hit/miss/eviction statistics. Can be shared across queries
+    """
+
+    __slots__ = (
+        "_maxsize",
+        "_policy",
+        "_data",
+        "_freq",
+        "_buckets",
+        "_min_freq",
+        "_lock",
+        "hits",
+        "misses",
+        "evictions",
+    )
+
+    def __init__(self, maxsize=128, policy="lru", *, thread_safe=False):
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("Cache maxsize must be a positive integer or None")
+        if policy not in ("lru", "lfu"):
+            raise ValueError(f"Invalid cache policy '{policy}', expected: 'lru' or 'lfu'")
+        self._maxsize = maxsize
+        self._policy = policy
+        self._data = OrderedDict() if policy == "lru" else {}
+        # lfu bookkeeping: key -> frequency, frequency -> keys in insertion order
+        self._freq = {}
+        self._buckets = {}
+        self._min_freq = 0
+        if thread_safe:
+            import threading
+
+            self._lock = threading.RLock()
+        else:
+            self._lock = nullcontext()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+    @property
+    def policy(self):
+        return self._policy
+
+    def get(self, key, default=None):
+        """Returns the cached value for the given key or a default value"""
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._touch(key)
+            return value
+
+    def put(self, key, value):
+        """Stores the value under the given key, evicting an entry if the cache is full"""
+        with self._lock:
+            if key in self._data:
+                self._data[key] = value
+                self._touch(key)
+                return
+            if self._maxsize is not None and len(self._data) >= self._maxsize:
+                self._evict()
+            self._data[key] = value
+            if self._policy == "lfu":
+                self._freq[key] = 1
+                self._buckets.setdefault(1, OrderedDict())[key] = None
+                self._min_freq = 1
+
+    def get_or_compute(self, key, supplier):
+        """
+        Returns the cached value for the given key;
+        on a miss calls the supplier (outside the lock) and caches the result
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = supplier()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """Drops all entries; statistics are kept"""
+        with self._lock:
+            self._data.clear()
+            self._freq.clear()
+            self._buckets.clear()
+            self._min_freq = 0
+
+    def stats(self):
+        """Returns a dict with the cache statistics"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size": len(self._data),
+                "maxsize": self._maxsize,
+                "policy": self._policy,
+            }
+
+    def _touch(self, key):
+        if self._policy == "lru":
+            self._data.move_to_end(key)
+            return
+        freq = self._freq[key]
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+            if self._min_freq == freq:
+                self._min_freq = freq + 1
+        self._freq[key] = freq + 1
+        self._buckets.setdefault(freq + 1, OrderedDict())[key] = None
+
+    def _evict(self):
+        if self._policy == "lru":
+            self._data.popitem(last=False)
+        else:
+            bucket = self._buckets[self._min_freq]
+            key, _ = bucket.popitem(last=False)
+            if not bucket:
+                del self._buckets[self._min_freq]
+            del self._freq[key]
+            del self._data[key]
+        self.evictions += 1
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}(maxsize={self._maxsize}, policy={self._policy!r}, size={len(self)})"
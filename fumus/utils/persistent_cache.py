@@ -0,0 +1,118 @@
+import hashlib
+import pickle
+import types
+
+# keep well below SQLite's limit of host parameters per statement
+_MAX_QUERY_PARAMS = 900
+
+
+class PersistentCache:
+    """
+    On-disk (SQLite) store for the results of pure functions that survives process restarts.
+    Entries are keyed by a stable hash of the input combined with the function version
+    """
+
+    def __init__(self, path, version=""):
+        import sqlite3
+
+        self._version = version
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def version_of(function):
+        """
+        Derives a version tag from the qualified name and the code of the given function
+        (bytecode, constants, referenced names, defaults and closure values - nested functions included),
+        so that changing the function invalidates its cached results.
+        NB: functions called by it are identified by name only.
+        Callables without code (other than builtin functions) need an explicit version
+        """
+        name = f"{getattr(function, '__module__', '')}.{getattr(function, '__qualname__', repr(function))}"
+        if getattr(function, "__code__", None) is None:
+            if isinstance(function, types.BuiltinFunctionType) and isinstance(
+                function.__self__, (types.ModuleType, type(None))
+            ):
+                return f"{name}:"
+            raise ValueError(
+                f"Cannot derive a version of {function!r} - pass an explicit 'version'"
+            )
+        digest = hashlib.sha256()
+        PersistentCache._hash_value(function, digest, set())
+        return f"{name}:{digest.hexdigest()[:16]}"
+
+    @staticmethod
+    def _hash_value(value, digest, seen):
+        if id(value) in seen:
+            # recursive function referencing itself via its closure
+            return
+        if hasattr(value, "__code__"):
+            seen.add(id(value))
+            PersistentCache._hash_value(value.__code__, digest, seen)
+            PersistentCache._hash_value(getattr(value, "__defaults__", None), digest, seen)
+            PersistentCache._hash_value(getattr(value, "__kwdefaults__", None), digest, seen)
+            for cell in getattr(value, "__closure__", None) or ():
+                try:
+                    contents = cell.cell_contents
+                except ValueError:
+                    contents = None  # empty cell
+                PersistentCache._hash_value(contents, digest, seen)
+        elif isinstance(value, types.CodeType):
+            digest.update(value.co_code)
+            digest.update(repr((value.co_names, value.co_varnames)).encode())
+            for const in value.co_consts:
+                PersistentCache._hash_value(const, digest, seen)
+        elif isinstance(value, (tuple, list)):
+            for item in value:
+                PersistentCache._hash_value(item, digest, seen)
+        elif isinstance(value, dict):
+            for key, item in value.items():
+                digest.update(repr(key).encode())
+                PersistentCache._hash_value(item, digest, seen)
+        else:
+            # NB: a repr holding a memory address makes the version change across processes
+            digest.update(repr(value).encode())
+
+    def hash_key(self, key):
+        """
+        Returns a stable hash for given key.
+        NB: keys are pickled -> prefer primitives, tuples or sorted collections over sets
+        """
+        payload = pickle.dumps((self._version, key), protocol=4)
+        return hashlib.sha256(payload).hexdigest()
+
+    def get_many(self, hashed_keys):
+        """Returns a dict with the found (hashed key, value) pairs, reading in batches"""
+        found = {}
+        for i in range(0, len(hashed_keys), _MAX_QUERY_PARAMS):
+            chunk = hashed_keys[i : i + _MAX_QUERY_PARAMS]
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT key, value FROM results WHERE key IN ({placeholders})",  # noqa: S608
+                chunk,
+            )
+            found.update((k, pickle.loads(v)) for k, v in rows)
+        return found
+
+    def put_many(self, items):
+        """Stores the given (hashed key, value) pairs in a single transaction"""
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)",
+                ((k, pickle.dumps(v, protocol=pickle.HIGHEST_PROTOCOL)) for k, v in items),
+            )
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from fumus import Query
+from fumus.queries.itertools_mixin import ItertoolsMixin
+from fumus.queries.query_generator import QueryGenerator
+
+from benchmarks import cases, compare, run
+
+
+@pytest.mark.parametrize("case", [c for c in cases.CASES if c.is_deterministic], ids=repr)
+@pytest.mark.parametrize("n", [1, 10, 101])
+def test_case_matches_baseline(case, n):
+    data = case.data(n)
+    assert case.fumus(data) == case.baseline(data)
+
+
+@pytest.mark.parametrize("cls", [Query, ItertoolsMixin, QueryGenerator])
+def test_every_operation_is_benchmarked(cls):
+    covered = {case.name for case in cases.CASES}
+    missing = [
+        name
+        for name in vars(cls)
+        # constants aren't operations
+        if not name.startswith("_")
+        and not name.isupper()
+        and name not in cases.NOT_BENCHMARKED
+        # mixin methods overridden in Query are covered by the Query cases
+        and not {f"{cls.__name__}.{name}", f"Query.{name}"} & covered
+    ]
+    assert missing == []
+
+
+def test_run_and_compare(tmp_path):
+    document = run.run(["small"], pattern=r"^Query\.(map|filter)$", min_time=0, verbose=False)
+    assert [r["case"] for r in document["results"]] == ["Query.filter", "Query.map"]
+    result = document["results"][0]
+    assert result["n"] == 10
+    assert result["fumus"]["time"] > 0
+    assert result["fumus"]["peak_memory"] > 0
+
+    old = tmp_path / "old.json"
+    new = tmp_path / "new.json"
+    old.write_text(json.dumps(document))
+    document["results"][0]["fumus"]["time"] *= 2
+    new.write_text(json.dumps(document))
+    assert compare.main([str(old), str(old)]) == 0
+    assert compare.main([str(old), str(new), "--threshold", "0.5"]) == 1
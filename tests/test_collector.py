@@ -0,0 +1,63 @@
+import operator
+
+import pytest
+
+from fumus.queries import Collector
+from fumus.utils import Optional
+
+
+def _collect(collector, iterable):
+    state = collector.supplier()
+    for x in iterable:
+        state = collector.accumulator(state, x)
+    return collector.finish(state)
+
+
+def test_counting():
+    assert _collect(Collector.counting(), "abc") == 3
+    assert _collect(Collector.counting(), []) == 0
+
+
+def test_summing_averaging():
+    assert _collect(Collector.summing(), [1, 2, 3]) == 6
+    assert _collect(Collector.averaging(), [1, 2, 3]) == 2
+    assert _collect(Collector.averaging(), []) == 0
+
+
+def test_min_max_by():
+    assert _collect(Collector.min_by(), [3, 1, 2]) == Optional.of(1)
+    assert _collect(Collector.max_by(len), ["a", "ccc", "bb"]) == Optional.of("ccc")
+    assert _collect(Collector.max_by(), []).is_empty
+
+
+def test_min_by_keeps_first_of_equal():
+    assert _collect(Collector.min_by(operator.itemgetter(0)), [(1, "x"), (1, "y")]).get() == (
+        1,
+        "x",
+    )
+
+
+def test_reducing():
+    assert _collect(Collector.reducing(operator.mul), [2, 3, 4]) == Optional.of(24)
+    assert _collect(Collector.reducing(operator.add, identity=10), [1, 2]) == Optional.of(13)
+    assert _collect(Collector.reducing(operator.add), []).is_empty
+
+
+def test_to_list_to_set():
+    assert _collect(Collector.to_list(), (1, 2, 2)) == [1, 2, 2]
+    assert _collect(Collector.to_set(), (1, 2, 2)) == {1, 2}
+
+
+def test_for_each():
+    seen = []
+    assert _collect(Collector.for_each(seen.append), [1, 2]) is None
+    assert seen == [1, 2]
+
+
+def test_collector_of():
+    counting = Collector.counting()
+    assert Collector.of(counting) is counting
+    assert isinstance(Collector.of(print), Collector)
+    with pytest.raises(TypeError) as e:
+        Collector.of(42)
+    assert str(e.value) == "Cannot create Collector from 'int' type"
@@ -0,0 +1,39 @@
+from fumus.utils import X
+from fumus.utils.expression import Affine, Modulo, Residue
+
+
+def test_affine_builds_coefficients():
+    expr = (X * 3 + 1) * 2 - 5
+    assert isinstance(expr, Affine)
+    assert (expr.a, expr.b) == (6, -3)
+    assert expr(2) == 9
+
+
+def test_affine_reflected_operators():
+    assert (10 - X)(3) == 7
+    assert (2 * X + 1)(4) == 9
+    assert (-X)(4) == -4
+    assert (1 + X)(4) == 5
+
+
+def test_affine_is_integral():
+    assert (X * 2 + 1).is_integral
+    assert not (X * 0.5).is_integral
+
+
+def test_modulo_and_residue():
+    mod = X % 3
+    assert isinstance(mod, Modulo)
+    assert mod(7) == 1
+
+    predicate = X % 3 == 1
+    assert isinstance(predicate, Residue)
+    assert [x for x in range(10) if predicate(x)] == [1, 4, 7]
+
+    negated = (X + 1) % 3 != 0
+    assert [x for x in range(6) if negated(x)] == [0, 1, 3, 4]
+
+
+def test_expression_repr():
+    assert repr(X * 2 + 1) == "X * 2 + 1"
+    assert repr(X % 3 == 0) == "(X * 1 + 0) % 3 == 0"
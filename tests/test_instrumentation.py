@@ -0,0 +1,335 @@
+import io
+import time
+from contextlib import redirect_stdout
+
+import pytest
+
+from fumus import Query
+from fumus.queries.sequence_view import SequenceView
+from fumus.utils import X
+from fumus.exceptions.exception import IllegalStateError
+from fumus.instrumentation import Plan, Profile, Tracer, get_tracer, set_tracer
+from fumus.instrumentation.profile import describe_stage, describe_value, measure, StageStats
+
+
+def test_measure():
+    stats = StageStats("map")
+    assert list(measure(iter([1, 2, 3]), stats)) == [1, 2, 3]
+    assert stats.elements_out == 3
+    assert stats.time > 0
+
+
+def test_describe_stage():
+    assert describe_stage("map", (str,), {}) == "map(str)"
+    assert describe_stage("filter", (lambda x: x,), {}) == "filter(<lambda>)"
+    assert describe_stage("sort", (), {"reverse": True}) == "sort(reverse=True)"
+    assert describe_stage("concat", ([1, 2, 3],), {}) == "concat(list[3])"
+
+
+def test_describe_value_truncated():
+    assert describe_value("x" * 50) == "'" + "x" * 36 + "..."
+    assert describe_value(x for x in []) == "<generator>"
+
+
+def test_profile_sized_stage_not_measured():
+    profile = Profile()
+    source = [1, 2, 3]
+    assert profile.add_source(source) is source
+    assert profile.stages[0].elements_out == 3
+    assert profile.stages[0].is_lazy is False
+
+
+def test_instrument():
+    query = Query(range(10)).instrument().filter(lambda x: x % 2).map(str)
+    assert query.to_list() == ["1", "3", "5", "7", "9"]
+
+    stages = query.profile["stages"]
+    assert [s["label"] for s in stages] == [
+        "source(range[10])",
+        "filter(<lambda>)",
+        "map(str)",
+        "to_list()",
+    ]
+    assert [(s["elements_in"], s["elements_out"]) for s in stages] == [
+        (10, 10),
+        (10, 5),
+        (5, 5),
+        (5, None),
+    ]
+    assert all(s["time"] >= s["self_time"] >= 0 for s in stages)
+    assert query.profile["total_time"] == stages[-1]["time"]
+    assert query.profile["overhead"] >= 0
+
+
+def test_instrument_excludes_plan_recording(monkeypatch):
+    def slow_add_stage(*args):
+        time.sleep(0.05)
+
+    monkeypatch.setattr(Plan, "add_stage", slow_add_stage)
+    query = Query([5, 3, 1, 2]).instrument().map(abs).filter(bool)
+    query.to_list()
+    assert all(stage["time"] < 0.05 for stage in query.profile["stages"])
+
+
+def test_disabled_instrumentation_skips_timing(monkeypatch):
+    def perf_counter():
+        raise AssertionError("timed while not instrumented")
+
+    monkeypatch.setattr(time, "perf_counter", perf_counter)
+    query = Query([1, 2, 3]).skip(1).map(str)
+    assert query._plan.stages[0][3] is SequenceView
+    assert query.to_list() == ["2", "3"]
+
+
+def test_instrument_partial_consumption():
+    query = Query.iterate(0, lambda x: x + 1).instrument().map(lambda x: x * 2).limit(3)
+    assert query.to_list() == [0, 2, 4]
+    assert [s["elements_out"] for s in query.profile["stages"]] == [3, 3, 3, None]
+
+
+def test_instrument_keeps_fast_paths():
+    query = Query([3, 1, 2]).instrument().skip(1)
+    # sequence source -> served by slicing, no measuring generator in between
+    assert query.iterable.to_sequence() == [1, 2]
+    assert query.count() == 2
+    assert [s["elements_out"] for s in query.profile["stages"]] == [3, 2, None]
+
+
+def test_instrument_nested_stages_recorded_once():
+    query = Query([3, 1, 2]).instrument().reverse()
+    assert query.to_list() == [3, 2, 1]
+    assert [s["name"] for s in query.profile["stages"]] == ["source", "reverse", "to_list"]
+
+
+def test_instrument_itertools_stages():
+    query = Query(range(6)).instrument().batched(2)
+    assert query.to_list() == [(0, 1), (2, 3), (4, 5)]
+    assert [s["label"] for s in query.profile["stages"]][1] == "batched(2)"
+
+
+def test_not_instrumented():
+    query = Query([1, 2]).map(str)
+    assert query.profile is None
+    assert query.iterable.__name__ == "map"
+
+
+def test_explain_analyze():
+    query = Query([1, 2, 3]).instrument().map(str)
+    query.to_list()
+    f = io.StringIO()
+    with redirect_stdout(f):
+        # allowed on consumed queries
+        query.explain_analyze()
+    lines = f.getvalue().splitlines()
+    assert lines[0].startswith("to_list()  in=3 time=")
+    assert lines[1].startswith("└─ map(str)  in=3 out=3 time=")
+    assert lines[2].startswith("   └─ source(list[3])  in=3 out=3 time=")
+    assert lines[3].startswith("instrumentation overhead: ~")
+
+
+def test_explain_analyze_not_instrumented():
+    with pytest.raises(IllegalStateError) as e:
+        Query([1]).explain_analyze()
+    assert str(e.value) == "Query is not instrumented"
+
+
+def _explain(query, **kwargs):
+    f = io.StringIO()
+    with redirect_stdout(f):
+        query.explain(**kwargs)
+    return f.getvalue().splitlines()
+
+
+def test_explain():
+    query = Query.iterate(1, lambda x: x + 1).filter(lambda x: x % 2).map(str).limit(3)
+    assert _explain(query) == [
+        "limit(3)",
+        "└─ map(str)",
+        "   └─ filter(<lambda>)",
+        "      └─ source(<generator>)",
+    ]
+    # not consumed
+    assert query.to_list() == ["1", "3", "5"]
+
+
+def test_explain_fast_paths():
+    query = Query.from_range(0, 100).map(X * 2).filter(X % 3 == 0).skip(2).sort(reverse=True)
+    assert _explain(query) == [
+        "sort(reverse=True)  [symbolic range, no iteration]",
+        "└─ skip(2)  [symbolic range, no iteration]",
+        "   └─ filter((X * 1 + 0) % 3 == 0)  [symbolic range, no iteration]",
+        "      └─ map(X * 2 + 0)  [symbolic range, no iteration]",
+        "         └─ source(range[100])",
+        "terminal operations: count, sum, average, min, max in closed form; contains in O(1)",
+    ]
+
+
+def test_explain_materialized():
+    assert _explain(Query(x for x in [3, 1]).map(abs).as_array("q").sort()) == [
+        "sort()  [materialized into array]",
+        "└─ as_array('q')  [materialized into array]",
+        "   └─ map(abs)",
+        "      └─ source(<generator>)",
+        "terminal operations: count via len(), take_last/take_nth by indexing",
+    ]
+
+
+def test_explain_lazy_partition():
+    # pair of lazy iterators -> not reported as materialized
+    assert _explain(Query(x for x in [1, 2, 3]).partition(lambda x: x % 2)) == [
+        "partition(<lambda>)",
+        "└─ source(<generator>)",
+    ]
+
+
+def test_explain_plan_built_lazily():
+    query = Query([1, 2])
+    assert query._plan is None
+    assert _explain(query) == [
+        "source(list[2])",
+        "terminal operations: count via len(), take_last/take_nth by indexing",
+    ]
+    query.map(str)
+    assert [stage[0] for stage in query._plan.stages] == ["map"]
+
+
+def test_explain_sequence_slicing():
+    assert _explain(Query([1, 2, 3]).limit(2)) == [
+        "limit(2)  [sequence slicing, no iteration]",
+        "└─ source(list[3])",
+        "terminal operations: count via len(), take_last/take_nth by indexing",
+    ]
+
+
+def test_explain_nested_stages_recorded_once():
+    # reverse calls sort internally
+    assert _explain(Query([2, 1, 3]).reverse()) == ["reverse()", "└─ source(list[3])"]
+
+
+def test_explain_consumed_query():
+    query = Query([1, 2]).map(str)
+    query.to_list()
+    assert _explain(query) == ["map(str)", "└─ source(list[2])"]
+
+
+def test_explain_analyze_flag():
+    query = Query([1]).instrument()
+    query.to_list()
+    assert _explain(query, analyze=True)[0].startswith("to_list()  in=1 time=")
+
+
+class RecordingTracer(Tracer):
+    def __init__(self):
+        self.events = []
+
+    def on_stage_start(self, stage):
+        self.events.append(("start", stage.name, stage.elements_out))
+
+    def on_batch(self, stage):
+        self.events.append(("batch", stage.name, stage.elements_out))
+
+    def on_stage_end(self, stage):
+        self.events.append(("end", stage.name, stage.elements_out))
+
+    def on_terminal(self, stage):
+        self.events.append(("terminal", stage.name, stage.time > 0))
+
+
+@pytest.fixture
+def global_tracer():
+    tracer = RecordingTracer()
+    set_tracer(tracer, batch_size=2)
+    yield tracer
+    set_tracer(None)
+
+
+def test_trace():
+    tracer = RecordingTracer()
+    query = Query(range(5)).trace(tracer, batch_size=2).filter(lambda x: x % 2).map(str)
+    assert query.to_list() == ["1", "3"]
+    assert tracer.events == [
+        ("start", "map", 0),
+        ("start", "filter", 0),
+        ("batch", "filter", 2),
+        ("batch", "map", 2),
+        ("end", "filter", 2),
+        ("end", "map", 2),
+        ("terminal", "to_list", True),
+    ]
+
+
+def test_trace_closed_early():
+    tracer = RecordingTracer()
+    query = Query.iterate(0, lambda x: x + 1).trace(tracer, batch_size=100).map(str).limit(2)
+    assert query.to_list() == ["0", "1"]
+    assert tracer.events == [
+        ("start", "limit", 0),
+        ("start", "map", 0),
+        # the upstream of 'limit' is released (and closed) as soon as the limit is reached
+        ("end", "map", 2),
+        ("end", "limit", 2),
+        ("terminal", "to_list", True),
+    ]
+
+
+def test_trace_cache():
+    tracer = RecordingTracer()
+    query = Query(x for x in range(5)).trace(tracer).map(str)
+    assert query.cache().open().to_list() == ["0", "1", "2", "3", "4"]
+    # the stages are read by the cache after the terminal operation returned
+    assert tracer.events == [
+        ("terminal", "cache", True),
+        ("start", "map", 0),
+        ("end", "map", 5),
+    ]
+
+
+def test_global_tracer_cache(global_tracer):
+    cache = Query(x for x in range(3)).map(str).cache()
+    assert cache.open().to_list() == ["0", "1", "2"]
+    assert cache.open().to_list() == ["0", "1", "2"]
+
+
+def test_trace_sized_stage():
+    tracer = RecordingTracer()
+    assert Query([1, 2, 3]).trace(tracer).skip(1).count() == 2
+    assert tracer.events == [
+        ("start", "skip", 2),
+        ("end", "skip", 2),
+        ("terminal", "count", True),
+    ]
+
+
+def test_trace_sampling():
+    tracer = RecordingTracer()
+    Query([1, 2]).trace(tracer, sample_rate=0).map(str).to_list()
+    assert tracer.events == []
+    assert Query([1]).trace(tracer, sample_rate=0)._tracing is None
+
+
+def test_global_tracer(global_tracer):
+    assert get_tracer() is global_tracer
+    assert Query([1, 2, 3]).map(str).to_list() == ["1", "2", "3"]
+    assert global_tracer.events == [
+        ("start", "map", 0),
+        ("batch", "map", 2),
+        ("end", "map", 3),
+        ("terminal", "to_list", True),
+    ]
+
+
+def test_global_tracer_removed(global_tracer):
+    set_tracer(None)
+    assert get_tracer() is None
+    Query([1]).map(str).to_list()
+    assert global_tracer.events == []
+
+
+def test_trace_invalid_args():
+    with pytest.raises(ValueError) as e:
+        Query([1]).trace(Tracer(), sample_rate=2)
+    assert str(e.value) == "Sample rate must be between 0 and 1"
+
+    with pytest.raises(ValueError) as e:
+        set_tracer(Tracer(), batch_size=0)
+    assert str(e.value) == "Batch size must be a positive integer"
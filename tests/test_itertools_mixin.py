@@ -1,9 +1,14 @@
+import array
 import itertools as it
 import operator
 
 import pytest
 
 from fumus import Query
+from fumus.exceptions.exception import BackpressureError
+from fumus.queries import Collector, register_itertool
+from fumus.queries import itertools_mixin
+from fumus.queries.itertools_mixin import ItertoolsMixin, _resolve_adapter
 
 
 def test_accumulate():
@@ -342,6 +347,73 @@ def test_partition():
     ]
 
 
+def test_partition_eager():
+    calls = []
+
+    def _is_odd(x):
+        calls.append(x)
+        return x % 2 != 0
+
+    assert Query(range(6)).partition(_is_odd, mode="eager").to_list() == [[1, 3, 5], [0, 2, 4]]
+    assert calls == list(range(6))
+
+
+def test_partition_eager_deferred():
+    source = iter(range(6))
+    query = Query(source).partition(lambda x: x % 2, mode="eager")
+    # the upstream is read on the first pull
+    assert next(source) == 0
+    assert query.to_list() == [[1, 3, 5], [2, 4]]
+
+
+def test_partition_eager_collector():
+    assert Query(range(7)).partition(
+        lambda x: x > 4, mode="eager", collector=Collector.counting()
+    ).to_tuple() == (
+        2,
+        5,
+    )
+
+
+def test_partition_bounded():
+    calls = []
+
+    def _is_odd(x):
+        calls.append(x)
+        return x % 2 != 0
+
+    odds, evens = Query(range(10)).partition(_is_odd, mode="bounded", buffer_size=1).to_tuple()
+    assert list(zip(odds, evens)) == [(1, 0), (3, 2), (5, 4), (7, 6), (9, 8)]
+    assert calls == list(range(10))
+
+
+def test_partition_bounded_unlimited():
+    odds, evens = Query(range(10)).partition(lambda x: x % 2, mode="bounded").to_tuple()
+    assert list(evens) == [0, 2, 4, 6, 8]
+    assert list(odds) == [1, 3, 5, 7, 9]
+
+
+def test_partition_bounded_backpressure():
+    odds, evens = (
+        Query(range(10)).partition(lambda x: x % 2, mode="bounded", buffer_size=2).to_tuple()
+    )
+    with pytest.raises(BackpressureError) as e:
+        list(odds)
+    assert str(e.value) == (
+        "Partition buffer exceeded 2 elements; consume both sides in step or increase 'buffer_size'"
+    )
+    # the element exceeding the limit isn't lost -> both sides resume after draining the other one
+    assert [next(evens) for _ in range(3)] == [0, 2, 4]
+    assert list(odds) == [5, 7, 9]
+    assert list(evens) == [6, 8]
+
+
+def test_partition_invalid_mode():
+    with pytest.raises(ValueError) as e:
+        Query(range(10)).partition(bool, mode="foo")
+    assert str(e.value) == "Invalid partition mode 'foo', expected: 'lazy', 'eager' or 'bounded'"
+
+
 def test_round_robin():
     assert Query(["ABC", "D", "EF"]).round_robin().to_list() == ["A", "D", "E", "B", "F", "C"]
 
@@ -389,6 +461,139 @@ def test_grouper_invalid_incomplete_flag():
     assert str(e.value) == "Invalid incomplete flag 'foo', expected: 'fill', 'strict', or 'ignore'"
 
 
+# ### use dispatch ###
+def test_use_custom_function():
+    def every_other(iterable, offset=0):
+        return it.islice(iterable, offset, None, 2)
+
+    assert Query("ABCDEF").use(every_other).to_list() == ["A", "C", "E"]
+    assert Query("ABCDEF").use(every_other, offset=1).to_list() == ["B", "D", "F"]
+
+
+def test_use_custom_function_resolved_once():
+    def doubled(iterable):
+        return (x * 2 for x in iterable)
+
+    _resolve_adapter.cache_clear()
+    for _ in range(3):
+        assert Query([1, 2]).use(doubled).to_list() == [2, 4]
+    assert _resolve_adapter.cache_info().misses == 1
+    assert _resolve_adapter.cache_info().hits == 2
+
+
+def test_dispatch_sets_class_attributes():
+    assert "chain" in ItertoolsMixin.NO_SIGNATURE_FUNCTIONS
+    assert "tee" in ItertoolsMixin.NO_KWARGS_FUNCTIONS
+
+
+def test_use_unhashable_function():
+    class Doubler:
+        __hash__ = None
+
+        def __call__(self, iterable):
+            return (x * 2 for x in iterable)
+
+    assert Query([1, 2]).use(Doubler()).to_list() == [2, 4]
+
+
+def test_register_itertool(monkeypatch):
+    def chunk_pairs(iterable):
+        return zip(*[iter(iterable)] * 2)
+
+    monkeypatch.setattr(
+        itertools_mixin, "_ITERTOOLS_ADAPTERS", dict(itertools_mixin._ITERTOOLS_ADAPTERS)
+    )
+    register_itertool(chunk_pairs, lambda iterable, **kwargs: map(list, chunk_pairs(iterable)))
+    assert Query(range(4)).use(chunk_pairs).to_list() == [[0, 1], [2, 3]]
+
+
+# ### batched ###
+def test_batched_stage():
+    assert Query("ABCDEFG").batched(3).to_list() == [("A", "B", "C"), ("D", "E", "F"), ("G",)]
+
+
+def test_batched_strict():
+    assert Query("ABCDEF").batched(3, strict=True).to_list() == [("A", "B", "C"), ("D", "E", "F")]
+    with pytest.raises(ValueError) as e:
+        Query("ABCDEFG").batched(3, strict=True).to_list()
+    assert str(e.value) == "batched(): incomplete batch"
+
+
+def test_batched_list_chunks():
+    assert Query(range(5)).batched(2, chunk_type=list).to_list() == [[0, 1], [2, 3], [4]]
+
+
+def test_batched_array_chunks():
+    chunks = Query(range(5)).batched(2, chunk_type=array.array, typecode="q").to_list()
+    assert chunks == [array.array("q", [0, 1]), array.array("q", [2, 3]), array.array("q", [4])]
+
+    source = array.array("d", [1.0, 2.0, 3.0])
+    assert Query(source).batched(2, chunk_type=array.array).to_list() == [
+        array.array("d", [1.0, 2.0]),
+        array.array("d", [3.0]),
+    ]
+
+
+def test_batched_memoryview_chunks():
+    chunks = Query(b"abcdefg").batched(3, chunk_type=memoryview).map(bytes).to_list()
+    assert chunks == [b"abc", b"def", b"g"]
+    assert Query([1, 2, 3]).batched(2, chunk_type=memoryview, typecode="i").map(
+        lambda view: view.tolist()
+    ).to_list() == [[1, 2], [3]]
+
+
+def test_batched_array_chunks_other_typecode():
+    source = array.array("i", [1, 2, 3])
+    assert Query(source).batched(2, chunk_type=array.array, typecode="d").to_list() == [
+        array.array("d", [1.0, 2.0]),
+        array.array("d", [3.0]),
+    ]
+
+
+def test_batched_memoryview_deferred():
+    # the source is read on the first pull, not when the stage is defined
+    source = it.count()
+    Query(source).batched(2, chunk_type=memoryview, typecode="q")
+    assert next(source) == 0
+
+    query = Query(x for x in [1, 2, 3]).batched(2, chunk_type=memoryview, typecode="q")
+    assert query.map(lambda view: view.tolist()).to_list() == [[1, 2], [3]]
+
+
+def test_batched_memoryview_typecode_mismatch():
+    with pytest.raises(ValueError) as e:
+        Query(array.array("i", [1, 2, 3])).batched(2, chunk_type=memoryview, typecode="d")
+    assert str(e.value) == "Typecode 'd' doesn't match the format 'i' of the buffer source"
+
+
+def test_batched_memoryview_strict():
+    with pytest.raises(ValueError) as e:
+        Query(b"abcdefg").batched(3, strict=True, chunk_type=memoryview).to_list()
+    assert str(e.value) == "batched(): incomplete batch"
+
+
+def test_batched_missing_typecode():
+    with pytest.raises(ValueError) as e:
+        Query([1, 2, 3]).batched(2, chunk_type=array.array)
+    assert str(e.value) == "Typecode is required for array chunks"
+
+    with pytest.raises(ValueError) as e:
+        Query([1, 2, 3]).batched(2, chunk_type=memoryview)
+    assert str(e.value) == "Typecode is required for memoryview chunks over a non-buffer source"
+
+
+def test_batched_invalid_args():
+    with pytest.raises(ValueError) as e:
+        Query([1, 2, 3]).batched(0)
+    assert str(e.value) == "n must be at least one"
+
+    with pytest.raises(ValueError) as e:
+        Query([1, 2, 3]).batched(2, chunk_type=set)
+    assert str(e.value) == (
+        "Invalid chunk type 'set', expected: tuple, list, array.array or memoryview"
+    )
+
+
 # ### unique ###
 def test_unique():
     assert Query([[1, 2], [3, 4], [1, 2]]).unique().to_list() == [[1, 2], [3, 4]]
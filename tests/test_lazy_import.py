@@ -0,0 +1,67 @@
+import ast
+import inspect
+import subprocess
+import sys
+
+import pytest
+
+import fumus
+import fumus.instrumentation
+import fumus.queries
+import fumus.utils
+
+HEAVY_MODULES = ["pickle", "typing", "hashlib", "sqlite3", "tempfile", "random", "numpy"]
+
+
+def imported_modules(statement):
+    code = f"import sys; {statement}; print(' '.join(sys.modules))"
+    completed = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return set(completed.stdout.split())
+
+
+def test_import_is_lazy():
+    modules = imported_modules("import fumus")
+    assert "fumus.queries.query" not in modules
+    assert "fumus.queries" not in modules
+
+
+@pytest.mark.parametrize("statement", ["import fumus", "from fumus import Query"])
+def test_heavy_modules_not_imported(statement):
+    modules = imported_modules(statement)
+    assert [m for m in HEAVY_MODULES if m in modules] == []
+
+
+def test_query_does_not_import_rarely_used_modules():
+    modules = imported_modules("from fumus import Query")
+    assert "fumus.queries.query" in modules
+    assert "fumus.utils.persistent_cache" not in modules
+
+
+def test_lazy_attributes():
+    from fumus.queries.query import Query
+
+    assert fumus.Query is Query
+    assert "Query" in dir(fumus)
+    assert "PersistentCache" in dir(fumus.utils)
+
+
+def test_missing_attribute():
+    with pytest.raises(AttributeError) as e:
+        fumus.Stream  # noqa
+    assert str(e.value) == "module 'fumus' has no attribute 'Stream'"
+
+
+@pytest.mark.parametrize("package", [fumus, fumus.queries, fumus.utils, fumus.instrumentation])
+def test_static_exports_match_lazy_ones(package):
+    # the imports under "if TYPE_CHECKING" must mirror the lazily resolved exports
+    tree = ast.parse(inspect.getsource(package))
+    static = {
+        alias.asname: node.module
+        for statement in tree.body
+        if isinstance(statement, ast.If) and getattr(statement.test, "id", None) == "TYPE_CHECKING"
+        for node in statement.body
+        for alias in node.names
+    }
+    assert static == package._EXPORTS
@@ -0,0 +1,120 @@
+import threading
+
+import pytest
+
+from fumus.utils import MemoCache
+
+
+def test_memo_cache_get_put():
+    cache = MemoCache(maxsize=2)
+    cache.put("a", 1)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("b", 42) == 42
+    assert len(cache) == 1
+    assert "a" in cache
+
+
+def test_memo_cache_lru_eviction():
+    cache = MemoCache(maxsize=2, policy="lru")
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert "a" in cache and "c" in cache
+    assert "b" not in cache
+    assert cache.evictions == 1
+
+
+def test_memo_cache_lfu_eviction():
+    cache = MemoCache(maxsize=2, policy="lfu")
+    cache.put("a", 1)
+    cache.put("b", 2)
+    for _ in range(3):
+        cache.get("b")
+    cache.get("a")
+    cache.put("c", 3)
+    assert "b" in cache and "c" in cache
+    assert "a" not in cache
+
+
+def test_memo_cache_lfu_ties_evict_oldest():
+    cache = MemoCache(maxsize=2, policy="lfu")
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.put("c", 3)
+    assert list(cache._data) == ["b", "c"]
+
+
+def test_memo_cache_unbounded():
+    cache = MemoCache(maxsize=None)
+    for i in range(1000):
+        cache.put(i, i)
+    assert len(cache) == 1000
+    assert cache.evictions == 0
+
+
+def test_memo_cache_get_or_compute():
+    calls = []
+    cache = MemoCache()
+    for _ in range(3):
+        assert cache.get_or_compute("x", lambda: calls.append(1) or 5) == 5
+    assert len(calls) == 1
+
+
+def test_memo_cache_caches_none():
+    cache = MemoCache()
+    calls = []
+    for _ in range(2):
+        assert cache.get_or_compute("x", lambda: calls.append(1)) is None
+    assert len(calls) == 1
+
+
+def test_memo_cache_stats():
+    cache = MemoCache(maxsize=1, policy="lfu")
+    cache.get_or_compute(1, lambda: 1)
+    cache.get_or_compute(1, lambda: 1)
+    cache.get_or_compute(2, lambda: 2)
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 2,
+        "evictions": 1,
+        "size": 1,
+        "maxsize": 1,
+        "policy": "lfu",
+    }
+
+
+def test_memo_cache_clear():
+    cache = MemoCache()
+    cache.put("a", 1)
+    cache.get("a")
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.hits == 1
+
+
+def test_memo_cache_thread_safe():
+    cache = MemoCache(maxsize=50, policy="lfu", thread_safe=True)
+
+    def _work():
+        for i in range(2000):
+            cache.get_or_compute(i % 100, lambda: i % 100)  # noqa
+
+    threads = [threading.Thread(target=_work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(cache) <= 50
+    assert cache.hits + cache.misses == 8000
+
+
+def test_memo_cache_invalid_args():
+    with pytest.raises(ValueError) as e:
+        MemoCache(maxsize=0)
+    assert str(e.value) == "Cache maxsize must be a positive integer or None"
+
+    with pytest.raises(ValueError) as e:
+        MemoCache(policy="fifo")
+    assert str(e.value) == "Invalid cache policy 'fifo', expected: 'lru' or 'lfu'"
@@ -0,0 +1,122 @@
+import sys
+
+import pytest
+
+from fumus import Query
+from fumus.exceptions.exception import MemoryBudgetError
+from fumus.instrumentation import MemoryAccounting
+
+INT_SIZE = sys.getsizeof(1000)
+
+
+def test_memory_accounting():
+    memory = MemoryAccounting()
+    stats = memory.stage("sort")
+    memory.add(stats, 10)
+    memory.add(stats, 20)
+    memory.remove(stats, 10)
+    assert (stats.elements, stats.bytes, stats.peak_elements, stats.peak_bytes) == (1, 20, 2, 30)
+    memory.release(stats)
+    assert memory.current_bytes == 0
+    assert memory.to_dict() == {
+        "budget": None,
+        "stages": [{"name": "sort", "peak_elements": 2, "peak_bytes": 30, "spilled_elements": 0}],
+    }
+
+
+def test_memory_accounting_budget():
+    memory = MemoryAccounting(25)
+    stats = memory.stage("distinct")
+    memory.add(stats, 20)
+    assert not memory.fits(10)
+    with pytest.raises(MemoryBudgetError) as e:
+        memory.add(stats, 10)
+    assert (
+        str(e.value) == "Stage 'distinct' exceeded the memory budget of 25 bytes "
+        "while holding 1 elements (~20 bytes)"
+    )
+
+
+def test_memory_accounting_negative_budget():
+    with pytest.raises(ValueError) as e:
+        MemoryAccounting(-1)
+    assert str(e.value) == "Memory budget cannot be negative"
+
+
+def test_memory_usage():
+    query = Query(x for x in range(1000, 1010)).with_memory_budget().sort().distinct().tail(3)
+    assert query.to_list() == [1007, 1008, 1009]
+    assert query.memory_usage == {
+        "budget": None,
+        "stages": [
+            {
+                "name": "sort",
+                "peak_elements": 10,
+                "peak_bytes": 10 * INT_SIZE,
+                "spilled_elements": 0,
+            },
+            {
+                "name": "distinct",
+                "peak_elements": 10,
+                "peak_bytes": 10 * INT_SIZE,
+                "spilled_elements": 0,
+            },
+            {"name": "tail", "peak_elements": 3, "peak_bytes": 3 * INT_SIZE, "spilled_elements": 0},
+        ],
+    }
+
+
+def test_memory_usage_disabled():
+    assert Query([1]).memory_usage is None
+
+
+def test_external_sort():
+    data = [(x * 7919) % 1000 + 1000 for x in range(1000)]
+    query = Query(iter(data)).with_memory_budget(50 * INT_SIZE).sort()
+    assert query.to_list() == sorted(data)
+    [stats] = query.memory_usage["stages"]
+    assert stats["peak_elements"] == 50
+    assert stats["spilled_elements"] == 950
+
+
+def test_external_sort_key_reverse():
+    data = [(x * 37) % 100 for x in range(300)]
+    query = Query(iter(data)).with_memory_budget(40 * INT_SIZE).sort(lambda x: x % 10, reverse=True)
+    assert query.to_list() == sorted(data, key=lambda x: x % 10, reverse=True)
+
+
+def test_external_sort_stable():
+    data = [(x % 5, x) for x in range(200)]
+    budget = 30 * sys.getsizeof(data[0])
+    query = Query(iter(data)).with_memory_budget(budget).sort(lambda x: x[0])
+    assert query.to_list() == sorted(data, key=lambda x: x[0])
+
+
+@pytest.mark.parametrize(
+    "stage",
+    [
+        lambda q: q.distinct().to_list(),
+        lambda q: q.tail(20).to_list(),
+        lambda q: q.ncycles(2).to_list(),
+        lambda q: q.unique().to_list(),
+        lambda q: q.find_any(),
+        lambda q: q.partition(lambda x: x % 2, mode="eager").to_list(),
+    ],
+)
+def test_memory_budget_exceeded(stage):
+    query = Query(x for x in range(1000, 1100)).with_memory_budget(10 * INT_SIZE)
+    with pytest.raises(MemoryBudgetError):
+        stage(query)
+
+
+def test_memory_budget_within_limit():
+    query = Query(x for x in range(1000, 1100)).with_memory_budget(10 * INT_SIZE).tail(10)
+    assert query.to_list() == list(range(1090, 1100))
+
+
+def test_memory_budget_chained_stages():
+    query = Query(x for x in range(1000, 1100)).with_memory_budget(150 * INT_SIZE)
+    assert query.unique().ncycles(1).unique().to_list() == list(range(1000, 1100))
+    stages = query.memory_usage["stages"]
+    assert [stage["name"] for stage in stages] == ["unique", "ncycles", "unique"]
+    assert [stage["peak_elements"] for stage in stages] == [100, 100, 100]
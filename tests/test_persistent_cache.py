@@ -0,0 +1,97 @@
+import functools
+import operator
+
+import pytest
+
+from fumus import Query
+from fumus.utils import PersistentCache
+
+
+def test_persistent_cache_roundtrip(tmp_path):
+    path = tmp_path / "cache.db"
+    with PersistentCache(path, version="v1") as cache:
+        keys = [cache.hash_key(k) for k in ("a", "b")]
+        cache.put_many(zip(keys, [{"x": 1}, None]))
+
+    with PersistentCache(path, version="v1") as cache:
+        assert cache.get_many(keys) == {keys[0]: {"x": 1}, keys[1]: None}
+        assert len(cache) == 2
+
+
+def test_persistent_cache_version_changes_keys(tmp_path):
+    with PersistentCache(tmp_path / "cache.db", version="v1") as first:
+        with PersistentCache(tmp_path / "cache.db", version="v2") as second:
+            assert first.hash_key((1, "a")) == first.hash_key((1, "a"))
+            assert first.hash_key((1, "a")) != second.hash_key((1, "a"))
+
+
+def test_persistent_cache_get_many_large_batch(tmp_path):
+    with PersistentCache(tmp_path / "cache.db") as cache:
+        items = [(cache.hash_key(i), i) for i in range(2000)]
+        cache.put_many(items)
+        assert cache.get_many([k for k, _ in items]) == dict(items)
+
+
+def test_version_of():
+    def mapper(x):
+        return x + 1
+
+    first_version = PersistentCache.version_of(mapper)
+
+    def mapper(x):  # noqa
+        return x + 2
+
+    assert first_version.startswith(f"{__name__}.test_version_of.<locals>.mapper:")
+    assert PersistentCache.version_of(mapper) != first_version
+    assert PersistentCache.version_of(len) == "builtins.len:"
+
+
+def test_version_of_referenced_names():
+    def mapper(x):
+        return x.upper()
+
+    first_version = PersistentCache.version_of(mapper)
+
+    def mapper(x):  # noqa
+        return x.lower()
+
+    assert PersistentCache.version_of(mapper) != first_version
+
+
+def test_version_of_defaults_and_closures():
+    def make_mapper(offset):
+        def mapper(x, scale=1):
+            return x * scale + offset
+
+        return mapper
+
+    assert PersistentCache.version_of(make_mapper(1)) == PersistentCache.version_of(make_mapper(1))
+    assert PersistentCache.version_of(make_mapper(1)) != PersistentCache.version_of(make_mapper(2))
+
+    def mapper(x, scale=1):
+        return x * scale
+
+    first_version = PersistentCache.version_of(mapper)
+    mapper.__defaults__ = (2,)
+    assert PersistentCache.version_of(mapper) != first_version
+
+
+def test_version_of_callable_without_code():
+    with pytest.raises(ValueError) as e:
+        PersistentCache.version_of(operator.itemgetter("a"))
+    assert (
+        str(e.value)
+        == "Cannot derive a version of operator.itemgetter('a') - pass an explicit 'version'"
+    )
+
+    with pytest.raises(ValueError):
+        PersistentCache.version_of(functools.partial(max, 0))
+
+
+def test_map_persistent_requires_version(tmp_path):
+    with pytest.raises(ValueError):
+        Query([{"a": 1}]).map_persistent(operator.itemgetter("a"), tmp_path / "cache.db")
+    query = Query([{"a": 1}]).map_persistent(
+        operator.itemgetter("a"), tmp_path / "cache.db", version="v1"
+    )
+    assert query.to_list() == [1]
@@ -0,0 +1,61 @@
+import pytest
+
+from fumus import Query
+from fumus.exceptions.exception import IllegalStateError
+
+
+def _counting_source(n, calls):
+    for i in range(n):
+        calls.append(i)
+        yield i
+
+
+def test_cache_replays_without_recomputing():
+    calls = []
+    cached = Query(_counting_source(5, calls)).map(lambda x: x * 2).cache()
+    assert cached.open().count() == 5
+    assert cached.open().to_set() == {0, 2, 4, 6, 8}
+    assert cached.open().max().get() == 8
+    assert calls == [0, 1, 2, 3, 4]
+
+
+def test_cache_partial_run_reuses_prefix():
+    calls = []
+    cached = Query(_counting_source(10, calls)).cache()
+    assert cached.open().limit(3).to_list() == [0, 1, 2]
+    assert cached.cached_count == 3
+    assert not cached.is_complete
+
+    assert cached.open().to_list() == list(range(10))
+    assert calls == list(range(10))
+    assert cached.is_complete
+
+
+def test_cache_interleaved_readers():
+    cached = Query(iter(range(4))).cache()
+    first, second = iter(cached.open()), iter(cached.open())
+    assert [next(first), next(first), next(second), next(first), next(second)] == [0, 1, 0, 2, 1]
+
+
+def test_cache_spill_to_disk():
+    with Query(range(10)).map(lambda x: {"n": x}).cache(memory_limit=3) as cached:
+        assert cached.open().limit(5).map(lambda d: d["n"]).to_list() == [0, 1, 2, 3, 4]
+        assert cached.open().map(lambda d: d["n"]).to_list() == list(range(10))
+        assert cached.spilled_count == 7
+
+        readers = [iter(cached.open()) for _ in range(2)]
+        assert [next(r)["n"] for r in readers for _ in range(5)] == [0, 1, 2, 3, 4, 0, 1, 2, 3, 4]
+
+
+def test_cache_consumes_query():
+    query = Query([1, 2, 3])
+    query.cache()
+    with pytest.raises(IllegalStateError) as e:
+        query.to_list()
+    assert str(e.value) == "Query object already consumed"
+
+
+def test_cache_negative_memory_limit():
+    with pytest.raises(ValueError) as e:
+        Query([1]).cache(memory_limit=-1)
+    assert str(e.value) == "Memory limit cannot be negative"
@@ -1,13 +1,22 @@
+import array
 import io
 import json
+import tracemalloc
 from contextlib import redirect_stdout
+from datetime import datetime, timedelta
 from operator import itemgetter
 
 import pytest
 
 from fumus import Query
-from fumus.utils import Optional, DictItem
-from fumus.exceptions.exception import IllegalStateError, UnsupportedTypeError, NoneTypeError
+from fumus.queries import Collector
+from fumus.utils import Optional, DictItem, MemoCache, X
+from fumus.exceptions.exception import (
+    IllegalStateError,
+    UnsupportedTypeError,
+    NoneTypeError,
+    UnsortedInputError,
+)
 
 
 def test_query():
@@ -68,6 +77,216 @@ def test_range_with_range_obj():
     assert Query.from_range(range_obj).to_list() == [0, 1, 2, 3, 4, 5, 6, 7, 8, 9]
 
 
+def test_range_keeps_range_source():
+    assert Query.from_range(0, 10, 2)._iterable == range(0, 10, 2)
+    assert Query.from_range(range(3))._iterable == range(3)
+
+
+# ### sequence fast paths ###
+def test_sequence_slicing_stages():
+    source = list(range(10))
+    assert Query(source).skip(2).limit(5)._iterable.to_sequence() == [2, 3, 4, 5, 6]
+    assert Query(source).head(3)._iterable.to_sequence() == [0, 1, 2]
+    assert Query(source).tail(3)._iterable.to_sequence() == [7, 8, 9]
+    assert Query(source).tail(0)._iterable.to_sequence() == []
+    assert Query(source).tail(20)._iterable.to_sequence() == source
+    assert Query(tuple(source)).view(start=1, stop=-3, step=2)._iterable.to_sequence() == (1, 3, 5)
+    assert Query("abcdef").skip(1).tail(2)._iterable.to_sequence() == "ef"
+    assert Query(source).skip(2).consume(3).to_list() == [5, 6, 7, 8, 9]
+
+
+def test_sequence_slicing_does_not_copy():
+    source = list(range(1_000_000))
+    tracemalloc.start()
+    try:
+        query = Query(source).skip(10).view(2).limit(5)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    # a copy of the remaining list would take ~8 MB
+    assert peak < 10_000
+    assert query.to_list() == [12, 13, 14, 15, 16]
+    assert Query(source).skip(10).count() == 999_990
+    assert Query(source).skip(10).take_last().get() == 999_999
+    assert Query(source).skip(10).take_nth(5).get() == 15
+
+
+def test_sequence_view_buffer_chunks():
+    source = array.array("q", range(6))
+    assert Query(source).skip(1).batched(2, chunk_type=memoryview).map(
+        lambda view: view.tolist()
+    ).to_list() == [[1, 2], [3, 4], [5]]
+
+
+def test_sequence_slicing_range_stays_symbolic():
+    query = Query.from_range(0, 10**12).skip(10).limit(5)
+    assert query._iterable == range(10, 15)
+    assert query.count() == 5
+
+
+def test_sequence_terminals():
+    assert Query(range(10**12)).count() == 10**12
+    assert Query(range(10**12)).take_last().get() == 10**12 - 1
+    assert Query(range(10**12)).take_nth(10**11).get() == 10**11
+    assert Query([1, 2, 3]).take_nth(-1).get() == 3
+    assert Query([1, 2, 3]).take_nth(5, default=7).get() == 7
+    assert Query([]).take_last(default=4).get() == 4
+
+
+def test_sort_range():
+    assert Query.from_range(0, 5).sort()._iterable == range(0, 5)
+    assert Query.from_range(0, 5).reverse()._iterable == range(4, -1, -1)
+    assert Query.from_range(5, 0, -1).sort().to_list() == [1, 2, 3, 4, 5]
+    assert Query.from_range(0, 5).sort(lambda x: -x).to_list() == [4, 3, 2, 1, 0]
+
+
+# ### symbolic ranges ###
+def test_range_closed_form_aggregates():
+    assert Query.from_range(0, 10**9).sum() == (10**9 - 1) * 10**9 // 2
+    assert Query.from_range(0, 10**9).count() == 10**9
+    assert Query.from_range(0, 10**9).average() == (10**9 - 1) / 2
+    assert Query.from_range(10, -10, -3).min().get() == min(range(10, -10, -3))
+    assert Query.from_range(10, -10, -3).max().get() == 10
+    assert Query.from_range(0, 10**9).contains(10**8)
+    assert not Query.from_range(0, 10**9, 2).contains(7)
+
+
+def test_range_closed_form_empty():
+    assert Query.from_range(0, 0).sum() == 0
+    assert Query.from_range(0, 0).average() == 0
+    assert Query.from_range(0, 0).min(default=5).get() == 5
+    assert Query.from_range(0, 0).max().is_empty
+
+
+def test_range_symbolic_map_filter():
+    query = Query.from_range(0, 10**9).skip(5).filter(X % 7 == 3).map(X * 2 + 1)
+    assert isinstance(query._iterable, range)
+    assert query.take_nth(2).get() == 2 * (10 + 7 + 7) + 1
+
+    expected = [2 * x + 1 for x in range(5, 100) if x % 7 == 3]
+    assert Query.from_range(0, 100).skip(5).filter(X % 7 == 3).map(X * 2 + 1).to_list() == expected
+    assert Query.from_range(0, 100).filter(X % 7 == 3).map(X * 2 + 1).sum() == sum(
+        2 * x + 1 for x in range(100) if x % 7 == 3
+    )
+
+
+def test_range_symbolic_filter_negative_step_and_no_match():
+    assert Query.from_range(20, 0, -3).filter((X * 2 + 1) % 4 == 3).to_list() == [
+        x for x in range(20, 0, -3) if (2 * x + 1) % 4 == 3
+    ]
+    assert Query.from_range(0, 20, 2).filter(X % 2 == 1).to_list() == []
+
+
+def test_range_symbolic_filter_solves_congruence():
+    # closed form - no predicate calls, however large the modulus
+    query = Query.from_range(0, 10**12).filter(X % 10**7 == 10**7 - 1)
+    assert query._iterable == range(10**7 - 1, 10**12, 10**7)
+    assert Query.from_range(0, 10**12).filter(X % 10**7 == 10**7).count() == 0
+    assert Query.from_range(0, 10**12).filter(X % 10**7 == -1).count() == 0
+
+    for start, stop, step in [(0, 60, 1), (-17, 50, 4), (40, -30, -3)]:
+        for a, b, m, r in [
+            (3, 1, 12, 4),
+            (4, 0, 6, 2),
+            (0, 5, 7, 5),
+            (5, -2, -9, -4),
+            (2, 1, 8, 3),
+        ]:
+            predicate = (X * a + b) % m == r
+            source = range(start, stop, step)
+            assert Query(source).filter(predicate).to_list() == [x for x in source if predicate(x)]
+
+
+def test_range_fallback_for_opaque_callables():
+    assert Query.from_range(0, 5).map(lambda x: x * 2).to_list() == [0, 2, 4, 6, 8]
+    assert Query.from_range(0, 5).filter(X % 2 != 0).to_list() == [1, 3]
+    assert Query.from_range(0, 4).map(X * 0.5).to_list() == [0, 0.5, 1, 1.5]
+
+
+def test_contains():
+    assert Query([1, 2, 3]).map(str).contains("2")
+    assert not Query.of("a", "b").contains("c")
+
+
+# ### typed queries ###
+def test_of_ints_of_floats():
+    assert Query.of_ints(1, 2, 3)._iterable == array.array("q", [1, 2, 3])
+    assert Query.of_ints(1, 2, 3).typecode == "q"
+    assert Query.of_floats(1.5, 2)._iterable == array.array("d", [1.5, 2.0])
+    assert Query(array.array("i", [1])).typecode == "i"
+    assert Query([1]).typecode is None
+
+
+def test_as_array():
+    query = Query(range(5)).map(lambda x: x * 1.5).as_array("d")
+    assert query._iterable == array.array("d", [0.0, 1.5, 3.0, 4.5, 6.0])
+    assert query.typecode == "d"
+
+
+def test_typed_materializations():
+    assert Query.of_ints(3, 1, 2).map(lambda x: x * 10).sort()._iterable == array.array(
+        "q", [10, 20, 30]
+    )
+    assert Query.of_floats(1, 2, 3, 4).filter(lambda x: x > 1).tail(2)._iterable == array.array(
+        "d", [3.0, 4.0]
+    )
+
+
+def test_typed_materialization_falls_back_to_list():
+    query = Query.of_ints(3, 1, 2).map(str).sort()
+    assert query._iterable == ["1", "2", "3"]
+    assert query.typecode is None
+
+
+def test_typed_materialization_keeps_changed_types():
+    # array.array would silently convert the mapped values
+    query = Query.of_floats(1.5, 2.5).map(round).sort()
+    assert query.to_list() == [2, 2]
+    assert [type(x) for x in query._iterable] == [int, int]
+    assert Query.of_ints(1, 2).map(lambda x: x > 1).sort().to_list() == [False, True]
+    assert Query.of_ints(1, 2).map(float).tail(1).to_list() == [2.0]
+
+
+def test_typed_cache_keeps_changed_types():
+    cached = Query.of_floats(1.0, 2.0).map(int).cache()
+    result = cached.open().to_list()
+    assert result == [1, 2]
+    assert [type(x) for x in result] == [int, int]
+    assert Query.of_ints(1, 2).map(lambda x: x > 1).cache().open().to_list() == [False, True]
+
+
+def test_typed_aggregates_changed_types():
+    assert Query.of_ints(1, 2).map(float).average() == 1.5
+    assert Query.of_ints(1, 2).map(lambda x: x > 1).sum() == 1
+    with pytest.raises(ValueError) as e:
+        Query.of_ints(1, 2).map(str).sum()
+    assert str(e.value) == "Cannot apply sum on non-number elements"
+
+
+def test_typed_aggregates():
+    assert Query.of_ints(1, 2, 3).map(lambda x: x * 2).sum() == 12
+    assert Query.of_floats(1, 2, 3, 4).average() == 2.5
+    assert Query.of_ints(1, 2, 3).filter(lambda x: x > 1).average() == 2.5
+    assert Query.of_ints().average() == 0
+    assert Query.of_ints(4, 2, 9).min().get() == 2
+    assert Query.of_ints(4, 2, 9).max().get() == 9
+
+
+def test_to_array():
+    assert Query([1, 2, 3]).to_array("b") == array.array("b", [1, 2, 3])
+    assert Query.of_floats(1, 2).map(lambda x: x / 2).to_array() == array.array("d", [0.5, 1.0])
+    assert Query.of_ints(1, 2).collect(array.array) == array.array("q", [1, 2])
+    with pytest.raises(ValueError) as e:
+        Query([1, 2]).to_array()
+    assert str(e.value) == "Typecode is required for untyped queries"
+
+
+def test_typed_cache():
+    cached = Query.of_ints(1, 2, 3).cache()
+    assert cached.open().to_list() == [1, 2, 3]
+    assert cached._buffer == array.array("q", [1, 2, 3])
+
+
 def test_iterable_from_string():
     json_str = '{"Name": "Jennifer Smith", "Phone": "555-123-4568", "Email": "jen123@gmail.com"}'
     json_map = json.loads(json_str)
@@ -318,6 +537,158 @@ def test_flat_map_raises():
     assert str(e.value) == "'int' object is not iterable"
 
 
+# ### map_cached ###
+def test_map_cached():
+    calls = []
+
+    def _mapper(x):
+        calls.append(x)
+        return x * 10
+
+    assert Query([1, 2, 1, 2, 3, 1]).map_cached(_mapper).to_list() == [10, 20, 10, 20, 30, 10]
+    assert calls == [1, 2, 3]
+
+
+def test_map_cached_custom_key():
+    assert Query(["a", "A", "b"]).map_cached(str.upper, key=str.casefold).to_list() == [
+        "A",
+        "A",
+        "B",
+    ]
+
+
+def test_map_cached_shared_cache():
+    cache = MemoCache(maxsize=2, policy="lfu")
+    Query([1, 2, 1]).map_cached(str, cache=cache).to_list()
+    Query([1, 3]).map_cached(str, cache=cache).to_list()
+    assert cache.stats() == {
+        "hits": 2,
+        "misses": 3,
+        "evictions": 1,
+        "size": 2,
+        "maxsize": 2,
+        "policy": "lfu",
+    }
+
+
+def test_map_cached_cache_shared_by_functions():
+    cache = MemoCache()
+    assert Query([1, 2]).map_cached(str, cache=cache).to_list() == ["1", "2"]
+    assert Query([1, 2]).map_cached(lambda x: x * 10, cache=cache).to_list() == [10, 20]
+    assert Query([1, 2]).filter_cached(lambda x: x > 1, cache=cache).to_list() == [2]
+    assert Query(["a", "A"]).map_cached(str.upper, key=str.casefold, cache=cache).to_list() == [
+        "A",
+        "A",
+    ]
+    assert cache.stats()["size"] == 7
+
+
+def test_filter_cached():
+    calls = []
+
+    def _is_even(x):
+        calls.append(x)
+        return x % 2 == 0
+
+    assert Query([1, 2, 2, 1, 4]).filter_cached(_is_even, thread_safe=True).to_list() == [2, 2, 4]
+    assert calls == [1, 2, 4]
+
+
+# ### map_persistent ###
+def test_map_persistent(tmp_path):
+    calls = []
+
+    def _mapper(x):
+        calls.append(x)
+        return x * 10
+
+    cache_path = tmp_path / "results.db"
+    assert Query([1, 2, 1]).map_persistent(_mapper, cache_path, version="v1").to_list() == [
+        10,
+        20,
+        10,
+    ]
+    assert calls == [1, 2]
+
+    # new process, mostly unchanged input -> only misses are computed
+    calls.clear()
+    assert Query([1, 2, 3]).map_persistent(_mapper, cache_path, version="v1").to_list() == [
+        10,
+        20,
+        30,
+    ]
+    assert calls == [3]
+
+    # new mapper version invalidates the results
+    calls.clear()
+    Query([1, 2]).map_persistent(_mapper, cache_path, version="v2", batch_size=1).to_list()
+    assert calls == [1, 2]
+
+
+def test_map_persistent_custom_key(tmp_path):
+    result = (
+        Query([{"id": 1, "name": "x"}, {"id": 1, "name": "y"}])
+        .map_persistent(lambda d: d["name"], tmp_path / "results.db", key=lambda d: d["id"])
+        .to_list()
+    )
+    assert result == ["x", "x"]
+
+
+def test_map_persistent_invalid_batch_size(tmp_path):
+    with pytest.raises(ValueError) as e:
+        Query([1]).map_persistent(str, tmp_path / "results.db", batch_size=0)
+    assert str(e.value) == "Batch size must be a positive integer"
+
+
+# ### map_batches ###
+def test_map_batches():
+    calls = []
+
+    def _square_all(batch):
+        calls.append(len(batch))
+        return [x * x for x in batch]
+
+    assert Query(range(7)).map_batches(_square_all, 3).to_list() == [0, 1, 4, 9, 16, 25, 36]
+    assert calls == [3, 3, 1]
+
+
+def test_map_batches_no_flatten():
+    assert Query(range(5)).map_batches(sum, 2, flatten=False).to_list() == [1, 5, 4]
+
+
+def test_map_batches_lazy():
+    assert Query.iterate(0, lambda x: x + 1).map_batches(lambda b: b, 4).limit(6).to_list() == [
+        0,
+        1,
+        2,
+        3,
+        4,
+        5,
+    ]
+
+
+def test_map_batches_time_budget():
+    sizes = []
+
+    def _record(batch):
+        sizes.append(len(batch))
+        return batch
+
+    assert Query(range(100)).map_batches(_record, 1, time_budget=10).to_list() == list(range(100))
+    # cheap mapper -> batch size grows (at most twice per step)
+    assert sizes[:4] == [1, 2, 4, 8]
+
+
+def test_map_batches_invalid_args():
+    with pytest.raises(ValueError) as e:
+        Query([1, 2]).map_batches(list, 0)
+    assert str(e.value) == "Batch size must be a positive integer"
+
+    with pytest.raises(ValueError) as e:
+        Query([1, 2]).map_batches(list, 2, time_budget=0)
+    assert str(e.value) == "Time budget must be a positive number"
+
+
 def test_flatten():
     assert Query([[1, 2], [3, 4], [5]]).flatten().to_list() == [1, 2, 3, 4, 5]
 
@@ -338,6 +709,402 @@ def test_flatten_strings():
     assert Query([["abc"], "x", "y", "z"]).flatten().to_list() == ["abc", "x", "y", "z"]
 
 
+# ### window ###
+def test_window_sliding():
+    assert Query([1, 2, 3, 4, 5]).window(3).to_list() == [(1, 2, 3), (2, 3, 4), (3, 4, 5)]
+    assert Query([1, 2, 3, 4, 5]).window(3, agg="sum").to_list() == [6, 9, 12]
+    assert Query([1, 2, 3, 4, 5]).window(2, agg="mean").to_list() == [1.5, 2.5, 3.5, 4.5]
+
+
+def test_window_min_max():
+    data = [5, 1, 4, 2, 8, 3]
+    assert Query(data).window(3, agg="min").to_list() == [1, 1, 2, 2]
+    assert Query(data).window(3, agg="max").to_list() == [5, 4, 8, 8]
+
+
+def test_window_tumbling():
+    assert Query(range(7)).window(3, 3, agg="sum").to_list() == [3, 12]
+    assert Query(range(7)).window(3, 3).to_list() == [(0, 1, 2), (3, 4, 5)]
+
+
+def test_window_step():
+    assert Query(range(7)).window(3, 2, agg="count").to_list() == [3, 3, 3]
+    assert Query(range(7)).window(2, 3, agg=list).to_list() == [[0, 1], [3, 4]]
+
+
+def test_window_keyed():
+    events = [("a", 1), ("b", 10), ("a", 2), ("b", 20), ("a", 3), ("b", 30)]
+    assert Query(events).window(
+        2, agg=lambda w: sum(e[1] for e in w), key=lambda e: e[0]
+    ).to_list() == [("a", 3), ("b", 30), ("a", 5), ("b", 50)]
+
+
+def test_window_lazy():
+    assert Query.iterate(0, lambda x: x + 1).window(2, agg="sum").limit(3).to_list() == [1, 3, 5]
+
+
+def test_window_invalid_args():
+    with pytest.raises(ValueError) as e:
+        Query([1]).window(0)
+    assert str(e.value) == "Window size must be a positive integer"
+
+    with pytest.raises(ValueError) as e:
+        Query([1]).window(2, step=0)
+    assert str(e.value) == "Window step must be a positive integer"
+
+
+def test_time_window():
+    events = [(0, "a"), (3, "b"), (11, "c"), (25, "d")]
+    assert Query(events).time_window(lambda e: e[0], 10, agg="count").to_list() == [
+        (0, 10, 2),
+        (10, 20, 1),
+        (20, 30, 1),
+    ]
+
+
+def test_time_window_sliding():
+    assert Query([0, 4, 6, 11]).time_window(lambda x: x, 10, 5).to_list() == [
+        (-5, 5, (0, 4)),
+        (0, 10, (0, 4, 6)),
+        (5, 15, (6, 11)),
+        (10, 20, (11,)),
+    ]
+
+
+def test_time_window_datetime():
+    start = datetime(2024, 1, 1, 12)
+    events = [start + timedelta(seconds=s) for s in (0, 30, 59, 61, 150)]
+    assert Query(events).time_window(lambda t: t, timedelta(minutes=1), agg="count").to_list() == [
+        (start, start + timedelta(minutes=1), 3),
+        (start + timedelta(minutes=1), start + timedelta(minutes=2), 1),
+        (start + timedelta(minutes=2), start + timedelta(minutes=3), 1),
+    ]
+
+
+def test_time_window_incremental():
+    # windows are emitted while the stream is still running
+    events = Query.iterate(0, lambda x: x + 1)
+    assert events.time_window(lambda x: x, 3, agg="sum").limit(2).to_list() == [
+        (0, 3, 3),
+        (3, 6, 12),
+    ]
+
+
+def test_time_window_lateness():
+    events = [1, 12, 8, 25, 3]
+    assert Query(events).time_window(lambda x: x, 10, agg="count").to_list() == [
+        (1, 11, 1),
+        (11, 21, 1),
+        (21, 31, 1),
+    ]
+    assert Query(events).time_window(lambda x: x, 10, agg="count", lateness=5).to_list() == [
+        (1, 11, 2),
+        (11, 21, 1),
+        (21, 31, 1),
+    ]
+
+
+def test_session_window():
+    clicks = [1, 2, 4, 10, 11, 20]
+    assert Query(clicks).session_window(lambda x: x, 3, agg="count").to_list() == [
+        (1, 4, 3),
+        (10, 11, 2),
+        (20, 20, 1),
+    ]
+
+
+def test_session_window_lateness():
+    clicks = [1, 2, 8, 4, 9]
+    assert Query(clicks).session_window(lambda x: x, 3).to_list() == [
+        (1, 2, (1, 2)),
+        (8, 9, (8, 9)),
+    ]
+    assert Query(clicks).session_window(lambda x: x, 3, lateness=5).to_list() == [
+        (1, 4, (1, 2, 4)),
+        (8, 9, (8, 9)),
+    ]
+
+
+def test_session_window_out_of_order():
+    # 4 is older than the watermark (6) -> dropped instead of bridging into the emitted session of 1
+    assert Query([1, 6, 4]).session_window(lambda x: x, 3).to_list() == [
+        (1, 1, (1,)),
+        (6, 6, (6,)),
+    ]
+    # within the lateness 4 bridges both sessions
+    assert Query([1, 6, 4]).session_window(lambda x: x, 3, lateness=5).to_list() == [
+        (1, 6, (1, 4, 6)),
+    ]
+
+
+def test_time_window_invalid_args():
+    with pytest.raises(ValueError) as e:
+        Query([1]).time_window(lambda x: x, 0)
+    assert str(e.value) == "Window size and slide must be positive"
+
+    with pytest.raises(ValueError) as e:
+        Query([1]).session_window(lambda x: x, timedelta(0))
+    assert str(e.value) == "Session gap must be positive"
+
+    with pytest.raises(ValueError) as e:
+        Query([1]).session_window(lambda x: x, 1, lateness=-1)
+    assert str(e.value) == "Lateness cannot be negative"
+
+
+# ### join ###
+def test_join_inner():
+    orders = [(1, "book"), (1, "pen"), (3, "cup")]
+    users = Query.of((1, "Ada"), (2, "Bob"))
+    assert Query(orders).join(users, lambda o: o[0]).to_list() == [
+        ((1, "book"), (1, "Ada")),
+        ((1, "pen"), (1, "Ada")),
+    ]
+
+
+def test_join_different_keys():
+    assert Query([1, 2, 3]).join(["a", "bb", "ccc", "dd"], lambda x: x, len).to_list() == [
+        (1, "a"),
+        (2, "bb"),
+        (3, "ccc"),
+        (2, "dd"),
+    ]
+
+
+def test_join_builds_smaller_side():
+    # the left side is bigger -> the right one is built, pairs follow the order of the left side
+    assert Query([1, 2, 2, 3]).join([2, 1], lambda x: x).to_list() == [(1, 1), (2, 2), (2, 2)]
+    # the left side is smaller -> it is built, pairs follow the order of the right side
+    assert Query([1, 2]).join([2, 3, 1, 2], lambda x: x).to_list() == [(2, 2), (1, 1), (2, 2)]
+    assert Query([1, 2]).join([2, 3, 1, 2], lambda x: x, build="right").to_list() == [
+        (1, 1),
+        (2, 2),
+        (2, 2),
+    ]
+
+
+def test_join_explicit_build_left():
+    assert Query.iterate(0, lambda x: x + 1).limit(3).join(
+        [2, 0], lambda x: x, build="left"
+    ).to_list() == [(2, 2), (0, 0)]
+
+
+def test_join_order_follows_streamed_side():
+    assert Query([3, 1]).join([1, 3, 1], lambda x: x).to_list() == [(1, 1), (3, 3), (1, 1)]
+    assert Query([3, 1, 2]).join([1, 3], lambda x: x).to_list() == [(3, 3), (1, 1)]
+
+
+def test_join_left():
+    assert Query([1, 2, 3]).join([1, 3, 3], lambda x: x, how="left").to_list() == [
+        (1, 1),
+        (2, None),
+        (3, 3),
+        (3, 3),
+    ]
+
+
+def test_join_semi_anti():
+    assert Query([1, 2, 3, 4]).join([2, 4, 4], lambda x: x, how="semi").to_list() == [2, 4]
+    assert Query([1, 2, 3, 4]).join([2, 4, 4], lambda x: x, how="anti").to_list() == [1, 3]
+
+
+def test_join_lazy():
+    assert Query.iterate(0, lambda x: x + 1).join([3, 5], lambda x: x).limit(2).to_list() == [
+        (3, 3),
+        (5, 5),
+    ]
+
+
+def test_join_invalid_args():
+    with pytest.raises(ValueError) as e:
+        Query([1]).join([1], lambda x: x, how="outer")
+    assert str(e.value) == "Invalid join type 'outer', expected: 'inner', 'left', 'semi' or 'anti'"
+
+    with pytest.raises(ValueError) as e:
+        Query([1]).join([1], lambda x: x, build="middle")
+    assert str(e.value) == "Invalid build side 'middle', expected: 'left' or 'right'"
+
+    with pytest.raises(ValueError) as e:
+        Query([1]).join([1], lambda x: x, how="left", build="left")
+    assert str(e.value) == "Only inner joins can build the hash table on the left side"
+
+
+def test_merge_sorted():
+    assert Query([1, 4, 7]).merge_sorted([2, 5, 8], Query.of(3, 6, 9)).to_list() == list(
+        range(1, 10)
+    )
+
+
+def test_merge_sorted_key():
+    assert Query(["a", "ccc"]).merge_sorted(["bb", "dddd"], key=len).to_list() == [
+        "a",
+        "bb",
+        "ccc",
+        "dddd",
+    ]
+
+
+def test_merge_sorted_lazy():
+    evens = Query.iterate(0, lambda x: x + 2)
+    odds = Query.iterate(1, lambda x: x + 2)
+    assert evens.merge_sorted(odds).limit(5).to_list() == [0, 1, 2, 3, 4]
+
+
+def test_merge_sorted_validate():
+    assert Query([1, 3]).merge_sorted([2, 4], validate=True).to_list() == [1, 2, 3, 4]
+    with pytest.raises(UnsortedInputError) as e:
+        Query([1, 3]).merge_sorted([4, 2], validate=True).to_list()
+    assert str(e.value) == "Input is not sorted: 2 follows 4"
+
+
+def test_merge_join():
+    left = [(1, "a"), (2, "b"), (4, "c"), (4, "d")]
+    assert Query(left).merge_join([0, 1, 1, 3, 4], lambda x: x[0], lambda x: x).to_list() == [
+        ((1, "a"), 1),
+        ((1, "a"), 1),
+        ((4, "c"), 4),
+        ((4, "d"), 4),
+    ]
+
+
+def test_merge_join_left():
+    assert Query([1, 2, 3]).merge_join([2], lambda x: x, how="left").to_list() == [
+        (1, None),
+        (2, 2),
+        (3, None),
+    ]
+
+
+def test_merge_join_lazy():
+    evens = Query.iterate(0, lambda x: x + 2)
+    thirds = Query.iterate(0, lambda x: x + 3)
+    assert evens.merge_join(thirds, lambda x: x).limit(3).to_list() == [(0, 0), (6, 6), (12, 12)]
+
+
+def test_merge_join_validate():
+    with pytest.raises(UnsortedInputError) as e:
+        Query([3, 1]).merge_join([1, 3], lambda x: x, validate=True).to_list()
+    assert str(e.value) == "Input is not sorted: 1 follows 3"
+
+
+def test_merge_join_invalid_type():
+    with pytest.raises(ValueError) as e:
+        Query([1]).merge_join([1], lambda x: x, how="semi")
+    assert str(e.value) == "Invalid merge join type 'semi', expected: 'inner' or 'left'"
+
+
+# ### set operations ###
+def test_union():
+    assert Query([1, 2, 3, 3]).union([3, 4, 1]).to_list() == [1, 2, 3, 4]
+    assert Query(["a", "bb"]).union(["cc", "ddd"], key=len).to_list() == ["a", "bb", "ddd"]
+
+
+def test_intersect():
+    # the right side is smaller -> it is built, elements follow the order of the left side
+    assert Query([1, 2, 3, 4, 2]).intersect([4, 2]).to_list() == [2, 4]
+    # the left side is smaller -> it is built, elements follow the order of the right side
+    assert Query([1, 2, 4]).intersect([4, 6, 2, 2]).to_list() == [4, 2]
+    assert Query(["a", "bb"]).intersect(["xx", "yyy"], key=len).to_list() == ["bb"]
+
+
+def test_intersect_order_follows_streamed_side():
+    # the right side isn't larger -> the left side is streamed
+    assert Query([3, 1, 2]).intersect([1, 2, 3]).to_list() == [3, 1, 2]
+    assert Query([3, 1, 2]).intersect([2, 1]).to_list() == [1, 2]
+    # the left side is smaller -> the right side is streamed
+    assert Query([3, 1, 2]).intersect([1, 2, 3, 4]).to_list() == [1, 2, 3]
+    # unknown size -> the left side is streamed
+    assert Query(x for x in [3, 1, 2]).intersect([1, 2, 3, 4]).to_list() == [3, 1, 2]
+
+
+def test_difference():
+    assert Query([1, 2, 3, 1, 4]).difference([2, 4]).to_list() == [1, 3]
+    assert Query(["a", "bb", "ccc"]).difference(["xx"], key=len).to_list() == ["a", "ccc"]
+
+
+def test_symmetric_difference():
+    assert Query([1, 2, 3, 1]).symmetric_difference([3, 4, 4, 5]).to_list() == [1, 2, 4, 5]
+    assert Query(["a", "bb"]).symmetric_difference(["xx", "yyy"], key=len).to_list() == [
+        "a",
+        "yyy",
+    ]
+
+
+def test_set_operations_lazy():
+    naturals = Query.iterate(0, lambda x: x + 1)
+    assert naturals.difference([1, 3]).limit(3).to_list() == [0, 2, 4]
+
+
+def test_set_operations_sorted():
+    left, right = [1, 2, 2, 3, 5], [2, 3, 3, 4, 6]
+    assert Query(left).union(right, assume_sorted=True).to_list() == [1, 2, 3, 4, 5, 6]
+    assert Query(left).intersect(right, assume_sorted=True).to_list() == [2, 3]
+    assert Query(left).difference(right, assume_sorted=True).to_list() == [1, 5]
+    assert Query(left).symmetric_difference(right, assume_sorted=True).to_list() == [1, 4, 5, 6]
+
+
+def test_set_operations_sorted_key():
+    left, right = ["a", "bb", "cc"], ["xx", "yyy"]
+    assert Query(left).intersect(right, key=len, assume_sorted=True).to_list() == ["bb"]
+    assert Query(left).difference(right, key=len, assume_sorted=True).to_list() == ["a"]
+
+
+def test_set_operations_sorted_infinite():
+    evens = Query.iterate(0, lambda x: x + 2)
+    thirds = Query.iterate(0, lambda x: x + 3)
+    assert evens.intersect(thirds, assume_sorted=True).limit(3).to_list() == [0, 6, 12]
+
+
+# ### cogroup ###
+def test_cogroup():
+    assert Query([1, 2, 3, 4]).cogroup(
+        [10, 30, 50], lambda x: x % 2, lambda x: x // 10 % 2
+    ).to_list() == [
+        (1, [1, 3], [10, 30, 50]),
+        (0, [2, 4], []),
+    ]
+
+
+def test_cogroup_right_only_keys():
+    assert Query(["a", "bb"]).cogroup(["cc", "ddd"], len).to_list() == [
+        (1, ["a"], []),
+        (2, ["bb"], ["cc"]),
+        (3, [], ["ddd"]),
+    ]
+
+
+def test_flatten_bytes_and_dicts():
+    assert Query([[b"ab", {"x": 1}], ({"y": 2},)]).flatten().to_list() == [
+        b"ab",
+        {"x": 1},
+        {"y": 2},
+    ]
+
+
+def test_flatten_generic_iterables():
+    assert Query([range(2), {3}, (x for x in [4, [5]])]).flatten().to_list() == [0, 1, 3, 4, 5]
+
+
+def test_flatten_depth():
+    data = [[1, [2, [3, [4]]]], 5]
+    assert Query(data).flatten(depth=0).to_list() == data
+    assert Query(data).flatten(depth=1).to_list() == [1, [2, [3, [4]]], 5]
+    assert Query(data).flatten(depth=2).to_list() == [1, 2, [3, [4]], 5]
+    assert Query(data).flatten().to_list() == [1, 2, 3, 4, 5]
+
+
+def test_flatten_deeply_nested():
+    data = [0]
+    for i in range(1, 10_000):
+        data = [data, i]
+    assert Query([data]).flatten().to_list() == list(range(10_000))
+
+
+def test_flatten_negative_depth():
+    with pytest.raises(ValueError) as e:
+        Query([[1]]).flatten(depth=-1)
+    assert str(e.value) == "Depth cannot be negative"
+
+
 # ### ###
 def test_distinct():
     assert Query([1, 1, 2, 2, 2, 3]).distinct().to_list() == [1, 2, 3]
@@ -566,6 +1333,30 @@ def test_compare_with_custom_key(Foo):
     assert Query([fizz, buzz]).compare_with(Query([buzz]), comparator) is False
 
 
+# ### broadcast ###
+def test_broadcast():
+    calls = []
+    source = Query(range(10)).peek(calls.append)
+    count, unique, maximum = source.broadcast(
+        Collector.counting(), Collector.to_set(), Collector.max_by()
+    )
+    assert (count, unique, maximum) == (10, set(range(10)), Optional.of(9))
+    assert calls == list(range(10))
+
+
+def test_broadcast_plain_functions():
+    seen = []
+    assert Query([1, 2, 3]).broadcast(seen.append, Collector.summing()) == (None, 6)
+    assert seen == [1, 2, 3]
+
+
+def test_broadcast_empty():
+    assert Query.empty().broadcast(Collector.counting(), Collector.min_by()) == (
+        0,
+        Optional.empty(),
+    )
+
+
 def test_quantify():
     assert Query([2, 3, 4, 5, 6]).quantify(predicate=lambda x: x % 2 == 0) == 3
 
@@ -0,0 +1,144 @@
+import array
+
+import pytest
+
+from fumus import Query
+from fumus.queries import Table
+from fumus.utils import DictItem
+
+
+@pytest.fixture
+def people():
+    return [
+        {"name": "Ann", "city": "Sofia", "age": 31, "salary": 3000},
+        {"name": "Bob", "city": "Varna", "age": 25, "salary": 2000},
+        {"name": "Cid", "city": "Sofia", "age": 45, "salary": 5000},
+        {"name": "Dan", "city": "Varna", "age": 19, "salary": 1000},
+    ]
+
+
+def test_from_records_dicts(people):
+    table = Table.from_records(people)
+    assert table.fields == ("name", "city", "age", "salary")
+    assert len(table) == 4
+    assert table.column("age") == [31, 25, 45, 19]
+
+
+def test_from_records_tuples():
+    table = Table.from_records([("a", 1), ("b", 2)], fields=["key", "value"])
+    assert table.column("key") == ["a", "b"]
+    assert table.to_records() == [{"key": "a", "value": 1}, {"key": "b", "value": 2}]
+
+
+def test_from_records_tuples_without_fields():
+    with pytest.raises(ValueError) as e:
+        Table.from_records([("a", 1)])
+    assert str(e.value) == "Fields are required for records that are not dicts"
+
+
+def test_from_records_dict_items():
+    records = [(DictItem("x", 1), DictItem("y", 2)), (DictItem("x", 3), DictItem("y", 4))]
+    assert Table.from_records(records).to_records() == [{"x": 1, "y": 2}, {"x": 3, "y": 4}]
+
+
+def test_from_records_empty():
+    assert len(Table.from_records([], fields=["a"])) == 0
+    assert Table.from_records([]).fields == ()
+
+
+def test_columns_of_different_length():
+    with pytest.raises(ValueError) as e:
+        Table({"a": [1, 2], "b": [1]})
+    assert str(e.value) == "All columns must have the same length"
+
+
+def test_select_shares_columns(people):
+    table = Table.from_records(people)
+    projected = table.select("name", "age")
+    assert projected.fields == ("name", "age")
+    assert projected.column("age") is table.column("age")
+
+
+def test_unknown_field(people):
+    with pytest.raises(KeyError) as e:
+        Table.from_records(people).select("email")
+    assert e.value.args[0] == "Unknown field 'email'"
+
+
+def test_where(people):
+    table = Table.from_records(people)
+    assert table.where("city", "==", "Sofia").column("name") == ["Ann", "Cid"]
+    assert table.where("age", ">=", 25).where("salary", "<", 5000).column("name") == ["Ann", "Bob"]
+    assert table.where("name", "in", {"Bob", "Dan"}).column("age") == [25, 19]
+    assert table.where("age", lambda age: age % 5 == 0).column("name") == ["Bob", "Cid"]
+
+
+def test_where_invalid_operator(people):
+    with pytest.raises(ValueError) as e:
+        Table.from_records(people).where("age", "=~", 1)
+    assert str(e.value).startswith("Invalid operator '=~', expected one of: ==, !=")
+
+
+def test_order_by(people):
+    table = Table.from_records(people)
+    assert table.order_by("age").column("name") == ["Dan", "Bob", "Ann", "Cid"]
+    assert table.order_by("salary", reverse=True).column("salary") == [5000, 3000, 2000, 1000]
+
+
+def test_array_columns_keep_their_type():
+    table = Table({"x": array.array("d", [3.0, 1.0, 2.0]), "y": ["c", "a", "b"]})
+    ordered = table.order_by("x")
+    assert ordered.column("x") == array.array("d", [1.0, 2.0, 3.0])
+    assert table.where("y", "!=", "a").column("x") == array.array("d", [3.0, 2.0])
+
+
+def test_group_by_agg(people):
+    result = (
+        Table.from_records(people)
+        .group_by("city")
+        .agg(
+            count=("name", "count"),
+            total=("salary", "sum"),
+            avg_age=("age", "mean"),
+            oldest=("age", max),
+        )
+    )
+    assert result.to_records() == [
+        {"city": "Sofia", "count": 2, "total": 8000, "avg_age": 38.0, "oldest": 45},
+        {"city": "Varna", "count": 2, "total": 3000, "avg_age": 22.0, "oldest": 25},
+    ]
+
+
+def test_group_by_multiple_fields():
+    table = Table({"a": [1, 1, 2, 1], "b": ["x", "y", "x", "x"], "v": [1, 2, 3, 4]})
+    assert table.group_by("a", "b").agg(values=("v", "list")).to_records() == [
+        {"a": 1, "b": "x", "values": [1, 4]},
+        {"a": 1, "b": "y", "values": [2]},
+        {"a": 2, "b": "x", "values": [3]},
+    ]
+
+
+def test_group_by_invalid_args(people):
+    table = Table.from_records(people)
+    with pytest.raises(ValueError) as e:
+        table.group_by()
+    assert str(e.value) == "At least one field is required for grouping"
+    with pytest.raises(ValueError) as e:
+        table.group_by("city").agg(x=("age", "median"))
+    assert str(e.value).startswith("Invalid aggregation 'median', expected one of: count, sum")
+
+
+def test_query_round_trip(people):
+    table = Query(people).to_table()
+    assert table == Table.from_records(people)
+    assert table.where("city", "==", "Varna").select("name").to_query().map(
+        lambda r: r["name"]
+    ).to_list() == ["Bob", "Dan"]
+    assert Query.of((1, 2), (3, 4)).to_table(fields=["x", "y"]).column("y") == [2, 4]
+
+
+def test_repr(people):
+    assert (
+        repr(Table.from_records(people))
+        == "Table(fields=['name', 'city', 'age', 'salary'], rows=4)"
+    )
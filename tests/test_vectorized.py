@@ -0,0 +1,113 @@
+import pytest
+
+from fumus import Query
+
+np = pytest.importorskip("numpy")
+
+
+def test_vectorized_converts_source():
+    query = Query([1, 2, 3]).vectorized()
+    assert isinstance(query._iterable, np.ndarray)
+    assert isinstance(Query(range(3)).map(lambda x: x).vectorized()._iterable, np.ndarray)
+
+
+def test_vectorized_map_filter():
+    query = (
+        Query(np.arange(10))
+        .vectorized()
+        .map(lambda a: a * 2, on_array=True)
+        .filter(lambda a: a % 3 == 0, on_array=True)
+    )
+    assert isinstance(query._iterable, np.ndarray)
+    assert query.to_list() == [0, 6, 12, 18]
+
+
+def test_on_array_vectorizes_query():
+    query = Query(range(4)).map(lambda a: a + 1, on_array=True)
+    assert isinstance(query._iterable, np.ndarray)
+    assert query.sum() == 10
+
+
+def test_vectorized_ufunc_mapper():
+    assert Query([1.0, 4.0, 9.0]).vectorized().map(np.sqrt).to_list() == [1.0, 2.0, 3.0]
+    assert Query([1.0, np.nan]).vectorized().filter(np.isfinite).to_list() == [1.0]
+
+
+def test_vectorized_plain_callables_use_scalar_path():
+    calls = []
+
+    def mapper(x):
+        calls.append(x)
+        return str(x)
+
+    query = Query(np.arange(3)).vectorized().map(mapper)
+    assert query.to_list() == ["0", "1", "2"]
+    # called once per element - never on the whole array
+    assert calls == [0, 1, 2]
+    assert Query(np.arange(5)).vectorized().map(lambda x: x if x > 2 else 0).to_list() == [
+        0,
+        0,
+        0,
+        3,
+        4,
+    ]
+    assert Query([1, 2, 3]).vectorized().filter(lambda x: x in {1, 3}).to_list() == [1, 3]
+
+
+def test_vectorized_scalar_path_yields_python_scalars():
+    def result_types(query):
+        return [type(x) for x in query]
+
+    for source in ([1, 2], [1.5, 2.5]):
+        scalar = Query(source).map(lambda x: -x)
+        assert result_types(Query(source).vectorized().map(lambda x: -x)) == result_types(scalar)
+        assert type(Query(source).vectorized().take_first().get()) is type(source[0])
+        assert type(Query(source).vectorized().skip(1).to_list()[0]) is type(source[1])
+        assert type(Query(source).vectorized().sum()) is type(sum(source))
+
+
+def test_on_array_invalid_result():
+    with pytest.raises(TypeError) as e:
+        Query([1, 2]).vectorized().map(np.sum, on_array=True)
+    assert str(e.value) == "Array mapper must return an array of shape (2,), got 'int64'"
+
+    with pytest.raises(TypeError) as e:
+        Query([1, 2]).vectorized().filter(lambda a: a * 2, on_array=True)
+    assert str(e.value) == "Array predicate must return a boolean mask of shape (2,), got 'ndarray'"
+
+
+def test_on_array_errors_propagate():
+    def mapper(a):
+        raise KeyError("boom")
+
+    with pytest.raises(KeyError):
+        Query([1, 2]).vectorized().map(mapper, on_array=True)
+
+
+def test_vectorized_aggregates():
+    assert Query([1, 2, 3, 4]).vectorized().sum() == 10
+    assert Query([1, 2, 3, 4]).vectorized().average() == 2.5
+    assert Query([3, 1, 2]).vectorized().min().get() == 1
+    assert Query([3, 1, 2]).vectorized().max().get() == 3
+    assert Query([3, 1, 2]).vectorized().count() == 3
+    assert isinstance(Query([1, 2]).vectorized().sum(), int)
+
+
+def test_vectorized_aggregates_empty():
+    assert Query([]).vectorized().sum() == 0
+    assert Query([]).vectorized().average() == 0
+    assert Query([]).vectorized().min(default=7).get() == 7
+    assert Query([]).vectorized().max().is_empty
+
+
+def test_vectorized_sort_distinct():
+    assert Query([3, 1, 2, 3, 1]).vectorized().distinct().to_list() == [3, 1, 2]
+    assert Query([3, 1, 2]).vectorized().sort().to_list() == [1, 2, 3]
+    assert Query([3, 1, 2]).vectorized().reverse().to_tuple() == (3, 2, 1)
+    assert Query([3, 1, 2]).vectorized().sort(lambda x: -x).to_list() == [3, 2, 1]
+
+
+def test_ndarray_source_without_opt_in_uses_scalar_path():
+    query = Query(np.arange(3)).map(lambda a: a * 2)
+    assert not isinstance(query._iterable, np.ndarray)
+    assert query.to_list() == [0, 2, 4]
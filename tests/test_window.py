@@ -0,0 +1,115 @@
+import pytest
+
+from fumus.queries.window import (
+    CountAggregator,
+    CountWindow,
+    MaxAggregator,
+    MeanAggregator,
+    MinAggregator,
+    SessionWindows,
+    SumAggregator,
+    TimeWindows,
+    aggregator_factory,
+)
+
+
+def test_sum_aggregator():
+    agg = SumAggregator()
+    for x in (1, 2, 3):
+        agg.add(x)
+    agg.remove(1)
+    assert agg.result() == 5
+
+
+def test_mean_aggregator():
+    agg = MeanAggregator()
+    for x in (1, 2, 6):
+        agg.add(x)
+    assert agg.result() == 3
+    agg.remove(1)
+    assert agg.result() == 4
+
+
+@pytest.mark.parametrize("aggregator, function", [(MinAggregator, min), (MaxAggregator, max)])
+def test_monotonic_aggregators(aggregator, function):
+    # brute force comparison over sliding windows of 3 (incl. duplicates)
+    data = [3, 1, 4, 1, 2, 2, 5, 5, 0, 9]
+    agg = aggregator()
+    window = []
+    result = []
+    for x in data:
+        agg.add(x)
+        window.append(x)
+        if len(window) > 3:
+            agg.remove(window.pop(0))
+        result.append(agg.result() == function(window))
+    assert all(result)
+
+
+def test_aggregator_factory():
+    assert aggregator_factory("sum") is SumAggregator
+    collect = aggregator_factory(None)()
+    collect.add(1)
+    assert collect.result() == (1,)
+    summing = aggregator_factory(sum)()
+    summing.add(2)
+    summing.add(3)
+    assert summing.result() == 5
+
+
+def test_aggregator_factory_invalid():
+    with pytest.raises(ValueError) as e:
+        aggregator_factory("median")
+    assert (
+        str(e.value) == "Invalid aggregation 'median', expected one of: sum, count, mean, min, max"
+    )
+
+    with pytest.raises(TypeError) as e:
+        aggregator_factory(42)
+    assert str(e.value) == "Aggregation must be a string, a callable or None"
+
+
+def test_count_window_gaps():
+    state = CountWindow(2, 3, SumAggregator)
+    results = [state.push(x) for x in range(8)]
+    assert [r for done, r in results if done] == [0 + 1, 3 + 4, 6 + 7]
+
+
+def test_time_windows_emit_incrementally():
+    state = TimeWindows(lambda x: x, 10, 10, CountAggregator)
+    assert state.push(1) == []
+    assert state.push(5) == []
+    assert state.push(12) == [(1, 11, 2)]
+    assert state.flush() == [(11, 21, 1)]
+
+
+def test_time_windows_lateness():
+    state = TimeWindows(lambda x: x, 10, 10, CountAggregator, lateness=5)
+    assert state.push(0) == []
+    assert state.push(12) == []
+    # within the allowed lateness -> the first window is still open
+    assert state.push(8) == []
+    assert state.push(16) == [(0, 10, 2)]
+    # too late -> dropped
+    assert state.push(3) == []
+    assert state.flush() == [(10, 20, 2)]
+
+
+def test_session_windows_merge():
+    state = SessionWindows(lambda x: x, 3, SumAggregator, lateness=10)
+    for x in (1, 2, 8, 9):
+        assert state.push(x) == []
+    # bridges both sessions
+    assert state.push(5) == []
+    assert state.flush() == [(1, 9, 25)]
+
+
+def test_aggregators_merge():
+    for aggregator, expected in ((MinAggregator, 1), (MaxAggregator, 4), (MeanAggregator, 2.5)):
+        first, second = aggregator(), aggregator()
+        first.add(4)
+        first.add(2)
+        second.add(1)
+        second.add(3)
+        first.merge(second)
+        assert first.result() == expected